@@ -9,14 +9,28 @@ Autores:
 Data: 2025
 
 Interface web para predicao de score de credito integrada com a API.
+No modo local, o modelo mais recente e carregado no proprio processo e as
+predicoes usam a mesma transformacao da API, sem HTTP nem limites de taxa.
 """
 
 import streamlit as st
-import requests
 import pandas as pd
 import json
 from datetime import datetime
 import time
+import uuid
+import io
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+from src.api.scoring import load_bundle, score_frame
+from src.api.metrics import snapshot_delta
+from results import (chunk_scores, merge_results, page_count, get_page, iter_csv,
+                     RESULT_COLUMNS, DISPLAY_COLUMNS, PAGE_SIZES)
+from client import (create_session, predict_batches, split_chunks, auth_headers, HealthCheck,
+                    fetch_metrics,
+                    BATCH_CHUNK_SIZE, BATCH_MAX_WORKERS, REQUEST_TIMEOUT_S)
 
 # Configuracao da pagina
 st.set_page_config(
@@ -29,6 +43,10 @@ st.set_page_config(
 # URL da API
 API_URL = "http://localhost:8001"
 
+# Painel de desempenho: intervalo minimo entre consultas a /metrics e pontos mantidos
+DASHBOARD_INTERVALS_S = (2, 5, 10, 30)
+DASHBOARD_HISTORY = 180
+
 # Estilo customizado
 st.markdown("""
 <style>
@@ -63,21 +81,43 @@ if 'token' not in st.session_state:
     st.session_state.token = None
 if 'username' not in st.session_state:
     st.session_state.username = None
+if 'local_mode' not in st.session_state:
+    st.session_state.local_mode = False
+if 'batch_results' not in st.session_state:
+    st.session_state.batch_results = None
+if 'metrics_snapshot' not in st.session_state:
+    st.session_state.metrics_snapshot = None
+    st.session_state.metrics_window = None
+    st.session_state.metrics_polled_at = 0.0
+    st.session_state.metrics_history = []
+
+@st.cache_resource
+def get_session():
+    """Sessao HTTP com pool de conexoes, compartilhada entre reruns e usuarios."""
+    # Lotes paralelos + predicao individual + verificacao de estado
+    return create_session(BATCH_MAX_WORKERS + 2)
+
+@st.cache_resource
+def get_health_check():
+    """Estado da API em cache, atualizado em segundo plano."""
+    return HealthCheck(get_session(), API_URL)
+
+@st.cache_resource(show_spinner="Carregando modelo local...")
+def get_local_bundle():
+    """Modelo mais recente e encoders, carregados uma vez por processo."""
+    return load_bundle()
 
 def check_api_health():
-    """Verifica se a API esta online."""
-    try:
-        response = requests.get(f"{API_URL}/health", timeout=5)
-        return response.status_code == 200
-    except:
-        return False
+    """Verifica se a API esta online (sem esperar a rede apos a primeira vez)."""
+    return get_health_check().status(wait=1.0)
 
 def login(username, password):
     """Realiza login na API."""
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_URL}/token",
-            data={"username": username, "password": password}
+            data={"username": username, "password": password},
+            timeout=REQUEST_TIMEOUT_S
         )
         if response.status_code == 200:
             data = response.json()
@@ -90,16 +130,14 @@ def login(username, password):
 
 def predict_score(data):
     """Faz predicao de score usando a API."""
-    headers = {
-        "Authorization": f"Bearer {st.session_state.token}",
-        "Content-Type": "application/json"
-    }
+    headers = auth_headers(st.session_state.token)
     
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_URL}/predict",
             json=data,
-            headers=headers
+            headers=headers,
+            timeout=REQUEST_TIMEOUT_S
         )
         
         if response.status_code == 200:
@@ -115,6 +153,216 @@ def predict_score(data):
         st.error(f"Erro ao conectar com a API: {str(e)}")
         return None
 
+def predict_local(data):
+    """Faz predicao no proprio processo com o modelo local."""
+    try:
+        scores = score_frame(get_local_bundle(), pd.DataFrame([data])).iloc[0]
+    except Exception as e:
+        st.error(f"Erro na predição local: {str(e)}")
+        return None
+    return {
+        **scores.to_dict(),
+        "prediction_id": f"local_{uuid.uuid4().hex[:8]}",
+        "timestamp": datetime.now().isoformat()
+    }
+
+@st.cache_data(show_spinner="Lendo arquivo...")
+def read_upload(content):
+    """Le o CSV enviado uma vez (reruns, como trocar de pagina, reaproveitam)."""
+    return pd.read_csv(io.BytesIO(content))
+
+def process_batch_api(df):
+    """Envia o arquivo a API em lotes paralelos, mostrando progresso e resultados parciais."""
+    chunks = split_chunks(len(df), BATCH_CHUNK_SIZE)
+    st.write(f"Enviando {len(chunks)} lote(s) de até {BATCH_CHUNK_SIZE} clientes "
+             f"({BATCH_MAX_WORKERS} em paralelo)...")
+    progress = st.progress(0.0)
+    status = st.empty()
+    partial_table = st.empty()
+    
+    score_frames = {}
+    processed = 0
+    failed = []
+    last_render = 0.0
+    
+    try:
+        for start, end, response in predict_batches(
+                get_session(), API_URL, df, st.session_state.token,
+                chunk_size=BATCH_CHUNK_SIZE, max_workers=BATCH_MAX_WORKERS):
+            if response.status_code == 401:
+                st.session_state.token = None
+                st.error("Sessão expirada. Faça login novamente.")
+                break
+            if response.status_code != 200:
+                failed.append((start, end, response.status_code, response.text))
+            else:
+                # Resultados do lote com o indice das linhas do upload
+                score_frames[start] = chunk_scores(response.json()['results'], df.index[start:end])
+            
+            processed += end - start
+            progress.progress(processed / len(df))
+            status.text(f"{processed}/{len(df)} clientes processados "
+                        f"({len(failed)} lote(s) com erro)")
+            
+            # Resultados parciais: todos os lotes concluidos ate agora, na ordem
+            # do arquivo (no maximo 2 atualizacoes por segundo)
+            if time.time() - last_render > 0.5 and score_frames:
+                partial_table.dataframe(merge_results(df, score_frames)[DISPLAY_COLUMNS])
+                last_render = time.time()
+    except Exception as e:
+        st.error(f"Erro: {str(e)}")
+    
+    partial_table.empty()
+    for start, end, status_code, text in failed:
+        st.error(f"Erro nas linhas {start}-{end - 1} ({status_code}): {text}")
+    
+    return merge_results(df, score_frames)
+
+def process_batch_local(df):
+    """Pontua o arquivo inteiro no proprio processo (vetorizado)."""
+    with st.spinner(f"Processando {len(df)} clientes localmente..."):
+        try:
+            scores = score_frame(get_local_bundle(), df)
+        except Exception as e:
+            st.error(f"Erro no processamento: {str(e)}")
+            return None
+    return merge_results(df, {0: scores[RESULT_COLUMNS]})
+
+def show_batch_results(batch):
+    """Mostra estatisticas, uma pagina da tabela e a exportacao dos resultados do lote."""
+    results_df = batch['results']
+    st.success(f"Processamento concluído em {batch['elapsed']:.2f}s "
+               f"({len(results_df)} clientes pontuados)")
+    
+    # Mostrar estatisticas
+    st.subheader("Estatísticas dos Resultados")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        score_counts = results_df['credit_score'].value_counts()
+        st.metric("Good", score_counts.get('Good', 0))
+    with col2:
+        st.metric("Standard", score_counts.get('Standard', 0))
+    with col3:
+        st.metric("Poor", score_counts.get('Poor', 0))
+    
+    # Mostrar resultados (uma pagina por vez)
+    st.subheader("Resultados Detalhados")
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page_size = st.selectbox("Linhas por página", PAGE_SIZES, index=1)
+    n_pages = page_count(len(results_df), page_size)
+    with col2:
+        page = st.number_input(f"Página (de {n_pages})", min_value=1, max_value=n_pages, value=1)
+    st.dataframe(get_page(results_df, page, page_size)[DISPLAY_COLUMNS])
+    
+    # Download resultados: CSV gerado em blocos apenas quando pedido
+    if batch['csv'] is None and st.button("Gerar CSV dos Resultados"):
+        with st.spinner("Gerando CSV..."):
+            batch['csv'] = b"".join(iter_csv(results_df))
+    if batch['csv'] is not None:
+        st.download_button(
+            label="Download Resultados",
+            data=batch['csv'],
+            file_name=f"resultados_credit_score_{batch['finished_at']}.csv",
+            mime="text/csv"
+        )
+
+def poll_metrics():
+    """Consulta /metrics e guarda a janela desde a consulta anterior no historico."""
+    snapshot = fetch_metrics(get_session(), API_URL, st.session_state.token)
+    previous = st.session_state.metrics_snapshot
+    window = snapshot_delta(previous, snapshot)
+    st.session_state.metrics_snapshot = snapshot
+    st.session_state.metrics_window = window
+    st.session_state.metrics_polled_at = time.time()
+    
+    # A primeira janela cobre desde o inicio da API: so entra nas tabelas
+    if previous is not None and previous['pid'] == snapshot['pid']:
+        point = {
+            'horario': datetime.fromtimestamp(snapshot['timestamp']),
+            'requisicoes/s': window['rate_per_s'],
+            '429/s': window['rate_limited'] / window['elapsed_s'],
+            'utilizacao': window['utilization'],
+        }
+        for endpoint, stats in window['endpoints'].items():
+            for q in ('p50', 'p95', 'p99'):
+                point[f"{endpoint} {q}"] = stats[q]
+        history = st.session_state.metrics_history
+        history.append(point)
+        del history[:-DASHBOARD_HISTORY]
+    return snapshot, window
+
+def render_dashboard(placeholder, snapshot, window):
+    """Desenha o painel com a janela mais recente e o historico."""
+    with placeholder.container():
+        st.caption(f"Janela de {window['elapsed_s']:.1f}s | processo {snapshot['pid']} | "
+                   f"API no ar há {snapshot['uptime_s'] / 60:.0f} min")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Requisições/s", f"{window['rate_per_s']:.2f}")
+        with col2:
+            st.metric("Rejeitadas (429)", window['rate_limited'])
+        with col3:
+            st.metric("Utilização do Worker", f"{window['utilization']:.0%}")
+        with col4:
+            st.metric("Em Andamento", window['in_flight'])
+        
+        history = pd.DataFrame(st.session_state.metrics_history)
+        if not history.empty:
+            history = history.set_index('horario')
+            st.subheader("Taxa de Requisições")
+            st.line_chart(history[['requisicoes/s', '429/s']])
+            st.subheader("Latência p99 por Endpoint (ms)")
+            st.line_chart(history[[c for c in history.columns if c.endswith(' p99')]])
+            st.subheader("Utilização do Worker")
+            st.area_chart(history[['utilizacao']])
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Endpoints (janela)")
+            st.dataframe(pd.DataFrame(window['endpoints']).T.rename(columns={
+                'requests': 'requisições', 'rate_per_s': 'req/s', 'errors': 'erros 5xx',
+                'rate_limited': '429'}))
+        with col2:
+            st.subheader("Etapas (janela, ms)")
+            st.dataframe(pd.DataFrame(window['stages']).T)
+        
+        st.subheader("Tamanho dos Lotes em /predict/batch (desde o início)")
+        batch_sizes = pd.Series({int(size): count for size, count in snapshot['batch_sizes'].items()},
+                                name='lotes', dtype=int).sort_index()
+        if batch_sizes.empty:
+            st.info("Nenhum lote recebido ainda")
+        else:
+            st.bar_chart(batch_sizes)
+
+def show_performance_tab():
+    """Aba de desempenho da API (consulta sob demanda, sem laco bloqueando as outras abas)."""
+    st.header("Desempenho da API")
+    if st.session_state.token is None:
+        st.info("Faça login na API para acompanhar as métricas")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        interval = st.selectbox("Intervalo mínimo entre consultas (s)", DASHBOARD_INTERVALS_S,
+                                index=1)
+    with col2:
+        refresh = st.button("Atualizar")
+    with col3:
+        if st.button("Limpar Histórico"):
+            st.session_state.metrics_history = []
+    
+    placeholder = st.empty()
+    try:
+        # Reruns da pagina dentro do intervalo reaproveitam a ultima consulta
+        if refresh or time.time() - st.session_state.metrics_polled_at >= interval:
+            poll_metrics()
+        render_dashboard(placeholder, st.session_state.metrics_snapshot,
+                         st.session_state.metrics_window)
+    except Exception as e:
+        st.error(f"Erro ao consultar métricas: {str(e)}")
+
 def main():
     """Funcao principal da aplicacao."""
     
@@ -131,14 +379,37 @@ def main():
         # Status da API
         if api_status:
             st.success("API Online")
+        elif api_status is None:
+            st.info("Verificando API...")
         else:
             st.error("API Offline")
             st.warning("Certifique-se de que a API está rodando em http://localhost:8000")
         
+        # Modo de predicao
+        st.subheader("Modo de Predição")
+        mode = st.radio(
+            "Predições via", ["API", "Local"], horizontal=True,
+            index=1 if st.session_state.local_mode else 0,
+            help="Local: carrega o modelo mais recente neste processo (sem HTTP, login ou limites da API)"
+        )
+        st.session_state.local_mode = mode == "Local"
+        
+        if st.session_state.local_mode:
+            try:
+                bundle = get_local_bundle()
+                st.success(f"Modelo local: {bundle['model_dir'].name}")
+            except Exception as e:
+                st.error(f"Erro ao carregar modelo local: {str(e)}")
+            if st.button("Recarregar Modelo"):
+                get_local_bundle.clear()
+                st.rerun()
+        
         # Login
         st.subheader("Autenticação")
         
-        if st.session_state.token is None:
+        if st.session_state.local_mode:
+            st.info("Login não é necessário no modo local")
+        elif st.session_state.token is None:
             username = st.text_input("Usuário")
             password = st.text_input("Senha", type="password")
             
@@ -158,12 +429,12 @@ def main():
                 st.rerun()
     
     # Conteudo principal
-    if st.session_state.token is None:
+    if st.session_state.token is None and not st.session_state.local_mode:
         st.warning("Faça login para usar o sistema")
         return
     
     # Tabs
-    tab1, tab2, tab3 = st.tabs(["Análise Individual", "Análise em Lote", "Sobre"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Análise Individual", "Análise em Lote", "Sobre", "Desempenho"])
     
     # Tab 1: Analise Individual
     with tab1:
@@ -251,7 +522,7 @@ def main():
                 }
                 
                 # Fazer predicao
-                result = predict_score(data)
+                result = predict_local(data) if st.session_state.local_mode else predict_score(data)
                 
                 if result:
                     # Mostrar resultado
@@ -334,7 +605,8 @@ def main():
         
         if uploaded_file is not None:
             # Ler arquivo
-            df = pd.read_csv(uploaded_file)
+            df = read_upload(uploaded_file.getvalue())
+            upload_key = (uploaded_file.name, uploaded_file.size)
             st.write(f"{len(df)} clientes carregados")
             
             # Mostrar preview
@@ -343,71 +615,26 @@ def main():
             
             # Botao para processar
             if st.button("Processar Lote", type="primary"):
-                with st.spinner(f"Processando {len(df)} clientes..."):
-                    # Preparar dados para API
-                    predictions = df.to_dict('records')
-                    batch_data = {"predictions": predictions}
-                    
-                    # Fazer requisicao
-                    headers = {
-                        "Authorization": f"Bearer {st.session_state.token}",
-                        "Content-Type": "application/json"
+                start_time = time.time()
+                if st.session_state.local_mode:
+                    results_df = process_batch_local(df)
+                else:
+                    results_df = process_batch_api(df)
+                
+                st.session_state.batch_results = None
+                if results_df is not None:
+                    st.session_state.batch_results = {
+                        'upload': upload_key,
+                        'results': results_df,
+                        'elapsed': time.time() - start_time,
+                        'finished_at': datetime.now().strftime('%Y%m%d_%H%M%S'),
+                        'csv': None,
                     }
-                    
-                    try:
-                        response = requests.post(
-                            f"{API_URL}/predict/batch",
-                            json=batch_data,
-                            headers=headers
-                        )
-                        
-                        if response.status_code == 200:
-                            result = response.json()
-                            
-                            st.success(f"Processamento concluído em {result['processing_time']:.2f}s")
-                            
-                            # Processar resultados
-                            results_data = []
-                            for i, pred in enumerate(result['results']):
-                                row = df.iloc[i].to_dict()
-                                row['credit_score'] = pred['credit_score']
-                                row['confidence'] = pred['confidence']
-                                row['risk_level'] = pred['risk_level']
-                                results_data.append(row)
-                            
-                            results_df = pd.DataFrame(results_data)
-                            
-                            # Mostrar estatisticas
-                            st.subheader("Estatísticas dos Resultados")
-                            col1, col2, col3 = st.columns(3)
-                            
-                            with col1:
-                                score_counts = results_df['credit_score'].value_counts()
-                                st.metric("Good", score_counts.get('Good', 0))
-                            with col2:
-                                st.metric("Standard", score_counts.get('Standard', 0))
-                            with col3:
-                                st.metric("Poor", score_counts.get('Poor', 0))
-                            
-                            # Mostrar resultados
-                            st.subheader("Resultados Detalhados")
-                            st.dataframe(
-                                results_df[['age', 'occupation', 'annual_income', 
-                                          'credit_score', 'confidence', 'risk_level']]
-                            )
-                            
-                            # Download resultados
-                            csv_results = results_df.to_csv(index=False)
-                            st.download_button(
-                                label="Download Resultados",
-                                data=csv_results,
-                                file_name=f"resultados_credit_score_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                                mime="text/csv"
-                            )
-                        else:
-                            st.error(f"Erro no processamento: {response.text}")
-                    except Exception as e:
-                        st.error(f"Erro: {str(e)}")
+            
+            # Resultados ficam na sessao (trocar de pagina nao reprocessa)
+            batch = st.session_state.batch_results
+            if batch is not None and batch['upload'] == upload_key:
+                show_batch_results(batch)
     
     # Tab 3: Sobre
     with tab3:
@@ -422,7 +649,7 @@ def main():
         - **Modelo**: Random Forest com 77.5% de acurácia
         - **Features**: 25 variáveis incluindo informações financeiras e comportamentais
         - **API**: FastAPI com autenticação JWT e rate limiting
-        - **Interface**: Streamlit para fácil utilização
+        - **Interface**: Streamlit para fácil utilização, com modo local (modelo no próprio processo)
         
         #### Classificações:
         - **Good**: Cliente com baixo risco, elegível para melhores condições
@@ -437,6 +664,10 @@ def main():
         #### Desenvolvimento:
         Projeto desenvolvido como trabalho de MLOps - MBA FIAP
         """)
+    
+    # Tab 4: Desempenho da API
+    with tab4:
+        show_performance_tab()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
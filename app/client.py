@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Cliente HTTP da aplicacao Streamlit para a API de score de credito
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Uploads grandes sao divididos em lotes do tamanho aceito por /predict/batch
+e enviados em paralelo (numero limitado de requisicoes simultaneas) por uma
+sessao com pool de conexoes, compartilhada com login, predicoes individuais
+e a verificacao de estado da API (em cache, atualizada em segundo plano).
+Respostas 429 e falhas transitorias sao repetidas com backoff exponencial,
+respeitando o cabecalho Retry-After quando a API o envia. Como /predict/batch
+aceita poucas requisicoes por minuto, 429 e repetido ate um prazo maior que
+a janela do rate limit, e nao por numero de tentativas. Os resultados sao
+entregues a medida que cada lote termina, para a interface mostrar
+progresso e resultados parciais.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Limite de /predict/batch por requisicao
+BATCH_CHUNK_SIZE = 100
+# Requisicoes de lote simultaneas
+BATCH_MAX_WORKERS = 4
+
+# Repeticao de requisicoes (429 e falhas transitorias)
+RETRY_STATUS = (429, 502, 503, 504)
+MAX_RETRIES = 5
+# Espera total aceita em respostas 429 (varias janelas de 1 minuto da API)
+RATE_LIMIT_DEADLINE_S = 600.0
+BACKOFF_BASE_S = 2.0
+BACKOFF_MAX_S = 60.0
+REQUEST_TIMEOUT_S = 60
+
+# Estado da API em cache (a verificacao roda fora da renderizacao)
+HEALTH_TTL_S = 10
+HEALTH_TIMEOUT_S = 2
+
+
+def create_session(pool_size=BATCH_MAX_WORKERS):
+    """Sessao HTTP com pool de conexoes reutilizadas entre requisicoes."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HealthCheck:
+    """
+    Estado de /health em cache, atualizado em segundo plano.
+
+    status() nunca espera a rede (exceto, opcionalmente, pela primeira
+    verificacao): devolve o ultimo estado e, se ele tem mais de ttl
+    segundos, dispara uma nova verificacao em uma thread.
+    """
+
+    def __init__(self, session, api_url, ttl=HEALTH_TTL_S, timeout=HEALTH_TIMEOUT_S):
+        self.session = session
+        self.api_url = api_url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.online = None            # None: ainda nao verificado
+        self.checked_at = None
+        self._refreshing = False
+        self._checked = threading.Event()
+        self._lock = threading.Lock()
+
+    def status(self, wait=0.0):
+        """Ultimo estado conhecido; wait limita a espera pela primeira verificacao."""
+        with self._lock:
+            stale = self.checked_at is None or time.monotonic() - self.checked_at > self.ttl
+            if stale and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, name="api-health", daemon=True).start()
+        if wait and not self._checked.is_set():
+            self._checked.wait(wait)
+        return self.online
+
+    def _refresh(self):
+        try:
+            response = self.session.get(f"{self.api_url}/health", timeout=self.timeout)
+            online = response.status_code == 200
+        except requests.RequestException:
+            online = False
+        with self._lock:
+            self.online = online
+            self.checked_at = time.monotonic()
+            self._refreshing = False
+        self._checked.set()
+
+
+def auth_headers(token):
+    """Cabecalhos das requisicoes autenticadas."""
+    return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+
+def fetch_metrics(session, api_url, token, timeout=HEALTH_TIMEOUT_S):
+    """Snapshot acumulado de /metrics (HTTPError em status de erro)."""
+    response = session.get(f"{api_url}/metrics", headers=auth_headers(token), timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def split_chunks(n_rows, chunk_size=BATCH_CHUNK_SIZE):
+    """Intervalos [(inicio, fim), ...] de ate chunk_size linhas."""
+    return [(start, min(start + chunk_size, n_rows)) for start in range(0, n_rows, chunk_size)]
+
+
+def retry_delay(response, attempt, base=BACKOFF_BASE_S, maximum=BACKOFF_MAX_S):
+    """
+    Espera antes da proxima tentativa.
+
+    Usa Retry-After (segundos ou data HTTP) quando presente; senao, backoff
+    exponencial com jitter para os lotes paralelos nao voltarem juntos.
+    """
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), maximum)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+                return min(max((when - datetime.now(timezone.utc)).total_seconds(), 0.0), maximum)
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0.5, 1.0) * min(base * 2 ** attempt, maximum)
+
+
+def post_with_retry(session, url, max_retries=MAX_RETRIES, deadline_s=RATE_LIMIT_DEADLINE_S,
+                    sleep=time.sleep, **kwargs):
+    """
+    POST repetido em 429, 5xx transitorio e erro de conexao.
+
+    5xx e erros de conexao tem ate max_retries repeticoes. 429 e o ritmo
+    pedido pela API: e repetido enquanto a espera acumulada couber em
+    deadline_s. Retorna a ultima resposta (o chamador trata o status); erros
+    de conexao sao relancados depois da ultima tentativa.
+    """
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT_S)
+    attempt, waited = 0, 0.0
+    while True:
+        try:
+            response = session.post(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= max_retries:
+                raise
+            response = None
+        else:
+            if response.status_code not in RETRY_STATUS:
+                return response
+
+        delay = retry_delay(response, attempt)
+        if response is not None and response.status_code == 429:
+            if waited + delay > deadline_s:
+                return response
+        elif response is not None and attempt >= max_retries:
+            return response
+        sleep(delay)
+        waited += delay
+        attempt += 1
+
+
+def predict_batches(session, api_url, df, token, chunk_size=BATCH_CHUNK_SIZE,
+                    max_workers=BATCH_MAX_WORKERS, sleep=time.sleep):
+    """
+    Envia df em lotes paralelos para /predict/batch.
+
+    Gera (inicio, fim, resposta) na ordem de conclusao. No maximo
+    max_workers lotes ficam em voo; os registros de cada lote so sao
+    montados quando ele e enviado. Interromper o gerador cancela os lotes
+    ainda nao enviados.
+    """
+    headers = auth_headers(token)
+    pending_chunks = iter(split_chunks(len(df), chunk_size))
+
+    def send(start, end):
+        records = df.iloc[start:end].to_dict('records')
+        return post_with_retry(session, f"{api_url}/predict/batch", sleep=sleep,
+                               json={"predictions": records}, headers=headers)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    running = {}
+
+    def submit_next():
+        chunk = next(pending_chunks, None)
+        if chunk is not None:
+            running[executor.submit(send, *chunk)] = chunk
+
+    try:
+        for _ in range(max_workers):
+            submit_next()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, end = running.pop(future)
+                submit_next()
+                yield start, end, future.result()
+    finally:
+        # Lotes em voo terminam em segundo plano; os nao enviados sao descartados
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Resultados da analise em lote da aplicacao Streamlit
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+As respostas de cada lote viram um DataFrame de colunas de resultado com o
+indice das linhas do upload, e a juncao com o upload e um concat por
+colunas (sem dicionario por linha). A interface mostra uma pagina por vez
+e o CSV de exportacao e gerado em blocos apenas quando pedido.
+"""
+
+import math
+
+import pandas as pd
+
+# Colunas de resultado juntadas ao upload
+RESULT_COLUMNS = ['credit_score', 'confidence', 'risk_level']
+# Colunas mostradas na tabela de resultados
+DISPLAY_COLUMNS = ['age', 'occupation', 'annual_income'] + RESULT_COLUMNS
+
+PAGE_SIZES = (50, 100, 500, 1000)
+CSV_CHUNK_ROWS = 50_000
+
+
+def chunk_scores(results, index):
+    """Resultados de um lote da API como DataFrame (indice das linhas do upload)."""
+    return pd.DataFrame.from_records(results, columns=RESULT_COLUMNS, index=index)
+
+
+def merge_results(df, score_frames):
+    """
+    Junta os resultados ao upload com concat por colunas.
+
+    score_frames: {inicio do lote: DataFrame}; so as linhas pontuadas
+    (lotes com erro ficam de fora) entram, na ordem do arquivo.
+    """
+    if not score_frames:
+        return None
+    scores = pd.concat([score_frames[start] for start in sorted(score_frames)])
+    return pd.concat([df, scores], axis=1, join='inner')
+
+
+def page_count(n_rows, page_size):
+    """Numero de paginas (ao menos uma)."""
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def get_page(df, page, page_size):
+    """Linhas da pagina (comecando em 1)."""
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def iter_csv(df, chunk_rows=CSV_CHUNK_ROWS):
+    """CSV em blocos de bytes; o cabecalho vai apenas no primeiro."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode('utf-8')
@@ -10,6 +10,7 @@ Data: 2025
 Centraliza todas as configurações e constantes do projeto.
 """
 
+import os
 from pathlib import Path
 
 # Caminhos do projeto
@@ -18,7 +19,10 @@ DATA_DIR = PROJECT_ROOT / "data"
 DATA_RAW = DATA_DIR / "raw"
 DATA_PROCESSED = DATA_DIR / "processed"
 DATA_FINAL = DATA_DIR / "final"
+CACHE_DIR = DATA_DIR / "cache"
+PREDICTIONS_DIR = DATA_DIR / "predictions"
 MODELS_DIR = PROJECT_ROOT / "models"
+REPORTS_DIR = PROJECT_ROOT / "reports"
 
 # Configurações do modelo
 RANDOM_STATE = 42
@@ -28,11 +32,68 @@ TEST_SIZE = 0.2
 MLFLOW_TRACKING_URI = f"file:///{PROJECT_ROOT}/mlruns"
 MLFLOW_EXPERIMENT_NAME = "credit-score-classification"
 
+# Configurações de profiling dos pipelines
+PROFILE_TRACK_MEMORY = True  # tracemalloc adiciona overhead às etapas medidas
+
+# Configurações de seleção de modelos: maior métrica sujeita aos limites
+# (métricas do benchmark de inferência, ex: "latency_single_p99_ms")
+SELECTION_METRIC = "f1_score"
+SELECTION_CONSTRAINTS = {"latency_single_p99_ms": 50.0}
+
+# Configurações da busca de hiperparâmetros (successive halving)
+TUNING_BUDGET_S = 600  # tempo máximo de parede da busca, em segundos
+TUNING_TRIALS = 27     # configurações sorteadas na primeira rodada
+TUNING_ETA = 3         # a cada rodada avança 1/eta das configurações
+TUNING_VALIDATION_SIZE = 0.2  # fração do treino usada para podar e escolher (o teste só reporta)
+
+# Configurações do treino da floresta em shards (processos ou outros hosts)
+FOREST_SHARDS = 4
+SHARD_QUEUE_HOST = "127.0.0.1"  # use "0.0.0.0" para aceitar workers de outros hosts
+SHARD_QUEUE_PORT = 50055
+# Chave da fila (QF_SHARD_QUEUE_AUTHKEY), obrigatória fora do loopback: a fila
+# desserializa o que recebe. Sem ela, cada execução local sorteia uma chave.
+SHARD_QUEUE_AUTHKEY = os.environ.get("QF_SHARD_QUEUE_AUTHKEY") or None
+
+# Formato do model.pkl em models/: "pickle" ou "compact" (florestas em arrays
+# por campo, mesmas predicoes); compressão "none" (sem compressão) ou "fast" (transferência)
+MODEL_ARTIFACT_FORMAT = "pickle"
+MODEL_ARTIFACT_COMPRESSION = "none"
+
 # Configurações da API
 API_VERSION = "v1"
 API_TITLE = "QuantumFinance Credit Score API"
 API_DESCRIPTION = "API para classificação de score de crédito"
 
+# Rate limiting por IP (10/min em /predict, 2/min em /predict/batch).
+# QF_RATE_LIMIT_ENABLED=0 desliga, apenas para testes de carga locais.
+RATE_LIMIT_ENABLED = os.environ.get("QF_RATE_LIMIT_ENABLED", "1") != "0"
+
+# Configurações do log de predições da API (buffer em memória + Parquet)
+PREDICTION_LOG_ENABLED = True
+PREDICTION_LOG_CAPACITY = 100_000      # linhas no buffer; acima disso são descartadas
+PREDICTION_LOG_FLUSH_S = 5.0           # intervalo entre escritas
+PREDICTION_LOG_ROWS_PER_FILE = 500_000
+PREDICTION_LOG_FILE_SECONDS = 3600     # idade máxima do arquivo em escrita
+PREDICTION_LOG_MAX_FILES = 48          # arquivos mantidos (os mais antigos são apagados)
+
+# Captura amostrada de tráfego para replay (opt-in: QF_CAPTURE_ENABLED=1).
+# Guarda corpos e cabeçalhos de /predict e /predict/batch, sem tokens.
+CAPTURE_ENABLED = os.environ.get("QF_CAPTURE_ENABLED", "0") == "1"
+CAPTURE_DIR = DATA_DIR / "captures"
+CAPTURE_SAMPLE_RATE = 0.1                 # fração das requisições gravadas
+CAPTURE_CAPACITY_BYTES = 64 * 1024 ** 2   # buffer em memória; cheio, descarta
+CAPTURE_FLUSH_S = 5.0
+CAPTURE_RECORDS_PER_FILE = 100_000
+CAPTURE_FILE_SECONDS = 3600
+CAPTURE_MAX_FILES = 20
+
+# Configurações do monitoramento de drift (histogramas de referência do treino)
+DRIFT_BINS = 10                 # bins por feature numérica (quantis do treino)
+DRIFT_BUCKET_S = 60             # granularidade das contagens ao vivo
+DRIFT_BUCKETS = 60              # buckets mantidos (histórico máximo = 1h)
+DRIFT_WINDOWS_S = (300, 3600)   # janelas deslizantes reportadas
+DRIFT_PSI_ALERT = 0.2           # PSI acima disso marca a feature como em drift
+
 # Configurações de autenticação
 SECRET_KEY = "seu-secret-key-aqui-mudar-em-producao"
 ALGORITHM = "HS256"
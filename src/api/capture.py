@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Captura amostrada do trafego de predicao para replay
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Opcional (CAPTURE_ENABLED): um middleware ASGI sorteia uma fracao das
+requisicoes de /predict e /predict/batch e guarda o corpo original, os
+cabecalhos (com tokens e cookies trocados por "[REDACTED]"), o horario, a
+duracao, o status e os scores da resposta. No caminho da requisicao so ha
+a copia dos bytes para um buffer limitado; uma thread de escrita monta os
+registros e grava JSON Lines comprimido (gzip), um registro por requisicao,
+com a mesma rotacao do log de predicoes (.jsonl.gz.tmp enquanto aberto).
+
+src/benchmarks/replay.py reenvia a captura contra qualquer versao da API
+e compara os scores.
+"""
+
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Endpoints capturados
+CAPTURE_ENDPOINTS = ("/predict", "/predict/batch")
+# Cabecalhos com credenciais (valor substituido)
+REDACTED_HEADERS = ("authorization", "proxy-authorization", "cookie", "x-api-key")
+REDACTED = "[REDACTED]"
+
+
+def redact_headers(headers):
+    """Cabecalhos ASGI [(bytes, bytes)] como dict, sem credenciais."""
+    result = {}
+    for name, value in headers:
+        name = name.decode('latin-1').lower()
+        result[name] = REDACTED if name in REDACTED_HEADERS else value.decode('latin-1')
+    return result
+
+
+def response_scores(path, data):
+    """[[credit_score, confidence], ...] da resposta de /predict ou /predict/batch."""
+    if not isinstance(data, dict):
+        return None
+    if path == "/predict/batch":
+        return [[item['credit_score'], item['confidence']] for item in data.get('results', [])]
+    if 'credit_score' in data:
+        return [[data['credit_score'], data['confidence']]]
+    return None
+
+
+def request_rows(path, data):
+    """Linhas pontuadas pela requisicao (tamanho do lote)."""
+    if path == "/predict/batch" and isinstance(data, dict):
+        return len(data.get('predictions', []))
+    return 1
+
+
+def _loads(raw):
+    """JSON ou None (corpo invalido tambem e capturado)."""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+class TrafficCapture:
+    """Buffer limitado (em bytes) de requisicoes com escrita gzip em segundo plano."""
+
+    def __init__(self, directory, sample_rate=0.1, endpoints=CAPTURE_ENDPOINTS,
+                 capacity_bytes=64 * 1024 ** 2, flush_interval=5.0, records_per_file=100_000,
+                 file_seconds=3600, max_files=20, seed=None):
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.endpoints = set(endpoints)
+        self.capacity_bytes = capacity_bytes
+        self.flush_interval = flush_interval
+        self.records_per_file = records_per_file
+        self.file_seconds = file_seconds
+        self.max_files = max_files
+        self._random = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self._pending = []
+        self._buffered = 0
+        self._buffered_bytes = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+
+        self._file = None
+        self._file_records = 0
+        self._file_opened = 0.0
+        self._file_path = None
+        self._stop = threading.Event()
+        self._flush_now = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Inicia a thread de escrita."""
+        self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def should_capture(self, path):
+        """Sorteia a requisicao (antes de ler o corpo)."""
+        return path in self.endpoints and self._random.random() < self.sample_rate
+
+    def record(self, method, path, headers, body, status_code, started_at, duration_ms,
+               response_body):
+        """
+        Anexa uma requisicao ao buffer (O(1), nunca bloqueia).
+
+        headers: lista ASGI [(bytes, bytes)]; body/response_body: bytes.
+        Retorna False se o buffer estava cheio e a requisicao foi descartada.
+        """
+        size = len(body) + len(response_body)
+        item = (started_at, method, path, headers, body, status_code, duration_ms, response_body)
+        with self._lock:
+            if self._buffered_bytes + size > self.capacity_bytes:
+                self.dropped += 1
+                return False
+            self._pending.append(item)
+            self._buffered += 1
+            self._buffered_bytes += size
+            self.captured += 1
+        return True
+
+    def stats(self):
+        """Contadores da captura."""
+        files = len(self._files())
+        with self._lock:
+            return {'sample_rate': self.sample_rate, 'captured': self.captured,
+                    'buffered': self._buffered, 'dropped': self.dropped,
+                    'written': self.written, 'files': files}
+
+    def flush(self, timeout=None):
+        """Pede uma escrita imediata e espera o buffer esvaziar."""
+        self._flush_now.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._buffered and self._thread is not None and self._thread.is_alive():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self):
+        """Grava o que restou, fecha o arquivo atual e encerra a thread."""
+        self._stop.set()
+        self._flush_now.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        """Laco da thread de escrita."""
+        while not self._stop.is_set():
+            self._flush_now.wait(self.flush_interval)
+            self._flush_now.clear()
+            self._write_pending()
+            if self._file is not None and time.time() - self._file_opened > self.file_seconds:
+                self._close_file()
+        self._write_pending()
+        self._close_file()
+
+    def _write_pending(self):
+        """Troca o buffer por um vazio e grava os registros."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        size = sum(len(item[4]) + len(item[7]) for item in pending)
+        written = 0
+        try:
+            for item in pending:
+                self._write_line(json.dumps(self._to_record(item), separators=(',', ':')))
+                written += 1
+        except Exception as e:
+            # Falha de escrita (ex: disco cheio) descarta o restante sem parar a thread
+            print(f">> Erro ao gravar captura de trafego: {e}")
+        with self._lock:
+            self._buffered -= len(pending)
+            self._buffered_bytes -= size
+            self.written += written
+            self.dropped += len(pending) - written
+
+    @staticmethod
+    def _to_record(item):
+        """Registro de uma requisicao (parse dos corpos fora do caminho da requisicao)."""
+        started_at, method, path, headers, body, status_code, duration_ms, response_body = item
+        return {
+            't': round(started_at, 6),
+            'method': method,
+            'path': path,
+            'status': status_code,
+            'duration_ms': round(duration_ms, 3),
+            'rows': request_rows(path, _loads(body)),
+            'headers': redact_headers(headers),
+            'body': body.decode('utf-8', errors='replace'),
+            'scores': response_scores(path, _loads(response_body)) if status_code == 200 else None,
+        }
+
+    def _write_line(self, line):
+        """Grava no arquivo atual, trocando de arquivo por registros (ou idade, em _run)."""
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Nome ordenavel pelo horario; o pid separa workers do mesmo servidor
+            name = f"capture_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}"
+            self._file_path = self.directory / f"{name}.jsonl.gz"
+            self._file = gzip.open(self._file_path.with_suffix(".gz.tmp"), 'wt', encoding='utf-8')
+            self._file_records = 0
+            self._file_opened = time.time()
+
+        self._file.write(line + "\n")
+        self._file_records += 1
+        if self._file_records >= self.records_per_file:
+            self._close_file()
+
+    def _close_file(self):
+        """Fecha o arquivo atual (so entao ele ganha a extensao .jsonl.gz)."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file_path.with_suffix(".gz.tmp").rename(self._file_path)
+        self._file = None
+
+        # Rotacao: manter apenas os max_files mais recentes
+        for old in self._files()[:-self.max_files]:
+            old.unlink(missing_ok=True)
+
+    def _files(self):
+        """Arquivos completos, do mais antigo ao mais recente."""
+        return sorted(self.directory.glob("capture_*.jsonl.gz"))
+
+
+class CaptureMiddleware:
+    """
+    Middleware ASGI que copia corpo e resposta das requisicoes sorteadas.
+
+    ASGI puro (e nao BaseHTTPMiddleware) para ler o corpo sem consumi-lo
+    antes da rota; requisicoes nao sorteadas passam direto.
+    """
+
+    def __init__(self, app, capture):
+        self.app = app
+        self.capture = capture
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.capture.should_capture(scope['path']):
+            await self.app(scope, receive, send)
+            return
+
+        body, response_body = [], []
+        status = {'code': 500}
+        started_at, start = time.time(), time.perf_counter()
+
+        async def receive_copy():
+            message = await receive()
+            if message['type'] == 'http.request':
+                body.append(message.get('body', b''))
+            return message
+
+        async def send_copy(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            elif message['type'] == 'http.response.body':
+                response_body.append(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_copy, send_copy)
+        finally:
+            self.capture.record(scope['method'], scope['path'], scope['headers'], b"".join(body),
+                                status['code'], started_at, (time.perf_counter() - start) * 1000,
+                                b"".join(response_body))
+
+
+def read_capture(paths):
+    """Registros de um ou mais arquivos (ou pastas) de captura, em ordem de horario."""
+    files = []
+    for path in [Path(p) for p in ([paths] if isinstance(paths, (str, Path)) else paths)]:
+        files.extend(sorted(path.glob("capture_*.jsonl.gz")) if path.is_dir() else [path])
+    records = []
+    for path in files:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda record: record['t'])
+    return records
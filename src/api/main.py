@@ -11,14 +11,13 @@ Data: 2025
 API desenvolvida com FastAPI incluindo autenticacao JWT e rate limiting.
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from datetime import datetime, timedelta
-import joblib
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -32,11 +31,25 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 sys.path.append(str(Path(__file__).parent))
 from config import API_VERSION, API_TITLE, API_DESCRIPTION, MODELS_DIR, ACCESS_TOKEN_EXPIRE_MINUTES
+from config import RATE_LIMIT_ENABLED
+from config import (PREDICTIONS_DIR, PREDICTION_LOG_ENABLED, PREDICTION_LOG_CAPACITY,
+                    PREDICTION_LOG_FLUSH_S, PREDICTION_LOG_ROWS_PER_FILE,
+                    PREDICTION_LOG_FILE_SECONDS, PREDICTION_LOG_MAX_FILES)
+from config import DRIFT_BUCKET_S, DRIFT_BUCKETS, DRIFT_WINDOWS_S, DRIFT_PSI_ALERT
+from config import (CAPTURE_ENABLED, CAPTURE_DIR, CAPTURE_SAMPLE_RATE, CAPTURE_CAPACITY_BYTES,
+                    CAPTURE_FLUSH_S, CAPTURE_RECORDS_PER_FILE, CAPTURE_FILE_SECONDS,
+                    CAPTURE_MAX_FILES)
+from src.features.transform import FIELD_TO_COLUMN
+from src.monitoring.drift import Reference, DriftMonitor, unscale, REFERENCE_FILE
 from models import (
     CreditScoreInput, CreditScoreResponse, 
     HealthResponse,
     BatchCreditScoreInput, BatchCreditScoreResponse
 )
+from prediction_log import PredictionLog
+from metrics import MetricsRegistry, MetricsMiddleware
+from capture import TrafficCapture, CaptureMiddleware
+from scoring import load_bundle, to_feature_frame, get_risk_level, get_recommendation
 from auth import (
     Token, User, authenticate_user, create_access_token,
     get_current_active_user, fake_users_db
@@ -60,8 +73,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configurar rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Metricas de desempenho (contadores e histogramas em memoria, por processo)
+METRICS = MetricsRegistry()
+
+app.add_middleware(MetricsMiddleware, metrics=METRICS)
+
+# Captura amostrada de trafego para replay (opt-in; a thread de escrita inicia no startup)
+CAPTURE = None
+if CAPTURE_ENABLED:
+    CAPTURE = TrafficCapture(
+        CAPTURE_DIR, sample_rate=CAPTURE_SAMPLE_RATE, capacity_bytes=CAPTURE_CAPACITY_BYTES,
+        flush_interval=CAPTURE_FLUSH_S, records_per_file=CAPTURE_RECORDS_PER_FILE,
+        file_seconds=CAPTURE_FILE_SECONDS, max_files=CAPTURE_MAX_FILES
+    )
+    app.add_middleware(CaptureMiddleware, capture=CAPTURE)
+
+# Configurar rate limiter (cabecalhos X-RateLimit-* e Retry-After nas respostas,
+# para os clientes esperarem a janela em vez de repetir as cegas)
+limiter = Limiter(key_func=get_remote_address, enabled=RATE_LIMIT_ENABLED, headers_enabled=True)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -69,39 +98,60 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 MODEL = None
 ENCODERS = None
 MODEL_VERSION = "1.0.0"
+PREDICTION_LOG = None
+DRIFT_MONITOR = None
+# Falhas de log/drift/metricas por requisicao (contadas; a resposta segue)
+LOG_ERRORS = 0
 
 def load_model():
     """Carrega o modelo treinado e encoders."""
-    global MODEL, ENCODERS, MODEL_VERSION
+    global MODEL, ENCODERS, MODEL_VERSION, DRIFT_MONITOR
     
     print(">> Carregando modelo...")
     
-    # Procurar modelo mais recente
-    model_dirs = list(MODELS_DIR.glob("random_forest_*"))
-    if not model_dirs:
-        raise Exception("Nenhum modelo encontrado!")
+    # Usar o modelo mais recente (pelo timestamp do nome, nao pelo tipo);
+    # modelo em pickle ou floresta compacta, mais os encoders
+    bundle = load_bundle(MODELS_DIR)
+    model_dir = bundle['model_dir']
+    MODEL = bundle['model']
+    ENCODERS = bundle['encoders']
     
-    # Usar o mais recente
-    latest_model_dir = sorted(model_dirs)[-1]
+    # Histogramas de referencia do treino (modelos antigos podem nao ter)
+    reference_path = model_dir / REFERENCE_FILE
+    DRIFT_MONITOR = None
+    if reference_path.exists():
+        DRIFT_MONITOR = DriftMonitor(Reference.load(reference_path),
+                                     bucket_seconds=DRIFT_BUCKET_S, n_buckets=DRIFT_BUCKETS)
     
-    # Carregar modelo
-    model_path = latest_model_dir / "model.pkl"
-    MODEL = joblib.load(model_path)
-    
-    # Carregar encoders
-    encoders_path = latest_model_dir / "encoders.pkl"
-    ENCODERS = joblib.load(encoders_path)
-    
-    MODEL_VERSION = latest_model_dir.name.split("_")[-1]
-    print(f">> Modelo carregado: {latest_model_dir.name}")
+    MODEL_VERSION = bundle['version']
+    print(f">> Modelo carregado: {model_dir.name}")
 
 # Carregar modelo ao iniciar
 @app.on_event("startup")
 async def startup_event():
     """Evento de inicializacao da API."""
+    global PREDICTION_LOG
     load_model()
+    if PREDICTION_LOG_ENABLED:
+        PREDICTION_LOG = PredictionLog(
+            PREDICTIONS_DIR, ENCODERS['transformer'].feature_names_,
+            ENCODERS['target'].inverse_transform(MODEL.classes_),
+            capacity=PREDICTION_LOG_CAPACITY, flush_interval=PREDICTION_LOG_FLUSH_S,
+            rows_per_file=PREDICTION_LOG_ROWS_PER_FILE,
+            file_seconds=PREDICTION_LOG_FILE_SECONDS, max_files=PREDICTION_LOG_MAX_FILES
+        )
+    if CAPTURE is not None:
+        CAPTURE.start()
     print(">> API iniciada com sucesso!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Grava o restante do log de predicoes e da captura ao encerrar."""
+    if PREDICTION_LOG is not None:
+        PREDICTION_LOG.close()
+    if CAPTURE is not None:
+        CAPTURE.close()
+
 # Endpoint de autenticacao
 @app.post("/token", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
@@ -141,6 +191,7 @@ async def health_check():
 @limiter.limit("10/minute")  # Rate limiting: 10 requisicoes por minuto
 async def predict_credit_score(
     request: Request,
+    response: Response,
     credit_input: CreditScoreInput,
     current_user: User = Depends(get_current_active_user)
 ):
@@ -151,11 +202,14 @@ async def predict_credit_score(
     """
     try:
         # Preparar dados
+        start_time = time.perf_counter()
         input_data = prepare_input_data(credit_input)
+        transformed_time = time.perf_counter()
         
-        # Fazer predicao
-        prediction = MODEL.predict(input_data)[0]
+        # Fazer predicao (uma unica passada: classe = argmax das probabilidades)
         probabilities = MODEL.predict_proba(input_data)[0]
+        predicted_time = time.perf_counter()
+        prediction = MODEL.classes_[probabilities.argmax()]
         
         # Decodificar resultado
         credit_score = ENCODERS['target'].inverse_transform([prediction])[0]
@@ -166,7 +220,7 @@ async def predict_credit_score(
         recommendation = get_recommendation(credit_score)
         
         # Criar resposta
-        response = CreditScoreResponse(
+        result = CreditScoreResponse(
             credit_score=credit_score,
             confidence=confidence,
             prediction_id=f"pred_{uuid.uuid4().hex[:8]}",
@@ -175,19 +229,24 @@ async def predict_credit_score(
             recommendation=recommendation
         )
         
-        return response
-        
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao processar predicao: {str(e)}"
         )
+    
+    # Fora do try da predicao: falha no log nunca altera a resposta
+    log_predictions(input_data, probabilities.reshape(1, -1), [credit_score],
+                    [result.prediction_id], "/predict",
+                    start_time, transformed_time, predicted_time)
+    return result
 
 # Endpoint de predicao em lote
 @app.post("/predict/batch", response_model=BatchCreditScoreResponse)
 @limiter.limit("2/minute")  # Rate limiting mais restrito para batch
 async def predict_batch(
     request: Request,
+    response: Response,
     batch_input: BatchCreditScoreInput,
     current_user: User = Depends(get_current_active_user)
 ):
@@ -203,39 +262,29 @@ async def predict_batch(
         )
     
     start_time = time.time()
-    results = []
     
-    for input_item in batch_input.predictions:
-        try:
-            # Processar cada predicao
-            input_data = prepare_input_data(input_item)
-            prediction = MODEL.predict(input_data)[0]
-            probabilities = MODEL.predict_proba(input_data)[0]
-            
-            credit_score = ENCODERS['target'].inverse_transform([prediction])[0]
-            confidence = float(max(probabilities))
-            
-            result = CreditScoreResponse(
-                credit_score=credit_score,
-                confidence=confidence,
-                prediction_id=f"pred_{uuid.uuid4().hex[:8]}",
-                timestamp=datetime.now(),
-                risk_level=get_risk_level(credit_score),
-                recommendation=get_recommendation(credit_score)
-            )
-            results.append(result)
-            
-        except Exception as e:
-            # Em caso de erro, adicionar resultado com erro
-            result = CreditScoreResponse(
-                credit_score="Error",
-                confidence=0.0,
-                prediction_id=f"error_{uuid.uuid4().hex[:8]}",
-                timestamp=datetime.now(),
-                risk_level="Unknown",
-                recommendation=f"Erro ao processar: {str(e)}"
-            )
-            results.append(result)
+    try:
+        # Transformacao e predicao vetorizadas para o lote inteiro
+        stage_start = time.perf_counter()
+        input_data = prepare_batch_data(batch_input.predictions)
+        transformed_time = time.perf_counter()
+        probabilities = MODEL.predict_proba(input_data)
+        predicted_time = time.perf_counter()
+        credit_scores = ENCODERS['target'].inverse_transform(
+            MODEL.classes_[probabilities.argmax(axis=1)])
+        results = [success_response(credit_score, confidence) for credit_score, confidence
+                   in zip(credit_scores, probabilities.max(axis=1))]
+    except Exception:
+        # Alguma linha invalida: pontuar uma a uma, so os itens com erro viram "Error"
+        stage_start = time.perf_counter()
+        results, input_data, probabilities, credit_scores = predict_items(batch_input.predictions)
+        transformed_time = predicted_time = time.perf_counter()
+    
+    # Fora do try da predicao: falha no log nunca altera a resposta
+    if len(input_data):
+        ok_ids = [result.prediction_id for result in results if result.credit_score != "Error"]
+        log_predictions(input_data, probabilities, credit_scores, ok_ids, "/predict/batch",
+                        stage_start, transformed_time, predicted_time)
     
     processing_time = time.time() - start_time
     
@@ -251,97 +300,142 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)):
     """Retorna informacoes do usuario autenticado."""
     return current_user
 
-# Funcoes auxiliares
-def prepare_input_data(request: CreditScoreInput) -> pd.DataFrame:
-    """Prepara dados de entrada para o modelo."""
-    
-    # Criar DataFrame com os dados
-    data_dict = request.dict()
-    
-    # Converter nomes das colunas de snake_case para CamelCase
-    renamed_dict = {
-        'Age': data_dict['age'],
-        'Occupation': data_dict['occupation'],
-        'Annual_Income': data_dict['annual_income'],
-        'Monthly_Inhand_Salary': data_dict['monthly_inhand_salary'],
-        'Num_Bank_Accounts': data_dict['num_bank_accounts'],
-        'Num_Credit_Card': data_dict['num_credit_card'],
-        'Interest_Rate': data_dict['interest_rate'],
-        'Num_of_Loan': data_dict['num_of_loan'],
-        'Type_of_Loan': data_dict['type_of_loan'],
-        'Delay_from_due_date': data_dict['delay_from_due_date'],
-        'Num_of_Delayed_Payment': data_dict['num_of_delayed_payment'],
-        'Changed_Credit_Limit': data_dict['changed_credit_limit'],
-        'Num_Credit_Inquiries': data_dict['num_credit_inquiries'],
-        'Credit_Mix': data_dict['credit_mix'],
-        'Outstanding_Debt': data_dict['outstanding_debt'],
-        'Credit_Utilization_Ratio': data_dict['credit_utilization_ratio'],
-        'Credit_History_Age': data_dict['credit_history_age'],
-        'Payment_of_Min_Amount': data_dict['payment_of_min_amount'],
-        'Total_EMI_per_month': data_dict['total_emi_per_month'],
-        'Amount_invested_monthly': data_dict['amount_invested_monthly'],
-        'Payment_Behaviour': data_dict['payment_behaviour'],
-        'Monthly_Balance': data_dict['monthly_balance']
+# Endpoint de drift das features
+@app.get("/monitoring/drift")
+async def feature_drift(current_user: User = Depends(get_current_active_user)):
+    """PSI e KS por feature nas janelas deslizantes, contra o treino."""
+    if DRIFT_MONITOR is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Modelo sem histogramas de referencia"
+        )
+    return {
+        "model_version": MODEL_VERSION,
+        "psi_alert": DRIFT_PSI_ALERT,
+        "windows": DRIFT_MONITOR.report(DRIFT_WINDOWS_S, threshold=DRIFT_PSI_ALERT),
     }
+
+# Endpoint de metricas de desempenho
+@app.get("/metrics")
+async def performance_metrics(current_user: User = Depends(get_current_active_user)):
+    """
+    Contadores e histogramas acumulados deste processo.
     
-    data = pd.DataFrame([renamed_dict])
-    
-    # Aplicar mesmas transformacoes do treinamento
-    # 1. Codificar categoricas
-    categorical_cols = ['Occupation', 'Type_of_Loan', 'Credit_Mix', 
-                       'Credit_History_Age', 'Payment_of_Min_Amount', 
-                       'Payment_Behaviour']
-    
-    for col in categorical_cols:
-        if col in ENCODERS:
-            try:
-                data[col] = ENCODERS[col].transform(data[col])
-            except:
-                # Se valor nao visto, usar o mais comum
-                data[col] = 0
-    
-    # 2. Criar features engenheiradas
-    data['Debt_Income_Ratio'] = data['Outstanding_Debt'] / (data['Annual_Income'] + 1)
-    data['Total_Credit_Usage'] = data['Num_Credit_Card'] * data['Credit_Utilization_Ratio']
-    data['Payment_Score'] = 100 - (data['Num_of_Delayed_Payment'] * 5)
-    data['Payment_Score'] = data['Payment_Score'].clip(0, 100)
-    
-    # 3. Garantir ordem correta das colunas
-    expected_features = ['Age', 'Occupation', 'Annual_Income', 'Monthly_Inhand_Salary',
-                        'Num_Bank_Accounts', 'Num_Credit_Card', 'Interest_Rate',
-                        'Num_of_Loan', 'Type_of_Loan', 'Delay_from_due_date',
-                        'Num_of_Delayed_Payment', 'Changed_Credit_Limit',
-                        'Num_Credit_Inquiries', 'Credit_Mix', 'Outstanding_Debt',
-                        'Credit_Utilization_Ratio', 'Credit_History_Age',
-                        'Payment_of_Min_Amount', 'Total_EMI_per_month',
-                        'Amount_invested_monthly', 'Payment_Behaviour',
-                        'Monthly_Balance', 'Debt_Income_Ratio', 'Total_Credit_Usage',
-                        'Payment_Score']
-    
-    data = data[expected_features]
+    Taxas e percentis de uma janela saem da diferenca entre dois snapshots
+    (src/api/metrics.py: snapshot_delta).
+    """
+    return METRICS.snapshot()
+
+# Endpoint de estado do log de predicoes
+@app.get("/monitoring/prediction-log")
+async def prediction_log_stats(current_user: User = Depends(get_current_active_user)):
+    """Contadores do log de predicoes (em buffer, gravadas, descartadas)."""
+    if PREDICTION_LOG is None:
+        return {"enabled": False, "log_errors": LOG_ERRORS}
+    return {"enabled": True, "log_errors": LOG_ERRORS, **PREDICTION_LOG.stats()}
+
+# Endpoint de estado da captura de trafego
+@app.get("/monitoring/capture")
+async def capture_stats(current_user: User = Depends(get_current_active_user)):
+    """Contadores da captura de trafego (capturadas, gravadas, descartadas)."""
+    if CAPTURE is None:
+        return {"enabled": False}
+    return {"enabled": True, **CAPTURE.stats()}
+
+# Funcoes auxiliares
+def success_response(credit_score, confidence) -> CreditScoreResponse:
+    """Resposta de uma linha pontuada."""
+    return CreditScoreResponse(
+        credit_score=credit_score,
+        confidence=float(confidence),
+        prediction_id=f"pred_{uuid.uuid4().hex[:8]}",
+        timestamp=datetime.now(),
+        risk_level=get_risk_level(credit_score),
+        recommendation=get_recommendation(credit_score)
+    )
+
+def error_response(error: Exception) -> CreditScoreResponse:
+    """Resposta de uma linha que nao pode ser pontuada."""
+    return CreditScoreResponse(
+        credit_score="Error",
+        confidence=0.0,
+        prediction_id=f"error_{uuid.uuid4().hex[:8]}",
+        timestamp=datetime.now(),
+        risk_level="Unknown",
+        recommendation=f"Erro ao processar: {str(error)}"
+    )
+
+def predict_items(items: List[CreditScoreInput]):
+    """
+    Pontua o lote linha a linha (caminho de erro do lote vetorizado).
     
-    # 4. Padronizar
-    data_scaled = ENCODERS['scaler'].transform(data)
+    Retorna (respostas na ordem dos itens, linhas transformadas, probabilidades
+    e scores apenas dos itens pontuados).
+    """
+    results, rows, probabilities, credit_scores = [], [], [], []
+    for item in items:
+        try:
+            input_data = prepare_input_data(item)
+            item_probabilities = MODEL.predict_proba(input_data)[0]
+            credit_score = ENCODERS['target'].inverse_transform(
+                [MODEL.classes_[item_probabilities.argmax()]])[0]
+            result = success_response(credit_score, item_probabilities.max())
+        except Exception as e:
+            results.append(error_response(e))
+            continue
+        results.append(result)
+        rows.append(input_data[0])
+        probabilities.append(item_probabilities)
+        credit_scores.append(credit_score)
+    return results, np.array(rows), np.array(probabilities), np.array(credit_scores)
+
+def log_predictions(input_data, probabilities, credit_scores, prediction_ids, endpoint,
+                    start_time, transformed_time, predicted_time):
+    """
+    Atualiza metricas e drift e envia as predicoes ao log em memoria.
     
-    return data_scaled
-
-def get_risk_level(credit_score: str) -> str:
-    """Determina nivel de risco baseado no score."""
-    if credit_score == "Good":
-        return "Low"
-    elif credit_score == "Standard":
-        return "Medium"
-    else:
-        return "High"
-
-def get_recommendation(credit_score: str) -> str:
-    """Gera recomendacao baseada no score."""
-    recommendations = {
-        "Good": "Cliente elegivel para credito com condicoes favoraveis",
-        "Standard": "Cliente elegivel para credito com condicoes padrao",
-        "Poor": "Recomenda-se analise adicional antes de aprovar credito"
+    Nunca levanta excecao: falhas sao contadas em LOG_ERRORS (a primeira e
+    impressa) e a predicao ja calculada e devolvida normalmente.
+    """
+    global LOG_ERRORS
+    try:
+        _log_predictions(input_data, probabilities, credit_scores, prediction_ids, endpoint,
+                         start_time, transformed_time, predicted_time)
+    except Exception as e:
+        LOG_ERRORS += 1
+        if LOG_ERRORS == 1:
+            print(f">> Erro ao registrar predicoes (contando as proximas): {e}")
+
+def _log_predictions(input_data, probabilities, credit_scores, prediction_ids, endpoint,
+                     start_time, transformed_time, predicted_time):
+    """Corpo de log_predictions (pode levantar excecao)."""
+    if DRIFT_MONITOR is not None:
+        DRIFT_MONITOR.update(unscale(input_data, ENCODERS['transformer']))
+    timings_ms = {
+        'transform': (transformed_time - start_time) * 1000,
+        'predict': (predicted_time - transformed_time) * 1000,
+        'total': (time.perf_counter() - start_time) * 1000,
     }
-    return recommendations.get(credit_score, "Score nao reconhecido")
+    METRICS.record_stages(endpoint, timings_ms)
+    if endpoint == "/predict/batch":
+        METRICS.record_batch(len(input_data))
+    if PREDICTION_LOG is None:
+        return
+    PREDICTION_LOG.log(input_data, probabilities, credit_scores, prediction_ids, endpoint,
+                       MODEL_VERSION, timings_ms)
+
+def to_feature_record(request: CreditScoreInput) -> dict:
+    """Converte os campos da API (snake_case) para as colunas do dataset."""
+    return {FIELD_TO_COLUMN[field]: value for field, value in request.dict().items()}
+
+def prepare_input_data(request: CreditScoreInput) -> np.ndarray:
+    """Prepara dados de entrada para o modelo (caminho de uma linha)."""
+    return ENCODERS['transformer'].transform_one(to_feature_record(request))
+
+def prepare_batch_data(requests: List[CreditScoreInput]) -> np.ndarray:
+    """Prepara um lote de entradas com a transformacao vetorizada."""
+    data = to_feature_frame(pd.DataFrame([item.dict() for item in requests]))
+    return ENCODERS['transformer'].transform(data)
 
 # Endpoint raiz
 @app.get("/")
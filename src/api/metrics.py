@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Metricas de desempenho da API em memoria
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Cada requisicao incrementa contadores e histogramas de latencia com buckets
+logaritmicos fixos (custo O(1), sem guardar amostras). GET /metrics devolve
+apenas os valores acumulados desde o inicio do processo, com os
+histogramas esparsos (so buckets nao vazios): quem consulta guarda o
+snapshot anterior e calcula taxas e percentis da janela pela diferenca
+(snapshot_delta), de forma que consultar com frequencia custa quase nada
+para a API.
+
+Com varios workers (uvicorn --workers), cada processo tem suas metricas;
+o snapshot informa o pid. A coleta por requisicao e o MetricsMiddleware.
+"""
+
+import math
+import os
+import threading
+import time
+
+# Histogramas de latencia: 0.01 ms a 60 s, ~6% de resolucao
+LATENCY_MIN_MS = 0.01
+LATENCY_MAX_MS = 60_000
+BUCKETS_PER_DECADE = 40
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    """Histograma com buckets logaritmicos fixos (bucket 0 = abaixo do minimo)."""
+
+    def __init__(self, min_value=LATENCY_MIN_MS, max_value=LATENCY_MAX_MS,
+                 buckets_per_decade=BUCKETS_PER_DECADE):
+        self.min_value = min_value
+        self.buckets_per_decade = buckets_per_decade
+        self.n_buckets = math.ceil(math.log10(max_value / min_value) * buckets_per_decade) + 2
+        self.counts = [0] * self.n_buckets
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, value):
+        """Conta um valor (O(1))."""
+        if value <= self.min_value:
+            index = 0
+        else:
+            index = min(int(math.log10(value / self.min_value) * self.buckets_per_decade) + 1,
+                        self.n_buckets - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+
+    def sparse(self):
+        """Buckets nao vazios: {indice: contagem}."""
+        return {index: count for index, count in enumerate(self.counts) if count}
+
+
+def bucket_upper_bound(index, min_value=LATENCY_MIN_MS, buckets_per_decade=BUCKETS_PER_DECADE):
+    """Limite superior do bucket (valor reportado para percentis)."""
+    return min_value * 10 ** (index / buckets_per_decade)
+
+
+def percentiles(sparse_counts, quantiles=PERCENTILES, min_value=LATENCY_MIN_MS,
+                buckets_per_decade=BUCKETS_PER_DECADE):
+    """Percentis de um histograma esparso ({indice: contagem}); None se vazio."""
+    items = sorted((int(index), count) for index, count in sparse_counts.items() if count > 0)
+    total = sum(count for _, count in items)
+    if total == 0:
+        return {f"p{q}": None for q in quantiles}
+    result = {}
+    for q in quantiles:
+        rank = math.ceil(q / 100 * total)
+        seen = 0
+        for index, count in items:
+            seen += count
+            if seen >= rank:
+                result[f"p{q}"] = bucket_upper_bound(index, min_value, buckets_per_decade)
+                break
+    return result
+
+
+class MetricsRegistry:
+    """Contadores e histogramas da API (seguro entre threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.endpoints = {}
+        self.stages = {}
+        self.batch_sizes = {}
+        self.in_flight = 0
+        self._busy_seconds = 0.0
+        self._busy_since = None
+
+    def request_started(self):
+        """Marca uma requisicao em andamento (tempo ocupado = ao menos uma em andamento)."""
+        with self._lock:
+            if self.in_flight == 0:
+                self._busy_since = time.perf_counter()
+            self.in_flight += 1
+
+    def request_finished(self, endpoint, status_code, duration_ms):
+        """Conta a requisicao concluida com status e latencia."""
+        with self._lock:
+            self.in_flight -= 1
+            if self.in_flight == 0 and self._busy_since is not None:
+                self._busy_seconds += time.perf_counter() - self._busy_since
+                self._busy_since = None
+
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {'requests': 0, 'errors': 0,
+                                                    'rate_limited': 0, 'latency': Histogram()}
+            stats['requests'] += 1
+            if status_code == 429:
+                stats['rate_limited'] += 1
+            elif status_code >= 500:
+                stats['errors'] += 1
+            stats['latency'].record(duration_ms)
+
+    def record_stages(self, endpoint, timings_ms):
+        """Latencia de cada etapa (ex: transform, predict) de um endpoint."""
+        with self._lock:
+            stages = self.stages.setdefault(endpoint, {})
+            for stage, value in timings_ms.items():
+                histogram = stages.get(stage)
+                if histogram is None:
+                    histogram = stages[stage] = Histogram()
+                histogram.record(value)
+
+    def record_batch(self, size):
+        """Tamanho de um lote de predicoes."""
+        with self._lock:
+            self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+
+    def busy_seconds(self):
+        """Tempo acumulado com ao menos uma requisicao em andamento."""
+        with self._lock:
+            busy = self._busy_seconds
+            if self._busy_since is not None:
+                busy += time.perf_counter() - self._busy_since
+            return busy
+
+    def snapshot(self):
+        """Valores acumulados, com histogramas esparsos e percentis desde o inicio."""
+        busy = self.busy_seconds()
+        with self._lock:
+            endpoints = {}
+            for name, stats in self.endpoints.items():
+                latency = stats['latency'].sparse()
+                endpoints[name] = {'requests': stats['requests'], 'errors': stats['errors'],
+                                   'rate_limited': stats['rate_limited'],
+                                   'latency_ms': latency, **percentiles(latency)}
+            stages = {endpoint: {stage: histogram.sparse() for stage, histogram in items.items()}
+                      for endpoint, items in self.stages.items()}
+            return {
+                'timestamp': time.time(),
+                'pid': os.getpid(),
+                'uptime_s': time.time() - self.started,
+                'in_flight': self.in_flight,
+                'busy_seconds': busy,
+                'histogram': {'min_ms': LATENCY_MIN_MS, 'buckets_per_decade': BUCKETS_PER_DECADE},
+                'endpoints': endpoints,
+                'stages': stages,
+                'batch_sizes': dict(self.batch_sizes),
+            }
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede latencia e status de cada requisicao, pela rota.
+
+    ASGI puro (como CaptureMiddleware): sem o BaseHTTPMiddleware, a medicao
+    nao adiciona uma tarefa e filas de mensagens ao caminho medido.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = {'code': 500}
+
+        async def send_status(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        self.metrics.request_started()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            # O roteador grava a rota no scope (path com parametros, ex: /predict/batch)
+            route = scope.get('route')
+            endpoint = route.path if route is not None else "other"
+            self.metrics.request_finished(endpoint, status['code'],
+                                          (time.perf_counter() - start) * 1000)
+
+
+def _sparse_delta(current, previous):
+    """Diferenca entre histogramas esparsos (chaves podem vir como texto do JSON)."""
+    previous = {int(index): count for index, count in (previous or {}).items()}
+    delta = {}
+    for index, count in current.items():
+        diff = count - previous.get(int(index), 0)
+        if diff > 0:
+            delta[int(index)] = diff
+    return delta
+
+
+def snapshot_delta(previous, current):
+    """
+    Taxas e percentis da janela entre dois snapshots do mesmo processo.
+
+    Se o processo mudou (pid ou reinicio), a janela e desde o inicio de current.
+    """
+    if (previous is None or previous['pid'] != current['pid']
+            or current['uptime_s'] < previous['uptime_s']):
+        previous = {'timestamp': current['timestamp'] - current['uptime_s'], 'busy_seconds': 0.0,
+                    'endpoints': {}, 'stages': {}, 'batch_sizes': {}}
+    elapsed = max(current['timestamp'] - previous['timestamp'], 1e-9)
+
+    endpoints = {}
+    for name, stats in current['endpoints'].items():
+        before = previous['endpoints'].get(name, {})
+        requests = stats['requests'] - before.get('requests', 0)
+        latency = _sparse_delta(stats['latency_ms'], before.get('latency_ms'))
+        endpoints[name] = {
+            'requests': requests,
+            'rate_per_s': requests / elapsed,
+            'errors': stats['errors'] - before.get('errors', 0),
+            'rate_limited': stats['rate_limited'] - before.get('rate_limited', 0),
+            **percentiles(latency),
+        }
+
+    stages = {}
+    for endpoint, items in current['stages'].items():
+        for stage, counts in items.items():
+            before = previous['stages'].get(endpoint, {}).get(stage)
+            stages[f"{endpoint} {stage}"] = percentiles(_sparse_delta(counts, before))
+
+    sizes_before = {int(size): count for size, count in previous['batch_sizes'].items()}
+    batch_sizes = {int(size): count - sizes_before.get(int(size), 0)
+                   for size, count in current['batch_sizes'].items()}
+
+    return {
+        'elapsed_s': elapsed,
+        'rate_per_s': sum(stats['requests'] for stats in endpoints.values()) / elapsed,
+        'rate_limited': sum(stats['rate_limited'] for stats in endpoints.values()),
+        'utilization': min((current['busy_seconds'] - previous['busy_seconds']) / elapsed, 1.0),
+        'in_flight': current['in_flight'],
+        'endpoints': endpoints,
+        'stages': stages,
+        'batch_sizes': {size: count for size, count in sorted(batch_sizes.items()) if count > 0},
+    }
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Log de predicoes da API sem bloquear as requisicoes
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+/predict e /predict/batch apenas anexam os arrays ja calculados (features,
+probabilidades, classe, versao do modelo e tempos) a um buffer em memoria.
+Uma thread de escrita esvazia o buffer periodicamente e grava tudo de uma vez
+em arquivos Parquet, trocando de arquivo por numero de linhas ou idade e
+apagando os mais antigos alem do limite. O arquivo em escrita tem extensao
+.parquet.tmp; so arquivos fechados aparecem como .parquet.
+
+O buffer tem capacidade fixa em linhas: cheio, o lote novo e descartado e
+contado em `dropped`, de forma que o log nunca bloqueia nem esgota a memoria
+do servidor.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+
+class PredictionLog:
+    """Buffer limitado de predicoes com escrita Parquet em segundo plano."""
+
+    def __init__(self, directory, feature_names, class_names, capacity=100_000,
+                 flush_interval=5.0, rows_per_file=500_000, file_seconds=3600, max_files=48):
+        self.directory = Path(directory)
+        self.feature_names = list(feature_names)
+        self.class_names = [str(name) for name in class_names]
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.rows_per_file = rows_per_file
+        self.file_seconds = file_seconds
+        self.max_files = max_files
+
+        self._lock = threading.Lock()
+        self._blocks = []
+        self._buffered = 0
+        self.dropped = 0
+        self.written = 0
+
+        self._writer = None
+        self._file_rows = 0
+        self._file_opened = 0.0
+        self._file_path = None
+        self._stop = threading.Event()
+        self._flush_now = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+        self._thread.start()
+
+    def log(self, features, probabilities, credit_scores, prediction_ids, endpoint,
+            model_version, timings_ms):
+        """
+        Anexa um lote de predicoes ao buffer (O(1), nunca bloqueia).
+
+        features/probabilities: arrays (linhas x colunas); timings_ms: {etapa: ms}
+        do request inteiro. Retorna False se o lote foi descartado.
+        """
+        rows = len(features)
+        block = (time.time(), np.asarray(features), np.asarray(probabilities),
+                 list(credit_scores), list(prediction_ids), endpoint, model_version, timings_ms)
+        with self._lock:
+            if self._buffered + rows > self.capacity:
+                self.dropped += rows
+                return False
+            self._blocks.append(block)
+            self._buffered += rows
+        return True
+
+    def stats(self):
+        """Contadores do log."""
+        files = len(self._files())
+        with self._lock:
+            return {'buffered': self._buffered, 'dropped': self.dropped,
+                    'written': self.written, 'capacity': self.capacity, 'files': files}
+
+    def flush(self, timeout=None):
+        """Pede uma escrita imediata e espera o buffer esvaziar."""
+        self._flush_now.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._buffered and self._thread.is_alive():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self):
+        """Grava o que restou, fecha o arquivo atual e encerra a thread."""
+        self._stop.set()
+        self._flush_now.set()
+        self._thread.join()
+
+    def _run(self):
+        """Laco da thread de escrita."""
+        while not self._stop.is_set():
+            self._flush_now.wait(self.flush_interval)
+            self._flush_now.clear()
+            self._write_pending()
+            if self._writer is not None and time.time() - self._file_opened > self.file_seconds:
+                self._close_file()
+        self._write_pending()
+        self._close_file()
+
+    def _write_pending(self):
+        """Troca o buffer por um vazio e grava os blocos em um unico row group."""
+        with self._lock:
+            blocks, self._blocks = self._blocks, []
+        if not blocks:
+            return
+
+        rows = sum(len(block[1]) for block in blocks)
+        try:
+            self._write_table(self._to_table(blocks))
+            written = True
+        except Exception as e:
+            # Falha de escrita (ex: disco cheio) descarta o lote sem parar a thread
+            print(f">> Erro ao gravar log de predicoes: {e}")
+            written = False
+        with self._lock:
+            self._buffered -= rows
+            if written:
+                self.written += rows
+            else:
+                self.dropped += rows
+
+    def _to_table(self, blocks):
+        """Monta a tabela colunar de todos os blocos de uma vez."""
+        import pyarrow as pa
+
+        counts = [len(block[1]) for block in blocks]
+        features = np.concatenate([block[1] for block in blocks]).astype(np.float32)
+        probabilities = np.concatenate([block[2] for block in blocks]).astype(np.float32)
+        stages = sorted({stage for block in blocks for stage in block[7]})
+
+        columns = {
+            'timestamp': pa.array((np.repeat([block[0] for block in blocks], counts) * 1e6)
+                                  .astype(np.int64)).cast(pa.timestamp('us')),
+            'prediction_id': pa.array([pid for block in blocks for pid in block[4]]),
+            'endpoint': pa.array(np.repeat([block[5] for block in blocks], counts)),
+            'model_version': pa.array(np.repeat([str(block[6]) for block in blocks], counts)),
+            'batch_size': pa.array(np.repeat(counts, counts).astype(np.int32)),
+            'credit_score': pa.array([str(score) for block in blocks for score in block[3]]),
+        }
+        for stage in stages:
+            times = [block[7].get(stage, np.nan) for block in blocks]
+            columns[f"{stage}_ms"] = pa.array(np.repeat(times, counts).astype(np.float32))
+        for i, name in enumerate(self.class_names):
+            columns[f"proba_{name}"] = pa.array(probabilities[:, i])
+        for i, name in enumerate(self.feature_names):
+            columns[f"feature_{name}"] = pa.array(features[:, i])
+        return pa.table(columns)
+
+    def _write_table(self, table):
+        """Grava no arquivo atual, trocando de arquivo por linhas (ou idade, em _run)."""
+        import pyarrow.parquet as pq
+
+        if self._writer is not None and not self._writer.schema.equals(table.schema):
+            self._close_file()  # etapas de tempo diferentes: novo arquivo
+        if self._writer is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Nome ordenavel pelo horario; o pid separa workers do mesmo servidor
+            name = f"predictions_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}"
+            self._file_path = self.directory / f"{name}.parquet"
+            self._writer = pq.ParquetWriter(self._file_path.with_suffix(".parquet.tmp"),
+                                            table.schema, compression="snappy")
+            self._file_rows = 0
+            self._file_opened = time.time()
+
+        self._writer.write_table(table)
+        self._file_rows += table.num_rows
+        if self._file_rows >= self.rows_per_file:
+            self._close_file()
+
+    def _close_file(self):
+        """Fecha o arquivo atual (so entao ele ganha a extensao .parquet)."""
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._file_path.with_suffix(".parquet.tmp").rename(self._file_path)
+        self._writer = None
+
+        # Rotacao: manter apenas os max_files mais recentes
+        for old in self._files()[:-self.max_files]:
+            old.unlink(missing_ok=True)
+
+    def _files(self):
+        """Arquivos completos, do mais antigo ao mais recente."""
+        return sorted(self.directory.glob("predictions_*.parquet"))
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Pontuacao compartilhada entre a API e o modo local da aplicacao Streamlit
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Carrega o pacote do modelo mais recente (modelo + encoders) e pontua lotes
+com o mesmo FeatureTransformer usado pela API, vetorizado sobre o DataFrame
+inteiro. Nao depende de FastAPI, para ser importado pela aplicacao.
+"""
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config import MODELS_DIR
+from src.features.transform import FIELD_TO_COLUMN
+from src.modeling.artifacts import latest_model_dir, load_model_artifact
+
+# Nivel de risco e recomendacao por score
+RISK_LEVELS = {"Good": "Low", "Standard": "Medium"}
+RECOMMENDATIONS = {
+    "Good": "Cliente elegivel para credito com condicoes favoraveis",
+    "Standard": "Cliente elegivel para credito com condicoes padrao",
+    "Poor": "Recomenda-se analise adicional antes de aprovar credito"
+}
+
+
+def load_bundle(models_dir=MODELS_DIR):
+    """Modelo mais recente, encoders e versao (pelo timestamp do nome)."""
+    model_dir = latest_model_dir(models_dir)
+    if model_dir is None:
+        raise FileNotFoundError("Nenhum modelo encontrado!")
+    return {
+        'model': load_model_artifact(model_dir),
+        'encoders': joblib.load(model_dir / "encoders.pkl"),
+        'version': model_dir.name.split("_")[-1],
+        'model_dir': model_dir,
+    }
+
+
+def get_risk_level(credit_score: str) -> str:
+    """Determina nivel de risco baseado no score."""
+    return RISK_LEVELS.get(credit_score, "High")
+
+
+def get_recommendation(credit_score: str) -> str:
+    """Gera recomendacao baseada no score."""
+    return RECOMMENDATIONS.get(credit_score, "Score nao reconhecido")
+
+
+def to_feature_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """Converte colunas com os campos da API (snake_case) para as do dataset."""
+    missing = [field for field in FIELD_TO_COLUMN if field not in data.columns]
+    if missing:
+        raise ValueError(f"Colunas ausentes: {', '.join(missing)}")
+    return data[list(FIELD_TO_COLUMN)].rename(columns=FIELD_TO_COLUMN)
+
+
+def score_frame(bundle, data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pontua todas as linhas de uma vez (transformacao e predicao vetorizadas).
+
+    Retorna credit_score, confidence, risk_level e recommendation, com o
+    mesmo indice de data.
+    """
+    model, encoders = bundle['model'], bundle['encoders']
+    X = encoders['transformer'].transform(to_feature_frame(data))
+    probabilities = model.predict_proba(X)
+    credit_scores = pd.Series(
+        encoders['target'].inverse_transform(model.classes_[probabilities.argmax(axis=1)]),
+        index=data.index
+    )
+    return pd.DataFrame({
+        'credit_score': credit_scores,
+        'confidence': probabilities.max(axis=1).astype(np.float64),
+        'risk_level': credit_scores.map(RISK_LEVELS).fillna("High"),
+        'recommendation': credit_scores.map(RECOMMENDATIONS).fillna("Score nao reconhecido"),
+    }, index=data.index)
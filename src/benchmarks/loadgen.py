@@ -0,0 +1,516 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de carga HTTP para a API (malha fechada e malha aberta)
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Autentica uma vez e dispara /predict e /predict/batch com uma mistura de
+requisicoes geradas a partir do dataset sintetico: clientes repetidos com
+popularidade de Zipf (poucos clientes concentram as consultas) e lotes de
+tamanhos variados.
+
+Dois modos:
+- fechado (--mode closed): N usuarios simultaneos, cada um envia a proxima
+  requisicao quando recebe a resposta. Mede a vazao maxima com N em voo.
+- aberto (--mode open): requisicoes chegam em taxa fixa (ou Poisson),
+  independente das respostas. A latencia conta a partir do horario
+  previsto de envio, entao atrasos do servidor (e da fila do proprio
+  gerador) aparecem nos percentis em vez de reduzir a carga (sem
+  "coordinated omission").
+
+Reporta vazao, percentis de latencia (histograma logaritmico, o mesmo das
+metricas da API), taxas de erro e de 429, CPU e memoria (RSS) do processo
+do servidor via /proc e a janela de GET /metrics da propria API.
+
+Uso:
+    python src/benchmarks/loadgen.py --start-server --no-rate-limit --mode closed --concurrency 8
+    python src/benchmarks/loadgen.py --url http://localhost:8000 --mode open --rate 50 --duration 60
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config import PROJECT_ROOT, RANDOM_STATE
+from src.api.metrics import Histogram, percentiles, snapshot_delta
+from src.benchmarks.microbench import BENCH_DIR, hardware_info
+from src.features.generate_synthetic_data import generate_api_payloads
+
+API_URL = "http://localhost:8000"
+USERNAME = "admin"
+PASSWORD = "quantumfinance123"
+
+# Mistura padrao: 10% de lotes, com tamanhos (tamanho, peso)
+BATCH_FRACTION = 0.1
+BATCH_SIZE_MIX = ((10, 0.5), (50, 0.3), (100, 0.2))
+# Clientes distintos e expoente de Zipf da popularidade
+PAYLOAD_POOL = 5_000
+ZIPF_EXPONENT = 1.1
+# Requisicoes pre-serializadas (reusadas em ciclo)
+REQUEST_POOL = 20_000
+
+QUANTILES = (50, 90, 99, 99.9)
+REQUEST_TIMEOUT_S = 60
+SAMPLE_INTERVAL_S = 0.5
+
+
+def build_requests(n_requests, batch_fraction=BATCH_FRACTION, batch_sizes=BATCH_SIZE_MIX,
+                   pool_size=PAYLOAD_POOL, zipf_exponent=ZIPF_EXPONENT, seed=RANDOM_STATE):
+    """
+    Requisicoes prontas para envio: [(endpoint, corpo JSON em bytes, linhas)].
+
+    Os clientes de cada requisicao sao sorteados com peso 1/posicao^zipf
+    entre pool_size clientes sinteticos; o corpo ja serializado deixa o
+    custo do gerador fora da medida.
+    """
+    rng = np.random.default_rng(seed)
+    payloads = generate_api_payloads(pool_size, seed)
+    weights = 1.0 / np.arange(1, pool_size + 1) ** zipf_exponent
+    weights /= weights.sum()
+    sizes, size_weights = zip(*batch_sizes)
+    size_weights = np.asarray(size_weights) / sum(size_weights)
+
+    requests_ = []
+    for is_batch in rng.random(n_requests) < batch_fraction:
+        if is_batch:
+            size = int(rng.choice(sizes, p=size_weights))
+            rows = rng.choice(pool_size, size=size, p=weights)
+            body = {'predictions': [payloads[i] for i in rows]}
+            requests_.append(("/predict/batch", json.dumps(body).encode('utf-8'), size))
+        else:
+            body = payloads[rng.choice(pool_size, p=weights)]
+            requests_.append(("/predict", json.dumps(body).encode('utf-8'), 1))
+    return requests_
+
+
+def login(api_url, username=USERNAME, password=PASSWORD):
+    """Token JWT (uma autenticacao para o teste inteiro)."""
+    response = requests.post(f"{api_url}/token", data={'username': username, 'password': password},
+                             timeout=REQUEST_TIMEOUT_S)
+    response.raise_for_status()
+    return response.json()['access_token']
+
+
+class LoadStats:
+    """Contagens e histogramas por endpoint (seguro entre threads)."""
+
+    def __init__(self, measure_from=0.0):
+        self._lock = threading.Lock()
+        self.measure_from = measure_from
+        self.endpoints = {}
+
+    def record(self, endpoint, status_code, rows, intended, sent, finished):
+        """
+        Conta uma requisicao concluida (status None = falha de conexao).
+
+        latency: do horario previsto ao fim; service: do envio ao fim. So
+        entram requisicoes previstas depois do aquecimento (measure_from).
+        """
+        if intended < self.measure_from:
+            return
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {
+                    'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0, 'rows': 0,
+                    'latency': Histogram(), 'service': Histogram()}
+            stats['requests'] += 1
+            if status_code == 429:
+                stats['rate_limited'] += 1
+            elif status_code is None or status_code >= 400:
+                stats['errors'] += 1
+            else:
+                stats['ok'] += 1
+                stats['rows'] += rows
+            stats['latency'].record((finished - intended) * 1000)
+            stats['service'].record((finished - sent) * 1000)
+
+    def summary(self, elapsed_s):
+        """Vazao, taxas e percentis por endpoint e no total."""
+        with self._lock:
+            endpoints = {}
+            total = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0, 'rows': 0}
+            latency_all = {}
+            for name, stats in self.endpoints.items():
+                counts = {key: stats[key] for key in total}
+                for key in total:
+                    total[key] += counts[key]
+                latency = stats['latency'].sparse()
+                for index, count in latency.items():
+                    latency_all[index] = latency_all.get(index, 0) + count
+                endpoints[name] = {**counts, **self._rates(counts, elapsed_s),
+                                   'latency_ms': percentiles(latency, QUANTILES),
+                                   'service_ms': percentiles(stats['service'].sparse(), QUANTILES)}
+            return {'elapsed_s': elapsed_s, **total, **self._rates(total, elapsed_s),
+                    'latency_ms': percentiles(latency_all, QUANTILES), 'endpoints': endpoints}
+
+    @staticmethod
+    def _rates(counts, elapsed_s):
+        requests_ = max(counts['requests'], 1)
+        return {'throughput_rps': counts['ok'] / elapsed_s,
+                'rows_per_s': counts['rows'] / elapsed_s,
+                'error_rate': counts['errors'] / requests_,
+                'rate_limited_rate': counts['rate_limited'] / requests_}
+
+
+class Sender:
+    """Envia requisicoes com uma sessao HTTP por thread."""
+
+    def __init__(self, api_url, token, stats, timeout=REQUEST_TIMEOUT_S):
+        self.api_url = api_url
+        self.headers = {'Authorization': f"Bearer {token}", 'Content-Type': 'application/json'}
+        self.stats = stats
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return session
+
+    def send(self, request, intended=None):
+        """
+        Envia e registra; intended e o horario previsto (malha aberta).
+
+        Retorna a resposta (None em falha de conexao).
+        """
+        endpoint, body, rows = request
+        sent = time.perf_counter()
+        try:
+            response = self._session().post(f"{self.api_url}{endpoint}", data=body,
+                                            headers=self.headers, timeout=self.timeout)
+        except requests.RequestException:
+            response = None
+        self.stats.record(endpoint, None if response is None else response.status_code, rows,
+                          sent if intended is None else intended, sent, time.perf_counter())
+        return response
+
+
+def run_closed_loop(sender, requests_, concurrency, duration_s):
+    """N usuarios simultaneos enviando em sequencia ate o fim do tempo."""
+    deadline = time.perf_counter() + duration_s
+    counter = iter(range(10 ** 12))
+    lock = threading.Lock()
+
+    def user():
+        while time.perf_counter() < deadline:
+            with lock:
+                i = next(counter)
+            sender.send(requests_[i % len(requests_)])
+
+    threads = [threading.Thread(target=user, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def arrival_offsets(rate, duration_s, poisson=False, seed=RANDOM_STATE):
+    """Horarios de chegada (s desde o inicio): intervalos fixos ou exponenciais."""
+    n = int(rate * duration_s)
+    if not poisson:
+        return np.arange(n) / rate
+    gaps = np.random.default_rng(seed).exponential(1.0 / rate, n)
+    offsets = np.cumsum(gaps) - gaps[0]
+    return offsets[offsets < duration_s]
+
+
+def run_schedule(send, items, offsets, max_workers, keep_results=False):
+    """
+    Entrega cada item a send(item, intended) no seu horario, sem esperar respostas.
+
+    O pool tem max_workers threads; se todas estiverem ocupadas o item
+    espera na fila e essa espera entra na latencia. Retorna (atrasados,
+    futures): atrasados sao os entregues depois do horario (o proprio
+    gerador nao acompanhou a taxa); futures so com keep_results.
+    """
+    late = 0
+    futures = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for item, offset in zip(items, offsets):
+            intended = start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -0.01:
+                late += 1
+            future = pool.submit(send, item, intended)
+            if keep_results:
+                futures.append(future)
+    return late, futures
+
+
+def run_open_loop(sender, requests_, rate, duration_s, max_workers, poisson=False):
+    """Chegadas em taxa fixa (ou Poisson); retorna quantas atrasaram no gerador."""
+    offsets = arrival_offsets(rate, duration_s, poisson)
+    items = (requests_[i % len(requests_)] for i in range(len(offsets)))
+    late, _ = run_schedule(sender.send, items, offsets, max_workers)
+    return late
+
+
+def _process_tree(pid):
+    """pid e seus descendentes (workers do uvicorn)."""
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def read_process(pid):
+    """(segundos de CPU, RSS em MB) do processo e descendentes via /proc."""
+    ticks = os.sysconf('SC_CLK_TCK')
+    page_mb = os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    cpu_s, rss_mb = 0.0, 0.0
+    for current in _process_tree(pid):
+        try:
+            with open(f"/proc/{current}/stat") as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            cpu_s += (int(fields[11]) + int(fields[12])) / ticks
+            rss_mb += int(fields[21]) * page_mb
+        except (OSError, IndexError, ValueError):
+            continue
+    return cpu_s, rss_mb
+
+
+class ProcessSampler:
+    """Amostra CPU e RSS do servidor em uma thread durante o teste."""
+
+    def __init__(self, pid, interval_s=SAMPLE_INTERVAL_S):
+        self.pid = pid
+        self.interval_s = interval_s
+        self.rss_samples = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+
+    def start(self):
+        self._start = (time.perf_counter(), *read_process(self.pid))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self.rss_samples.append(read_process(self.pid)[1])
+
+    def stop(self):
+        """CPU media (% de um nucleo) e RSS medio/maximo no periodo."""
+        self._stop.set()
+        self._thread.join()
+        end_time, end_cpu, end_rss = time.perf_counter(), *read_process(self.pid)
+        start_time, start_cpu, start_rss = self._start
+        samples = [start_rss] + self.rss_samples + [end_rss]
+        return {
+            'pid': self.pid,
+            'cpu_seconds': end_cpu - start_cpu,
+            'cpu_percent': 100 * (end_cpu - start_cpu) / max(end_time - start_time, 1e-9),
+            'rss_mb_mean': float(np.mean(samples)),
+            'rss_mb_max': float(np.max(samples)),
+        }
+
+
+def fetch_metrics(api_url, token):
+    """Snapshot de GET /metrics (None se indisponivel)."""
+    try:
+        response = requests.get(f"{api_url}/metrics", headers={'Authorization': f"Bearer {token}"},
+                                timeout=REQUEST_TIMEOUT_S)
+        return response.json() if response.status_code == 200 else None
+    except requests.RequestException:
+        return None
+
+
+def start_server(port, workers=1, rate_limit=True, timeout_s=120):
+    """Sobe a API com uvicorn e espera /health responder."""
+    env = dict(os.environ)
+    if not rate_limit:
+        env['QF_RATE_LIMIT_ENABLED'] = '0'
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env)
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Servidor terminou com codigo {process.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Servidor nao respondeu /health a tempo")
+
+
+def run_load(api_url, token, requests_, mode='closed', concurrency=8, rate=20.0,
+             duration_s=30.0, warmup_s=5.0, max_workers=256, poisson=False, server_pid=None):
+    """Executa o teste e retorna o relatorio (cliente, servidor e /metrics)."""
+    stats = LoadStats()
+    sender = Sender(api_url, token, stats)
+    sampler = ProcessSampler(server_pid) if server_pid else None
+    metrics_before = None
+
+    total_s = warmup_s + duration_s
+    start = time.perf_counter()
+    stats.measure_from = start + warmup_s
+
+    def measure():
+        # Amostras do servidor comecam junto com a janela medida
+        nonlocal metrics_before
+        time.sleep(warmup_s)
+        metrics_before = fetch_metrics(api_url, token)
+        if sampler is not None:
+            sampler.start()
+
+    measurer = threading.Thread(target=measure, daemon=True)
+    measurer.start()
+
+    late = 0
+    if mode == 'closed':
+        run_closed_loop(sender, requests_, concurrency, total_s)
+    else:
+        late = run_open_loop(sender, requests_, rate, total_s, max_workers, poisson)
+    measurer.join()
+    # Janela medida: ao menos a duracao prevista (chegadas de Poisson terminam antes)
+    elapsed_s = max(time.perf_counter() - stats.measure_from, duration_s)
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'hardware': hardware_info(),
+        'config': {'mode': mode, 'api_url': api_url, 'duration_s': duration_s,
+                   'warmup_s': warmup_s, 'concurrency': concurrency if mode == 'closed' else None,
+                   'rate': rate if mode == 'open' else None, 'poisson': poisson,
+                   'max_workers': max_workers if mode == 'open' else None},
+        'client': stats.summary(elapsed_s),
+        'late_arrivals': late,
+        'server': sampler.stop() if sampler is not None else None,
+        'server_metrics': None,
+    }
+    metrics_after = fetch_metrics(api_url, token)
+    if metrics_before is not None and metrics_after is not None:
+        report['server_metrics'] = snapshot_delta(metrics_before, metrics_after)
+    return report
+
+
+def print_report(report):
+    """Imprime o resumo do teste."""
+    client = report['client']
+    config = report['config']
+    load = (f"{config['concurrency']} usuarios" if config['mode'] == 'closed'
+            else f"{config['rate']:.1f} req/s")
+    print(f"\nResultado ({config['mode']}, {load}, {client['elapsed_s']:.1f}s medidos):")
+    print(f"   - Vazao: {client['throughput_rps']:.1f} req/s ({client['rows_per_s']:.1f} linhas/s)")
+    print(f"   - Erros: {client['error_rate']:.2%} | 429: {client['rate_limited_rate']:.2%}")
+    for name, stats in sorted(client['endpoints'].items()):
+        latency = stats['latency_ms']
+        text = " | ".join(f"{q} {value:.1f}" for q, value in latency.items() if value is not None)
+        print(f"   - {name:<16} {stats['requests']:7d} req | latencia ms: {text}")
+    if report['late_arrivals']:
+        print(f"   - AVISO: {report['late_arrivals']} chegadas atrasadas no gerador "
+              f"(aumente --max-workers ou rode o gerador em outra maquina)")
+    server = report['server']
+    if server is not None:
+        print(f"   - Servidor: CPU {server['cpu_percent']:.0f}% | RSS medio "
+              f"{server['rss_mb_mean']:.0f} MB, maximo {server['rss_mb_max']:.0f} MB")
+    if report['server_metrics'] is not None:
+        print(f"   - Utilizacao da API (/metrics): {report['server_metrics']['utilization']:.0%}")
+
+
+def main():
+    """Executa o teste de carga pela linha de comando."""
+    parser = argparse.ArgumentParser(description="Gerador de carga HTTP da API")
+    parser.add_argument("--url", default=API_URL, help="URL da API")
+    parser.add_argument("--mode", choices=['closed', 'open'], default='closed')
+    parser.add_argument("--concurrency", type=int, default=8, help="Usuarios (malha fechada)")
+    parser.add_argument("--rate", type=float, default=20.0, help="Requisicoes/s (malha aberta)")
+    parser.add_argument("--poisson", action="store_true", help="Chegadas de Poisson (malha aberta)")
+    parser.add_argument("--max-workers", type=int, default=256,
+                        help="Requisicoes em voo no maximo (malha aberta)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos medidos")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Segundos de aquecimento")
+    parser.add_argument("--batch-fraction", type=float, default=BATCH_FRACTION,
+                        help="Fracao de requisicoes em lote")
+    parser.add_argument("--zipf", type=float, default=ZIPF_EXPONENT,
+                        help="Expoente de popularidade dos clientes")
+    parser.add_argument("--username", default=USERNAME)
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--token", default=None, help="Token JWT ja emitido (pula o login)")
+    parser.add_argument("--server-pid", type=int, default=None, help="PID do servidor (CPU/RSS)")
+    parser.add_argument("--start-server", action="store_true", help="Sobe a API com uvicorn")
+    parser.add_argument("--port", type=int, default=8001, help="Porta com --start-server")
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="Desliga o rate limiting do servidor iniciado")
+    parser.add_argument("--output", default=None, help="Arquivo JSON do relatorio")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("TESTE DE CARGA - QUANTUMFINANCE")
+    print("="*60)
+
+    # 1. Servidor
+    server = None
+    api_url, server_pid = args.url, args.server_pid
+    if args.start_server:
+        print("\nIniciando API...")
+        server = start_server(args.port, args.workers, rate_limit=not args.no_rate_limit)
+        api_url, server_pid = f"http://127.0.0.1:{args.port}", server.pid
+        print(f"   - {api_url} (pid {server_pid})")
+
+    try:
+        # 2. Autenticacao (uma vez) e requisicoes pre-serializadas
+        token = args.token or login(api_url, args.username, args.password)
+        print("\nGerando requisicoes...")
+        requests_ = build_requests(REQUEST_POOL, args.batch_fraction, zipf_exponent=args.zipf)
+        print(f"   - {len(requests_)} requisicoes ({args.batch_fraction:.0%} em lote)")
+
+        # 3. Carga
+        print(f"\nExecutando {args.warmup:.0f}s de aquecimento + {args.duration:.0f}s medidos...")
+        report = run_load(api_url, token, requests_, args.mode, args.concurrency, args.rate,
+                          args.duration, args.warmup, args.max_workers, args.poisson, server_pid)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    # 4. Relatorio
+    print_report(report)
+    if args.output is None:
+        BENCH_DIR.mkdir(parents=True, exist_ok=True)
+        path = BENCH_DIR / f"loadgen_{args.mode}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    else:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n   - Relatorio salvo em: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks dos caminhos criticos da API e do pipeline de dados
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Mede, sem rede e sem dados reais, o custo de cada etapa quente:
+prepare_input_data e prepare_batch_data da API, codificacao categorica,
+padronizacao, predict_proba por linha e em lotes, clean_numeric_columns e
+create_features em 10 mil e 1 milhao de linhas e a carga do modelo. Os
+dados vem do gerador sintetico e o modelo e uma Random Forest com os
+hiperparametros padrao do treino (ou um modelo salvo, com --model-dir).
+
+O resultado vai para um JSON com os dados da maquina. Uma execucao pode
+ser guardada como baseline e as seguintes comparadas com ela: casos mais
+lentos que o limite (padrao 10% na mediana) sao regressoes e o comando
+termina com codigo 1.
+
+Uso:
+    python src/benchmarks/microbench.py --quick --save-baseline
+    python src/benchmarks/microbench.py --quick --compare
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import math
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "api"))
+from config import REPORTS_DIR, RANDOM_STATE
+from src.features.generate_synthetic_data import generate_dataframe, generate_api_payloads
+from src.features.prepare_data import clean_numeric_columns, create_features
+from src.modeling.artifacts import save_model_artifact
+
+BENCH_DIR = REPORTS_DIR / "benchmarks"
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+
+# Tamanhos de lote do predict_proba e da preparacao de lotes
+BATCH_SIZES = (1, 10, 100, 1000)
+# Linhas do pipeline de dados (--quick usa tamanhos menores)
+PIPELINE_ROWS = (10_000, 1_000_000)
+QUICK_PIPELINE_ROWS = (10_000, 100_000)
+# Linhas para treinar a floresta de referencia
+TRAIN_ROWS = 20_000
+QUICK_TRAIN_ROWS = 5_000
+
+# Repeticoes por caso e duracao minima de cada repeticao
+REPEATS = 7
+MIN_TIME_S = 0.2
+# Aumento da mediana considerado regressao
+REGRESSION_THRESHOLD = 0.10
+
+# Colunas removidas antes do treino (como em prepare_final_dataset)
+ID_COLUMNS = ['ID', 'Customer_ID', 'Name', 'SSN', 'Month']
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silencia os prints das funcoes medidas."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def hardware_info():
+    """Dados da maquina e versoes que afetam os tempos."""
+    info = {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    info['cpu_model'] = line.split(':', 1)[1].strip()
+                    break
+        with open('/proc/meminfo') as f:
+            info['memory_gb'] = round(int(f.readline().split()[1]) / 1024 ** 2, 1)
+    except OSError:
+        pass
+    return info
+
+
+def time_call(func, setup=None, repeats=REPEATS, number=None, min_time_s=MIN_TIME_S):
+    """
+    Tempo por chamada de func em ms (mediana, p95 e minimo das repeticoes).
+
+    Cada repeticao executa `number` chamadas; sem number, calibra para que
+    dure ao menos min_time_s. Com setup, cada chamada recebe setup() (gerado
+    fora da medicao), para funcoes que alteram a entrada no lugar.
+    """
+    if setup is not None:
+        number = 1
+        run = lambda: func(setup())  # noqa: E731
+    else:
+        run = func
+
+    # Aquecimento e calibracao
+    start = time.perf_counter()
+    run()
+    first = time.perf_counter() - start
+    if number is None:
+        number = max(1, math.ceil(min_time_s / max(first, 1e-9)))
+
+    timings = []
+    gc_enabled = gc.isenabled()
+    for _ in range(repeats):
+        args = [setup() for _ in range(number)] if setup is not None else None
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            if args is None:
+                for _ in range(number):
+                    func()
+            else:
+                for arg in args:
+                    func(arg)
+            timings.append((time.perf_counter() - start) / number)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    timings_ms = np.asarray(timings) * 1000
+    return {
+        'median_ms': float(np.median(timings_ms)),
+        'p95_ms': float(np.percentile(timings_ms, 95)),
+        'min_ms': float(timings_ms.min()),
+        'repeats': repeats,
+        'number': number,
+    }
+
+
+def build_fixture(train_rows=TRAIN_ROWS, seed=RANDOM_STATE, model_dir=None):
+    """
+    Pacote de modelo para os casos: {model, encoders, model_dir}.
+
+    Sem model_dir, treina a Random Forest padrao em dados sinteticos e salva
+    em uma pasta temporaria (a carga e medida a partir dela).
+    """
+    if model_dir is not None:
+        model_dir = Path(model_dir)
+        from src.modeling.artifacts import load_model_artifact
+        return {'model': load_model_artifact(model_dir),
+                'encoders': joblib.load(model_dir / "encoders.pkl"),
+                'model_dir': model_dir, 'temporary': False}
+
+    from src.modeling.train_model import prepare_features, RF_PARAMS
+
+    df = generate_dataframe(train_rows, seed).drop(columns=ID_COLUMNS)
+    with _quiet():
+        X, y, _, encoders = prepare_features(df)
+    model = RandomForestClassifier(**RF_PARAMS, random_state=RANDOM_STATE, n_jobs=-1).fit(X, y)
+
+    model_dir = Path(tempfile.mkdtemp(prefix="microbench_")) / "random_forest_00000000_000000"
+    model_dir.mkdir()
+    joblib.dump(encoders, model_dir / "encoders.pkl")
+    save_model_artifact(model, model_dir)
+    return {'model': model, 'encoders': encoders, 'model_dir': model_dir, 'temporary': True}
+
+
+def bench_serving(fixture, batch_sizes=BATCH_SIZES, repeats=REPEATS, seed=RANDOM_STATE):
+    """Casos da API: preparacao, codificacao, padronizacao, predicao e carga."""
+    import main as api
+    from models import CreditScoreInput
+    from scoring import load_bundle, to_feature_frame
+
+    api.ENCODERS = fixture['encoders']
+    transformer, model = fixture['encoders']['transformer'], fixture['model']
+    payloads = generate_api_payloads(max(batch_sizes), seed)
+    inputs = [CreditScoreInput(**payload) for payload in payloads]
+    X = transformer.transform(to_feature_frame(pd.DataFrame(payloads)))
+
+    results = {}
+    results['prepare_input_data'] = time_call(lambda: api.prepare_input_data(inputs[0]),
+                                              repeats=repeats)
+    results['predict_proba_single'] = time_call(lambda: model.predict_proba(X[:1]),
+                                                repeats=repeats)
+
+    for size in batch_sizes:
+        batch = inputs[:size]
+        completed = transformer._complete(transformer._clean(
+            to_feature_frame(pd.DataFrame(payloads[:size])), transformer.numeric_columns_))
+        encoded = transformer._encode(completed)
+        results[f'prepare_batch_data_{size}'] = time_call(lambda: api.prepare_batch_data(batch),
+                                                          repeats=repeats)
+        results[f'encode_categorical_{size}'] = time_call(lambda: transformer._encode(completed),
+                                                          repeats=repeats)
+        results[f'scale_{size}'] = time_call(
+            lambda: (encoded - transformer.mean_) / transformer.scale_, repeats=repeats)
+        results[f'predict_proba_batch_{size}'] = time_call(lambda: model.predict_proba(X[:size]),
+                                                           repeats=repeats)
+
+    results['load_bundle'] = time_call(lambda: load_bundle(fixture['model_dir'].parent),
+                                       repeats=repeats, number=1)
+    return results
+
+
+def bench_pipeline(pipeline_rows=PIPELINE_ROWS, repeats=3, seed=RANDOM_STATE):
+    """Casos do pipeline de dados: limpeza numerica e features engenheiradas."""
+    results = {}
+    for rows in pipeline_rows:
+        raw = generate_dataframe(rows, seed)
+        with _quiet():
+            cleaned = clean_numeric_columns(raw.copy())
+            results[f'clean_numeric_columns_{rows}'] = time_call(
+                clean_numeric_columns, setup=raw.copy, repeats=repeats)
+            results[f'create_features_{rows}'] = time_call(
+                create_features, setup=cleaned.copy, repeats=repeats)
+        del raw, cleaned
+    return results
+
+
+def run_suite(fixture, batch_sizes=BATCH_SIZES, pipeline_rows=PIPELINE_ROWS,
+              repeats=REPEATS, only=None):
+    """Executa os casos e retorna o relatorio (maquina + resultados por caso)."""
+    results = {}
+    print("\nCasos da API...")
+    results.update(bench_serving(fixture, batch_sizes, repeats))
+    if pipeline_rows:
+        print("Casos do pipeline de dados...")
+        results.update(bench_pipeline(pipeline_rows, repeats=min(repeats, 3)))
+    if only:
+        results = {name: stats for name, stats in results.items() if only in name}
+
+    return {
+        'created_at': datetime.now().isoformat(),
+        'hardware': hardware_info(),
+        'model': fixture['model_dir'].name if not fixture['temporary'] else 'synthetic_random_forest',
+        'results': results,
+    }
+
+
+def compare_reports(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Compara as medianas de cada caso presente nos dois relatorios.
+
+    Retorna (linhas, regressoes); cada linha tem caso, tempos e variacao
+    relativa, e regressoes sao os casos com variacao acima de threshold.
+    """
+    rows = []
+    for name, stats in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        change = stats['median_ms'] / max(before['median_ms'], 1e-12) - 1
+        rows.append({'case': name, 'baseline_ms': before['median_ms'],
+                     'current_ms': stats['median_ms'], 'change': change,
+                     'regression': change > threshold})
+    return rows, [row for row in rows if row['regression']]
+
+
+def hardware_differences(baseline, current):
+    """Campos da maquina que diferem entre os relatorios."""
+    keys = ('machine', 'cpu_model', 'cpu_count', 'python', 'numpy', 'pandas', 'sklearn')
+    return [key for key in keys
+            if baseline['hardware'].get(key) != current['hardware'].get(key)]
+
+
+def save_report(report, path=None):
+    """Salva o relatorio (padrao: reports/benchmarks/microbench_<timestamp>.json)."""
+    if path is None:
+        BENCH_DIR.mkdir(parents=True, exist_ok=True)
+        path = BENCH_DIR / f"microbench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def print_results(report):
+    """Imprime os tempos de cada caso."""
+    print("\nResultados (ms por chamada):")
+    for name, stats in report['results'].items():
+        print(f"   - {name:<34} mediana {stats['median_ms']:10.4f} | "
+              f"p95 {stats['p95_ms']:10.4f} | min {stats['min_ms']:10.4f}")
+
+
+def print_comparison(rows, threshold):
+    """Imprime a comparacao com a baseline."""
+    print(f"\nComparacao com a baseline (limite {threshold:.0%}):")
+    for row in rows:
+        flag = "REGRESSAO" if row['regression'] else ""
+        print(f"   - {row['case']:<34} {row['baseline_ms']:10.4f} -> {row['current_ms']:10.4f} ms "
+              f"({row['change']:+.1%}) {flag}")
+
+
+def main():
+    """Executa os micro-benchmarks pela linha de comando."""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks da API e do pipeline")
+    parser.add_argument("--quick", action="store_true",
+                        help="Pipeline em 10k/100k linhas e floresta menor")
+    parser.add_argument("--model-dir", default=None, help="Usa um modelo salvo")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="Repeticoes por caso")
+    parser.add_argument("--only", default=None, help="So casos cujo nome contem o texto")
+    parser.add_argument("--no-pipeline", action="store_true", help="Pula os casos do pipeline")
+    parser.add_argument("--output", default=None, help="Arquivo JSON do relatorio")
+    parser.add_argument("--save-baseline", action="store_true", help="Guarda como baseline")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help="Arquivo da baseline")
+    parser.add_argument("--compare", action="store_true", help="Compara com a baseline")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Aumento relativo da mediana considerado regressao")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("MICRO-BENCHMARKS - QUANTUMFINANCE")
+    print("="*60)
+
+    # 1. Modelo (sintetico ou salvo)
+    print("\nPreparando modelo...")
+    fixture = build_fixture(QUICK_TRAIN_ROWS if args.quick else TRAIN_ROWS,
+                            model_dir=args.model_dir)
+    print(f"   - Modelo: {fixture['model_dir'].name}")
+
+    # 2. Casos
+    pipeline_rows = () if args.no_pipeline else (QUICK_PIPELINE_ROWS if args.quick else PIPELINE_ROWS)
+    try:
+        report = run_suite(fixture, pipeline_rows=pipeline_rows, repeats=args.repeats,
+                           only=args.only)
+    finally:
+        if fixture['temporary']:
+            shutil.rmtree(fixture['model_dir'].parent, ignore_errors=True)
+    print_results(report)
+
+    # 3. Relatorio e baseline
+    path = save_report(report, args.output)
+    print(f"\n   - Relatorio salvo em: {path}")
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"   - Baseline salva em: {args.baseline}")
+
+    # 4. Comparacao
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        differences = hardware_differences(baseline, report)
+        if differences:
+            print(f"\nAVISO: maquina diferente da baseline ({', '.join(differences)})")
+        rows, regressions = compare_reports(baseline, report, args.threshold)
+        print_comparison(rows, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressao(oes) acima de {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nSem regressoes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Replay deterministico de trafego capturado da API
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Reenvia os registros de uma captura (src/api/capture.py) na ordem e com os
+intervalos originais, ou acelerados/desacelerados por --speed, contra
+qualquer versao da API. O agendamento e o mesmo da malha aberta do gerador
+de carga (latencia a partir do horario previsto), com os corpos exatos das
+requisicoes capturadas: mesma concentracao de clientes e mesma mistura de
+tamanhos de lote da producao.
+
+Cada resposta e comparada com a capturada: classes diferentes e diferenca
+de confianca acima da tolerancia contam como divergencia (o comando
+termina com codigo 1). A latencia do servidor na captura e mostrada ao
+lado da latencia do replay.
+
+Uso:
+    python src/benchmarks/replay.py data/captures --speed 1
+    python src/benchmarks/replay.py data/captures --speed 4 --start-server --no-rate-limit
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.api.capture import read_capture, response_scores
+from src.api.metrics import Histogram, percentiles
+from src.benchmarks.loadgen import (LoadStats, Sender, ProcessSampler, run_schedule, login,
+                                    start_server, QUANTILES, API_URL, USERNAME, PASSWORD)
+from src.benchmarks.microbench import BENCH_DIR, hardware_info
+
+# Diferenca de confianca aceita (mesmo modelo deve dar o mesmo valor)
+CONFIDENCE_TOLERANCE = 1e-6
+# Divergencias listadas no relatorio
+MAX_EXAMPLES = 20
+
+
+def replay_plan(records, speed=1.0):
+    """Requisicoes [(endpoint, corpo, linhas)] e horarios (s desde o inicio) escalados."""
+    if not records:
+        return [], []
+    first = records[0]['t']
+    items = [(record['path'], record['body'].encode('utf-8'), record['rows']) for record in records]
+    offsets = [(record['t'] - first) / speed for record in records]
+    return items, offsets
+
+
+def compare_scores(records, replayed, tolerance=CONFIDENCE_TOLERANCE):
+    """
+    Compara as respostas do replay com as capturadas.
+
+    replayed: [(status, scores)] na ordem dos registros. So entram nos
+    scores as requisicoes com 200 nas duas execucoes; status diferentes sao
+    contados a parte.
+    """
+    summary = {'requests': 0, 'rows': 0, 'status_mismatches': 0, 'class_mismatches': 0,
+               'confidence_mismatches': 0, 'max_confidence_diff': 0.0, 'examples': []}
+    total_diff = 0.0
+    for index, (record, (status_code, scores)) in enumerate(zip(records, replayed)):
+        if status_code != record['status']:
+            summary['status_mismatches'] += 1
+            if len(summary['examples']) < MAX_EXAMPLES:
+                summary['examples'].append({'index': index, 'path': record['path'],
+                                            'captured_status': record['status'],
+                                            'replay_status': status_code})
+            continue
+        if record['scores'] is None or scores is None:
+            continue
+        summary['requests'] += 1
+        for row, (before, after) in enumerate(zip(record['scores'], scores)):
+            summary['rows'] += 1
+            diff = abs(before[1] - after[1])
+            total_diff += diff
+            summary['max_confidence_diff'] = max(summary['max_confidence_diff'], diff)
+            differs = before[0] != after[0]
+            summary['class_mismatches'] += differs
+            summary['confidence_mismatches'] += diff > tolerance
+            if (differs or diff > tolerance) and len(summary['examples']) < MAX_EXAMPLES:
+                summary['examples'].append({'index': index, 'row': row, 'path': record['path'],
+                                            'captured': before, 'replay': after})
+
+    summary['mean_confidence_diff'] = total_diff / max(summary['rows'], 1)
+    summary['class_mismatch_rate'] = summary['class_mismatches'] / max(summary['rows'], 1)
+    return summary
+
+
+def captured_latency(records):
+    """Percentis da duracao no servidor registrada na captura."""
+    histogram = Histogram()
+    for record in records:
+        histogram.record(record['duration_ms'])
+    return percentiles(histogram.sparse(), QUANTILES)
+
+
+def run_replay(api_url, token, records, speed=1.0, max_workers=256, server_pid=None,
+               tolerance=CONFIDENCE_TOLERANCE):
+    """Reenvia a captura e retorna o relatorio (carga, servidor e divergencias)."""
+    stats = LoadStats()
+    sender = Sender(api_url, token, stats)
+    sampler = ProcessSampler(server_pid).start() if server_pid else None
+
+    def send(item, intended):
+        # So status e scores ficam em memoria ate o fim
+        response = sender.send(item, intended)
+        if response is None:
+            return None, None
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        return response.status_code, response_scores(item[0], data)
+
+    items, offsets = replay_plan(records, speed)
+    start = time.perf_counter()
+    late, futures = run_schedule(send, items, offsets, max_workers, keep_results=True)
+    replayed = [future.result() for future in futures]
+    elapsed_s = max(time.perf_counter() - start, offsets[-1] if offsets else 0.0, 1e-9)
+
+    return {
+        'created_at': datetime.now().isoformat(),
+        'hardware': hardware_info(),
+        'config': {'api_url': api_url, 'speed': speed, 'max_workers': max_workers,
+                   'records': len(records), 'tolerance': tolerance},
+        'captured': {'duration_s': (records[-1]['t'] - records[0]['t']) if records else 0.0,
+                     'server_latency_ms': captured_latency(records)},
+        'client': stats.summary(elapsed_s),
+        'late_arrivals': late,
+        'server': sampler.stop() if sampler is not None else None,
+        'diff': compare_scores(records, replayed, tolerance),
+    }
+
+
+def _format_percentiles(values):
+    """'p50 1.0 | p90 2.0 | ...' sem os percentis vazios."""
+    return " | ".join(f"{q} {value:.1f}" for q, value in values.items() if value is not None)
+
+
+def print_report(report):
+    """Imprime o resumo do replay."""
+    client, diff = report['client'], report['diff']
+    print(f"\nReplay ({report['config']['records']} requisicoes, "
+          f"velocidade {report['config']['speed']}x, {client['elapsed_s']:.1f}s):")
+    print(f"   - Vazao: {client['throughput_rps']:.1f} req/s ({client['rows_per_s']:.1f} linhas/s)")
+    print(f"   - Erros: {client['error_rate']:.2%} | 429: {client['rate_limited_rate']:.2%}")
+    captured = _format_percentiles(report['captured']['server_latency_ms'])
+    print(f"   - Latencia na captura (servidor) ms: {captured}")
+    print(f"   - Latencia no replay (cliente) ms:   {_format_percentiles(client['latency_ms'])}")
+    if report['late_arrivals']:
+        print(f"   - AVISO: {report['late_arrivals']} envios atrasados no gerador")
+    server = report['server']
+    if server is not None:
+        print(f"   - Servidor: CPU {server['cpu_percent']:.0f}% | "
+              f"RSS maximo {server['rss_mb_max']:.0f} MB")
+    print(f"\nComparacao de scores ({diff['rows']} linhas em {diff['requests']} requisicoes):")
+    print(f"   - Classes diferentes: {diff['class_mismatches']} ({diff['class_mismatch_rate']:.2%})")
+    print(f"   - Confianca acima da tolerancia: {diff['confidence_mismatches']} "
+          f"(maxima {diff['max_confidence_diff']:.2e}, media {diff['mean_confidence_diff']:.2e})")
+    print(f"   - Status diferentes: {diff['status_mismatches']}")
+
+
+def main():
+    """Reenvia uma captura pela linha de comando."""
+    parser = argparse.ArgumentParser(description="Replay de trafego capturado da API")
+    parser.add_argument("capture", nargs="+", help="Arquivos .jsonl.gz ou pastas de captura")
+    parser.add_argument("--url", default=API_URL, help="URL da API")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Fator de velocidade (2 = intervalos pela metade)")
+    parser.add_argument("--limit", type=int, default=None, help="Apenas os primeiros N registros")
+    parser.add_argument("--max-workers", type=int, default=256, help="Requisicoes em voo no maximo")
+    parser.add_argument("--tolerance", type=float, default=CONFIDENCE_TOLERANCE,
+                        help="Diferenca de confianca aceita")
+    parser.add_argument("--username", default=USERNAME)
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--token", default=None, help="Token JWT ja emitido (pula o login)")
+    parser.add_argument("--server-pid", type=int, default=None, help="PID do servidor (CPU/RSS)")
+    parser.add_argument("--start-server", action="store_true", help="Sobe a API com uvicorn")
+    parser.add_argument("--port", type=int, default=8001, help="Porta com --start-server")
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="Desliga o rate limiting do servidor iniciado")
+    parser.add_argument("--output", default=None, help="Arquivo JSON do relatorio")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("REPLAY DE TRAFEGO - QUANTUMFINANCE")
+    print("="*60)
+
+    # 1. Captura
+    records = read_capture(args.capture)[:args.limit]
+    if not records:
+        print("ERRO: Nenhum registro de captura encontrado!")
+        sys.exit(1)
+    print(f"\nCaptura: {len(records)} requisicoes em {records[-1]['t'] - records[0]['t']:.1f}s")
+
+    # 2. Servidor
+    server = None
+    api_url, server_pid = args.url, args.server_pid
+    if args.start_server:
+        print("\nIniciando API...")
+        server = start_server(args.port, args.workers, rate_limit=not args.no_rate_limit)
+        api_url, server_pid = f"http://127.0.0.1:{args.port}", server.pid
+        print(f"   - {api_url} (pid {server_pid})")
+
+    # 3. Replay (uma autenticacao; os tokens capturados foram removidos)
+    try:
+        token = args.token or login(api_url, args.username, args.password)
+        report = run_replay(api_url, token, records, args.speed, args.max_workers, server_pid,
+                            args.tolerance)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    # 4. Relatorio
+    print_report(report)
+    if args.output is None:
+        BENCH_DIR.mkdir(parents=True, exist_ok=True)
+        path = BENCH_DIR / f"replay_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    else:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n   - Relatorio salvo em: {path}")
+
+    diff = report['diff']
+    if diff['class_mismatches'] or diff['confidence_mismatches'] or diff['status_mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Cache em disco das features prontas para treino
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Guarda X/y ja transformados e divididos (arquivos .npy abertos via memmap),
+os encoders ajustados e um manifest.json. A chave combina a impressao
+digital do dataset, o codigo-fonte das transformacoes e os parametros da
+divisao; qualquer mudanca gera uma entrada nova.
+
+Estrutura:
+    data/cache/features/<chave>/
+        X_train.npy  X_test.npy  y_train.npy  y_test.npy
+        encoders.pkl
+        manifest.json
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config import CACHE_DIR
+from src.pipeline.dag import source_hash
+from src.modeling.parallel import share_arrays, load_shared
+
+MANIFEST_FILE = "manifest.json"
+ENCODERS_FILE = "encoders.pkl"
+
+
+def dataset_fingerprint(path):
+    """Impressao digital do arquivo de dados (tamanho e data de modificacao)."""
+    stat = Path(path).stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+class FeatureCache:
+    """
+    Entrada do cache de features para um dataset, um codigo e parametros.
+
+    Uso:
+        cache = FeatureCache(data_path, code=[prepare_features, transform])
+        if cache.exists():
+            data_paths, encoders, manifest = cache.load()
+        else:
+            cache.save(arrays, encoders, feature_names)
+    """
+
+    def __init__(self, data_path, code, params=None, cache_dir=None):
+        self.data_path = Path(data_path)
+        self.params = params or {}
+        self.fingerprint = dataset_fingerprint(self.data_path)
+        self.code_hash = source_hash(code)
+
+        payload = {'data': str(self.data_path.resolve()), 'fingerprint': self.fingerprint,
+                   'code': self.code_hash, 'params': self.params}
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        self.key = hashlib.sha256(encoded).hexdigest()[:16]
+
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR / "features"
+        self.path = self.cache_dir / self.key
+
+    def exists(self):
+        """Indica se a entrada esta completa (o manifest e gravado por ultimo)."""
+        return (self.path / MANIFEST_FILE).exists()
+
+    def load(self):
+        """Retorna ({nome: caminho .npy}, encoders, manifest) sem ler os arrays."""
+        with open(self.path / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        data_paths = {name: str(self.path / info['file'])
+                      for name, info in manifest['arrays'].items()}
+        encoders = joblib.load(self.path / ENCODERS_FILE)
+        return data_paths, encoders, manifest
+
+    def arrays(self):
+        """Abre os arrays da entrada via memmap (somente leitura)."""
+        data_paths, _, _ = self.load()
+        return load_shared(data_paths)
+
+    def save(self, arrays, encoders, feature_names, dtype=np.float32):
+        """
+        Grava arrays, encoders e manifest em um diretorio temporario e o move
+        para o lugar final, para que leitores nunca vejam uma entrada parcial.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{self.key}-", dir=self.cache_dir))
+        try:
+            data_paths = share_arrays(arrays, tmp_dir, dtype=dtype)
+            joblib.dump(encoders, tmp_dir / ENCODERS_FILE)
+
+            manifest = {
+                'key': self.key,
+                'created_at': datetime.now().isoformat(),
+                'data_path': str(self.data_path),
+                'fingerprint': self.fingerprint,
+                'code_hash': self.code_hash,
+                'params': self.params,
+                'feature_names': list(feature_names),
+                'arrays': {name: {'file': Path(path).name,
+                                  'shape': list(arrays[name].shape),
+                                  'dtype': str(np.load(path, mmap_mode='r').dtype)}
+                           for name, path in data_paths.items()},
+            }
+            with open(tmp_dir / MANIFEST_FILE, 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            if self.path.exists():
+                shutil.rmtree(self.path)
+            os.replace(tmp_dir, self.path)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        return self.load()
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de dataset sintetico de credito no schema bruto do Kaggle
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Gera qualquer quantidade de linhas com as mesmas colunas e os mesmos
+"defeitos" do train.csv original (numeros com "_", "NA", textos de historico,
+listas de emprestimos, outliers), com balanco de classes e correlacoes
+realistas. A escrita e feita em blocos, sem manter o dataset em memoria.
+
+A saida padrao e data/raw/train_synthetic.csv, separada do train.csv real
+do Kaggle; arquivos existentes so sao substituidos com --force. Para treinar
+com ela: python src/pipeline/run_pipeline.py --data data/raw/train_synthetic.csv
+
+Uso:
+    python src/features/generate_synthetic_data.py --rows 1000000
+    python src/features/generate_synthetic_data.py --rows 1000000 --force
+    python src/features/generate_synthetic_data.py --rows 50000000 --format parquet \\
+        --output data/raw/train_50m.parquet
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config import DATA_RAW, RANDOM_STATE
+from src.features.parsers import LOAN_TYPES
+from src.features.transform import FIELD_TO_COLUMN, clean_numeric_series
+
+# Saida padrao (nunca o train.csv baixado do Kaggle)
+DEFAULT_OUTPUT = DATA_RAW / "train_synthetic.csv"
+
+# Colunas na ordem exata do train.csv original
+RAW_COLUMNS = ['ID', 'Customer_ID', 'Month', 'Name', 'Age', 'SSN', 'Occupation',
+               'Annual_Income', 'Monthly_Inhand_Salary', 'Num_Bank_Accounts',
+               'Num_Credit_Card', 'Interest_Rate', 'Num_of_Loan', 'Type_of_Loan',
+               'Delay_from_due_date', 'Num_of_Delayed_Payment', 'Changed_Credit_Limit',
+               'Num_Credit_Inquiries', 'Credit_Mix', 'Outstanding_Debt',
+               'Credit_Utilization_Ratio', 'Credit_History_Age', 'Payment_of_Min_Amount',
+               'Total_EMI_per_month', 'Amount_invested_monthly', 'Payment_Behaviour',
+               'Monthly_Balance', 'Credit_Score']
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August']
+
+OCCUPATIONS = ['Scientist', 'Teacher', 'Engineer', 'Entrepreneur', 'Developer',
+               'Lawyer', 'Media_Manager', 'Doctor', 'Journalist', 'Manager',
+               'Accountant', 'Musician', 'Mechanic', 'Writer', 'Architect']
+
+PAYMENT_BEHAVIOURS = ['Low_spent_Small_value_payments', 'Low_spent_Medium_value_payments',
+                      'Low_spent_Large_value_payments', 'High_spent_Small_value_payments',
+                      'High_spent_Medium_value_payments', 'High_spent_Large_value_payments']
+
+# Proporcao aproximada do dataset original: Standard 53%, Poor 29%, Good 18%
+CLASS_PROPORTIONS = {'Good': 0.18, 'Standard': 0.53, 'Poor': 0.29}
+
+# Sem scipy: quantis da normal padrao para os cortes de classe acima
+_GOOD_CUT = -0.9154   # P(Z < x) = 0.18
+_POOR_CUT = 0.5534    # P(Z > x) = 0.29
+
+# Placeholders sujos encontrados no dataset original
+_MISSING_OCCUPATION = '_______'
+_MISSING_CREDIT_MIX = '_'
+_MISSING_BEHAVIOUR = '!@9#%8'
+_BAD_INVESTMENT = '__10000__'
+_BAD_BALANCE = '__-333333333333333333333333333__'
+_BAD_SSN = '#F%$D@*&8'
+
+# Campos textuais das requisicoes da API e faixas aceitas pelo CreditScoreInput
+API_TEXT_FIELDS = ['occupation', 'type_of_loan', 'credit_mix', 'credit_history_age',
+                   'payment_of_min_amount', 'payment_behaviour']
+API_INT_FIELDS = ['age', 'num_bank_accounts', 'num_credit_card', 'num_of_loan',
+                  'delay_from_due_date', 'num_of_delayed_payment', 'num_credit_inquiries']
+API_FIELD_RANGES = {
+    'age': (18, 100), 'annual_income': (0.01, None), 'monthly_inhand_salary': (0.01, None),
+    'num_bank_accounts': (0, None), 'num_credit_card': (0, None), 'interest_rate': (0, 100),
+    'num_of_loan': (0, None), 'num_of_delayed_payment': (0, None),
+    'num_credit_inquiries': (0, None), 'outstanding_debt': (0, None),
+    'credit_utilization_ratio': (0, 100), 'total_emi_per_month': (0, None),
+    'amount_invested_monthly': (0, None),
+}
+
+
+def _loan_list_pool(rng, max_loans=9, per_size=64):
+    """Pool de textos de Type_of_Loan por quantidade de emprestimos."""
+    pool = {}
+    for k in range(1, max_loans + 1):
+        texts = []
+        for _ in range(per_size):
+            loans = list(rng.choice(LOAN_TYPES, size=k, replace=True))
+            text = loans[0] if k == 1 else ', '.join(loans[:-1]) + ', and ' + loans[-1]
+            texts.append(text)
+        pool[k] = np.array(texts, dtype=object)
+    return pool
+
+
+def _as_text(values):
+    """Numeros como texto (colunas que misturam numeros e placeholders)."""
+    return pd.Series(values).astype(str).to_numpy(dtype=object)
+
+
+def _dirty_suffix(rng, values, rate):
+    """Converte para texto e adiciona '_' no fim de uma fracao dos valores."""
+    text = pd.Series(values).astype(str)
+    mask = rng.random(len(text)) < rate
+    text[mask] = text[mask] + '_'
+    return text
+
+
+def _with_placeholder(rng, values, rate, placeholder):
+    """Substitui uma fracao dos valores por um placeholder."""
+    values = pd.Series(values, dtype=object)
+    values[rng.random(len(values)) < rate] = placeholder
+    return values
+
+
+def _with_missing(rng, values, rate):
+    """Substitui uma fracao dos valores por NaN."""
+    values = pd.Series(values)
+    if values.dtype != object:
+        values = values.astype(float)
+    values[rng.random(len(values)) < rate] = np.nan
+    return values
+
+
+def generate_chunk(n_rows, start_row=0, seed=RANDOM_STATE):
+    """Gera um bloco de linhas brutas a partir da linha global `start_row`."""
+    rng = np.random.default_rng([seed, start_row])
+    loan_pool = _loan_list_pool(rng)
+
+    # Cada cliente aparece em 8 meses consecutivos, como no dataset original
+    rows = np.arange(start_row, start_row + n_rows)
+    customer = rows // len(MONTHS)
+    first_customer = customer[0]
+    n_customers = customer[-1] - first_customer + 1
+    c = customer - first_customer
+
+    # Atributos fixos do cliente: risco latente e perfil
+    risk = rng.standard_normal(n_customers)
+    age = np.clip(rng.normal(38 - 4 * risk, 9), 18, 56).astype(int)
+    occupation = rng.choice(OCCUPATIONS, n_customers)
+    annual_income = np.round(np.exp(rng.normal(10.6 - 0.35 * risk, 0.6)), 2)
+    ssn = np.char.add(np.char.add(rng.integers(100, 999, n_customers).astype(str), '-'),
+                      rng.integers(10, 99, n_customers).astype(str))
+    history_months = np.clip(rng.normal(220 - 70 * risk, 60), 1, 404).astype(int)
+
+    # Variacao mensal em torno do perfil do cliente
+    r = risk[c] + rng.normal(0, 0.35, n_rows)
+    salary = annual_income[c] / 12 * rng.uniform(0.8, 0.9, n_rows)
+    bank_accounts = np.clip(np.round(rng.normal(5 + 2 * r, 1.5)), 0, 11).astype(int)
+    credit_cards = np.clip(np.round(rng.normal(5.5 + 1.8 * r, 1.5)), 0, 11).astype(int)
+    interest_rate = np.clip(np.round(rng.normal(14 + 7 * r, 4)), 1, 34).astype(int)
+    num_loans = np.clip(np.round(rng.normal(3.5 + 1.8 * r, 1.5)), 0, 9).astype(int)
+    delay = np.clip(np.round(rng.normal(21 + 12 * r, 9)), -5, 67).astype(int)
+    delayed_payments = np.clip(np.round(rng.normal(13 + 5 * r, 4)), 0, 28).astype(int)
+    changed_limit = np.round(rng.normal(10 + 4 * r, 6), 2)
+    inquiries = np.clip(np.round(rng.normal(5.5 + 3 * r, 2.5)), 0, 17).astype(int)
+    outstanding_debt = np.round(np.clip(rng.normal(1400 + 900 * r, 700), 0.23, 4998), 2)
+    utilization = np.round(rng.uniform(20, 50, n_rows), 6)
+    emi = np.round(salary * np.clip(rng.normal(0.04 + 0.02 * r, 0.02), 0, 0.3), 6)
+    invested = np.round(salary * rng.uniform(0.02, 0.12, n_rows), 6)
+    balance = np.round(salary - emi - invested - rng.uniform(0, 0.6, n_rows) * salary, 6)
+    months_hist = history_months[c] + rows % len(MONTHS)
+
+    # Classe: risco mensal com ruido, cortado nos quantis das proporcoes alvo
+    score = (r + rng.normal(0, 0.45, n_rows)) / np.sqrt(1.0 + 0.35 ** 2 + 0.45 ** 2)
+    credit_score = np.where(score < _GOOD_CUT, 'Good',
+                            np.where(score > _POOR_CUT, 'Poor', 'Standard'))
+
+    credit_mix = np.where(r < -0.6, 'Good', np.where(r > 0.6, 'Bad', 'Standard'))
+    min_amount = np.where(r > 0.2, 'Yes', 'No').astype(object)
+    min_amount[rng.random(n_rows) < 0.12] = 'NM'
+
+    # Tipos de emprestimo coerentes com Num_of_Loan
+    type_of_loan = np.full(n_rows, np.nan, dtype=object)
+    for k, texts in loan_pool.items():
+        mask = num_loans == k
+        type_of_loan[mask] = texts[rng.integers(0, len(texts), mask.sum())]
+
+    history_text = pd.Series(months_hist // 12).astype(str) + ' Years and ' + \
+        pd.Series(months_hist % 12).astype(str) + ' Months'
+
+    # Outliers grosseiros como no dataset original
+    age_out = age[c].copy()
+    outliers = rng.random(n_rows) < 0.03
+    age_out[outliers] = rng.choice([-500, 8698, 1000, 4000, 7580], outliers.sum())
+    bank_out = bank_accounts.copy()
+    outliers = rng.random(n_rows) < 0.013
+    bank_out[outliers] = rng.integers(12, 1798, outliers.sum())
+    rate_out = interest_rate.copy()
+    outliers = rng.random(n_rows) < 0.02
+    rate_out[outliers] = rng.integers(35, 5797, outliers.sum())
+    loans_out = num_loans.copy()
+    outliers = rng.random(n_rows) < 0.04
+    loans_out[outliers] = rng.choice([-100, 100, 1496, 527], outliers.sum())
+
+    df = pd.DataFrame({
+        'ID': ['0x' + format(0x1602 + i, 'x') for i in rows],
+        'Customer_ID': ['CUS_0x' + format(0xd40 + i, 'x') for i in customer],
+        'Month': np.array(MONTHS, dtype=object)[rows % len(MONTHS)],
+        'Name': _with_missing(rng, np.char.add('Customer ', customer.astype(str)).astype(object), 0.10),
+        'Age': _dirty_suffix(rng, age_out, 0.05),
+        'SSN': _with_placeholder(rng, ssn[c], 0.05, _BAD_SSN),
+        'Occupation': _with_placeholder(rng, occupation[c], 0.07, _MISSING_OCCUPATION),
+        'Annual_Income': _dirty_suffix(rng, annual_income[c], 0.07),
+        'Monthly_Inhand_Salary': _with_missing(rng, np.round(salary, 6), 0.15),
+        'Num_Bank_Accounts': bank_out,
+        'Num_Credit_Card': credit_cards,
+        'Interest_Rate': rate_out,
+        'Num_of_Loan': _dirty_suffix(rng, loans_out, 0.05),
+        'Type_of_Loan': _with_missing(rng, type_of_loan, 0.02),
+        'Delay_from_due_date': delay,
+        'Num_of_Delayed_Payment': _with_missing(rng, _dirty_suffix(rng, delayed_payments, 0.03), 0.07),
+        'Changed_Credit_Limit': _with_placeholder(rng, _as_text(changed_limit), 0.02, '_'),
+        'Num_Credit_Inquiries': _with_missing(rng, inquiries, 0.02),
+        'Credit_Mix': _with_placeholder(rng, credit_mix, 0.20, _MISSING_CREDIT_MIX),
+        'Outstanding_Debt': _dirty_suffix(rng, outstanding_debt, 0.01),
+        'Credit_Utilization_Ratio': utilization,
+        'Credit_History_Age': _with_missing(rng, history_text.to_numpy(dtype=object), 0.09),
+        'Payment_of_Min_Amount': min_amount,
+        'Total_EMI_per_month': emi,
+        'Amount_invested_monthly': _with_placeholder(
+            rng, _with_missing(rng, _as_text(invested), 0.045), 0.04, _BAD_INVESTMENT),
+        'Payment_Behaviour': _with_placeholder(
+            rng, rng.choice(PAYMENT_BEHAVIOURS, n_rows), 0.076, _MISSING_BEHAVIOUR),
+        'Monthly_Balance': _with_placeholder(
+            rng, _with_missing(rng, _as_text(balance), 0.012), 0.001, _BAD_BALANCE),
+        'Credit_Score': credit_score,
+    })
+
+    return df[RAW_COLUMNS]
+
+
+def generate_dataframe(n_rows, seed=RANDOM_STATE, chunk_size=100_000):
+    """Gera o dataset inteiro em memoria (para testes e benchmarks pequenos)."""
+    return pd.concat(
+        [generate_chunk(min(chunk_size, n_rows - start), start, seed)
+         for start in range(0, n_rows, chunk_size)],
+        ignore_index=True
+    )
+
+
+def generate_api_payloads(n_rows, seed=RANDOM_STATE):
+    """
+    Requisicoes validas para /predict a partir das linhas sinteticas.
+
+    Numeros limpos e limitados as faixas da API (outliers ficam no limite),
+    textos faltantes viram 'Not Specified'/'NA' e os placeholders textuais
+    sujos (ex: Occupation) sao mantidos, como chegariam de clientes reais.
+    """
+    df = generate_dataframe(n_rows, seed)[list(FIELD_TO_COLUMN.values())]
+    df = df.rename(columns={column: field for field, column in FIELD_TO_COLUMN.items()})
+
+    for field in df.columns.difference(API_TEXT_FIELDS):
+        values = clean_numeric_series(df[field])
+        values = values.fillna(values.median()).fillna(0.0)
+        low, high = API_FIELD_RANGES.get(field, (None, None))
+        values = values.clip(low, high)
+        df[field] = values.round().astype(int) if field in API_INT_FIELDS else values
+
+    df['type_of_loan'] = df['type_of_loan'].fillna('Not Specified')
+    df['credit_history_age'] = df['credit_history_age'].fillna('NA')
+    return df[list(FIELD_TO_COLUMN)].to_dict(orient='records')
+
+
+def write_dataset(path, n_rows, file_format='csv', chunk_size=200_000, seed=RANDOM_STATE):
+    """Escreve o dataset em blocos (CSV ou Parquet) sem mante-lo em memoria."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Blocos alinhados a clientes completos (8 meses)
+    chunk_size = max(len(MONTHS), chunk_size - chunk_size % len(MONTHS))
+    writer = None
+
+    try:
+        for start in range(0, n_rows, chunk_size):
+            chunk = generate_chunk(min(chunk_size, n_rows - start), start, seed)
+
+            if file_format == 'csv':
+                chunk.to_csv(path, mode='w' if start == 0 else 'a',
+                             header=start == 0, index=False, na_rep='NA')
+            elif file_format == 'parquet':
+                try:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                except ImportError:
+                    raise ImportError("Formato parquet requer o pacote pyarrow")
+
+                # Colunas textuais sempre como string para manter o schema entre blocos
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    schema = pa.schema([
+                        pa.field(f.name, pa.string() if pa.types.is_null(f.type) else f.type)
+                        for f in table.schema
+                    ])
+                    writer = pq.ParquetWriter(path, schema, compression='snappy')
+                writer.write_table(table.cast(writer.schema))
+            else:
+                raise ValueError(f"Formato nao suportado: {file_format}")
+
+            done = min(start + chunk_size, n_rows)
+            print(f"   - {done}/{n_rows} linhas escritas")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return path
+
+
+def main():
+    """Gera o dataset sintetico pela linha de comando."""
+    parser = argparse.ArgumentParser(description="Gerador de dataset sintetico de credito")
+    parser.add_argument("--rows", type=int, default=100_000, help="Numero de linhas")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Arquivo de saida")
+    parser.add_argument("--force", action="store_true", help="Substitui o arquivo se ja existir")
+    parser.add_argument("--format", choices=['csv', 'parquet'], default='csv')
+    parser.add_argument("--chunk-size", type=int, default=200_000, help="Linhas por bloco")
+    parser.add_argument("--seed", type=int, default=RANDOM_STATE)
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("GERACAO DE DADOS SINTETICOS - QUANTUMFINANCE")
+    print("="*60)
+
+    if Path(args.output).exists() and not args.force:
+        print(f"ERRO: {args.output} ja existe (use --force para substituir)")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    path = write_dataset(args.output, args.rows, args.format, args.chunk_size, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"\nDataset salvo em: {path}")
+    print(f"   - {args.rows} linhas em {elapsed:.1f}s ({args.rows / max(elapsed, 1e-9):,.0f} linhas/s)")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
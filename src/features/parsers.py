@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Parsers vetorizados para colunas textuais estruturadas
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Converte Credit_History_Age ("5 Years and 2 Months") em numero de meses
+e Type_of_Loan (lista separada por virgulas) em vetor multi-hot fixo.
+Usado tanto pela preparacao de dados quanto pela API.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Tipos de emprestimo conhecidos no dataset (ordem fixa = ordem das colunas)
+LOAN_TYPES = [
+    'Auto Loan',
+    'Credit-Builder Loan',
+    'Personal Loan',
+    'Home Equity Loan',
+    'Mortgage Loan',
+    'Student Loan',
+    'Debt Consolidation Loan',
+    'Payday Loan',
+    'Not Specified',
+]
+
+# Nome da coluna gerada para cada tipo (ex: 'Auto Loan' -> 'Loan_Auto_Loan')
+LOAN_TYPE_COLUMNS = [
+    'Loan_' + re.sub(r'[^0-9a-zA-Z]+', '_', loan_type) for loan_type in LOAN_TYPES
+]
+
+# Coluna numerica gerada a partir de Credit_History_Age
+CREDIT_HISTORY_MONTHS = 'Credit_History_Months'
+
+_HISTORY_AGE_PATTERN = r'(?:(\d+)\s*Years?)?\s*(?:and\s*)?(?:(\d+)\s*Months?)?'
+_HISTORY_AGE_REGEX = re.compile(_HISTORY_AGE_PATTERN, flags=re.IGNORECASE)
+
+
+def parse_credit_history_age(values) -> pd.Series:
+    """Converte "X Years and Y Months" em total de meses (NaN se invalido)."""
+    series = pd.Series(values) if not isinstance(values, pd.Series) else values
+
+    # Ja numerico (ex: dataset ja processado): apenas garante float
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+
+    parts = series.astype(str).str.strip().str.extract(_HISTORY_AGE_PATTERN, flags=re.IGNORECASE)
+    years = pd.to_numeric(parts[0], errors='coerce')
+    months = pd.to_numeric(parts[1], errors='coerce')
+
+    # Texto sem nenhum dos dois componentes nao e um historico valido
+    total = years.fillna(0) * 12 + months.fillna(0)
+    total[years.isna() & months.isna()] = np.nan
+
+    return total.astype(float)
+
+
+def parse_credit_history_age_value(value) -> float:
+    """Versao escalar de parse_credit_history_age (caminho de uma linha da API)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value is None:
+        return np.nan
+
+    match = _HISTORY_AGE_REGEX.match(str(value).strip())
+    years, months = match.group(1), match.group(2)
+    if years is None and months is None:
+        return np.nan
+
+    return float(int(years or 0) * 12 + int(months or 0))
+
+
+def parse_type_of_loan(values) -> pd.DataFrame:
+    """Converte lista de emprestimos em colunas multi-hot (uint8) fixas."""
+    series = pd.Series(values) if not isinstance(values, pd.Series) else values
+    text = series.fillna('').astype(str)
+
+    # Um str.contains por tipo: custo fixo de len(LOAN_TYPES) passadas vetorizadas
+    flags = {
+        column: text.str.contains(loan_type, regex=False).to_numpy(dtype=np.uint8)
+        for loan_type, column in zip(LOAN_TYPES, LOAN_TYPE_COLUMNS)
+    }
+
+    return pd.DataFrame(flags, index=series.index)
+
+
+def parse_type_of_loan_value(value) -> dict:
+    """Versao escalar de parse_type_of_loan: {coluna: 0/1}."""
+    text = '' if value is None else str(value)
+    return {
+        column: int(loan_type in text)
+        for loan_type, column in zip(LOAN_TYPES, LOAN_TYPE_COLUMNS)
+    }
+
+
+def parse_structured_columns(df):
+    """Substitui as colunas textuais estruturadas pelas versoes numericas (sem alterar df)."""
+    df = df.copy()
+    if 'Credit_History_Age' in df.columns:
+        df[CREDIT_HISTORY_MONTHS] = parse_credit_history_age(df['Credit_History_Age'])
+        df = df.drop(columns=['Credit_History_Age'])
+
+    if 'Type_of_Loan' in df.columns:
+        loan_flags = parse_type_of_loan(df['Type_of_Loan'])
+        df = pd.concat([df.drop(columns=['Type_of_Loan']), loan_flags], axis=1)
+
+    return df
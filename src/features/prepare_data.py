@@ -19,7 +19,21 @@ warnings.filterwarnings('ignore')
 # Importar configurações do projeto
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
-from config import DATA_RAW, DATA_PROCESSED, DATA_FINAL
+from config import DATA_RAW, DATA_PROCESSED, DATA_FINAL, PROFILE_TRACK_MEMORY
+from src.features.parsers import parse_structured_columns, CREDIT_HISTORY_MONTHS, LOAN_TYPE_COLUMNS
+from src.features.transform import NUMERIC_COLUMNS, ENGINEERED_FEATURES, FIELD_TO_COLUMN, clean_numeric_series
+from src.api.models import CreditScoreInput
+from src.pipeline.profiling import PipelineProfiler
+
+# Limites adicionais para campos sem teto no schema da API
+# (valores muito acima disso sao erros de digitacao/coleta no dataset bruto)
+VALIDATION_EXTRA_BOUNDS = {
+    'Num_Bank_Accounts': {'le': 20},
+    'Num_Credit_Card': {'le': 20},
+    'Num_of_Loan': {'le': 20},
+    'Num_of_Delayed_Payment': {'le': 50},
+    'Num_Credit_Inquiries': {'le': 50},
+}
 
 # Criar pastas se não existirem
 DATA_PROCESSED.mkdir(parents=True, exist_ok=True)
@@ -45,34 +59,116 @@ def load_and_explore():
     
     return df
 
-def clean_numeric_columns(df):
-    """Limpa e converte colunas numéricas."""
+def clean_numeric_columns(df, fill_missing=True):
+    """Limpa e converte colunas numéricas (fill_missing=False mantem os NaN)."""
     print("\nLimpando colunas numericas...")
     
-    # Lista de colunas que deveriam ser numéricas
-    numeric_cols = ['Age', 'Annual_Income', 'Monthly_Inhand_Salary', 
-                    'Num_Bank_Accounts', 'Num_Credit_Card', 'Interest_Rate',
-                    'Num_of_Loan', 'Outstanding_Debt', 'Credit_Utilization_Ratio',
-                    'Total_EMI_per_month', 'Amount_invested_monthly', 'Monthly_Balance',
-                    'Num_of_Delayed_Payment', 'Num_Credit_Inquiries']
-    
-    for col in numeric_cols:
+    # Lista de colunas que deveriam ser numéricas (compartilhada com a API)
+    for col in NUMERIC_COLUMNS:
         if col in df.columns:
-            # Converter para string primeiro para limpar
-            df[col] = df[col].astype(str)
-            
-            # Remover caracteres especiais
-            df[col] = df[col].str.replace('_', '')
-            df[col] = df[col].str.replace(',', '')
-            
-            # Converter para numérico, erros viram NaN
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Preencher NaN com mediana
-            if df[col].isnull().sum() > 0:
-                median_value = df[col].median()
-                df[col].fillna(median_value, inplace=True)
-                print(f"   - {col}: valores faltantes preenchidos com mediana ({median_value:.2f})")
+            # Remover caracteres especiais e converter, erros viram NaN
+            df[col] = clean_numeric_series(df[col])
+    
+    if fill_missing:
+        df = fill_missing_numeric(df)
+    
+    return df
+
+def fill_missing_numeric(df):
+    """Preenche NaN das colunas numericas com a mediana (usar apos validate_data)."""
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns and df[col].isnull().sum() > 0:
+            median_value = df[col].median()
+            df[col] = df[col].fillna(median_value)
+            print(f"   - {col}: valores faltantes preenchidos com mediana ({median_value:.2f})")
+    
+    return df
+
+def build_validation_rules():
+    """Monta as regras de faixa a partir dos limites de CreditScoreInput."""
+    rules = {}
+    
+    # Limites declarados nos Field(ge=..., gt=..., le=..., lt=...) da API
+    for field, info in CreditScoreInput.model_fields.items():
+        bounds = {}
+        for constraint in info.metadata:
+            for op in ('ge', 'gt', 'le', 'lt'):
+                value = getattr(constraint, op, None)
+                if value is not None:
+                    bounds[op] = value
+        if bounds and field in FIELD_TO_COLUMN:
+            rules[FIELD_TO_COLUMN[field]] = bounds
+    
+    for column, bounds in VALIDATION_EXTRA_BOUNDS.items():
+        rules.setdefault(column, {}).update(bounds)
+    
+    return rules
+
+def validate_data(df, rules=None, quarantine_path=None):
+    """Valida faixas de valores de forma vetorizada e separa linhas invalidas."""
+    print("\nValidando faixas de valores...")
+    
+    rules = rules or build_validation_rules()
+    invalid_rows = np.zeros(len(df), dtype=bool)
+    flags = {}
+    violations = {}
+    missing = {}
+    
+    # Uma comparacao numpy por limite; nenhuma iteracao por linha
+    for column, bounds in rules.items():
+        if column not in df.columns:
+            continue
+        values = df[column].to_numpy(dtype=float)
+        # NaN nao viola faixa (e preenchido depois, com a mediana das linhas validas)
+        missing[column] = int(np.isnan(values).sum())
+        invalid = np.zeros(len(df), dtype=bool)
+        if 'ge' in bounds:
+            invalid |= values < bounds['ge']
+        if 'gt' in bounds:
+            invalid |= values <= bounds['gt']
+        if 'le' in bounds:
+            invalid |= values > bounds['le']
+        if 'lt' in bounds:
+            invalid |= values >= bounds['lt']
+        
+        count = int(invalid.sum())
+        violations[column] = count
+        if count > 0:
+            flags[f"invalid_{column}"] = invalid
+            invalid_rows |= invalid
+            print(f"   - {column}: {count} valores fora de {bounds}")
+    
+    n_invalid = int(invalid_rows.sum())
+    print(f"   - Linhas em quarentena: {n_invalid} de {len(df)}")
+    
+    # Linhas invalidas vao para um arquivo separado, com as colunas violadas
+    if quarantine_path is not None:
+        quarantine = df[invalid_rows].assign(
+            **{name: mask[invalid_rows] for name, mask in flags.items()}
+        )
+        quarantine.to_csv(quarantine_path, index=False)
+        print(f"   - Quarentena salva em: {quarantine_path}")
+    
+    report = {
+        'total_linhas': int(len(df)),
+        'linhas_invalidas': n_invalid,
+        'violacoes_por_coluna': violations,
+        'faltantes_por_coluna': missing,
+        'regras': rules,
+    }
+    
+    return df[~invalid_rows].reset_index(drop=True), report
+
+def parse_structured_features(df):
+    """Converte Credit_History_Age e Type_of_Loan em colunas numericas."""
+    print("\nConvertendo colunas textuais estruturadas...")
+    
+    df = parse_structured_columns(df)
+    
+    if CREDIT_HISTORY_MONTHS in df.columns:
+        print(f"   - Criada: {CREDIT_HISTORY_MONTHS}")
+    if LOAN_TYPE_COLUMNS[0] in df.columns:
+        print(f"   - Criadas: {len(LOAN_TYPE_COLUMNS)} colunas multi-hot de Type_of_Loan")
     
     return df
 
@@ -94,22 +190,12 @@ def create_features(df):
     """Cria novas features de forma segura."""
     print("\nCriando novas features...")
     
-    # 1. Ratio Dívida/Renda (com tratamento de erros)
-    if 'Outstanding_Debt' in df.columns and 'Annual_Income' in df.columns:
-        # Garantir que são numéricas
-        df['Debt_Income_Ratio'] = df['Outstanding_Debt'] / (df['Annual_Income'].replace(0, 1))
-        print("   - Criada: Debt_Income_Ratio")
-    
-    # 2. Utilização total de crédito
-    if 'Num_Credit_Card' in df.columns and 'Credit_Utilization_Ratio' in df.columns:
-        df['Total_Credit_Usage'] = df['Num_Credit_Card'] * df['Credit_Utilization_Ratio']
-        print("   - Criada: Total_Credit_Usage")
-    
-    # 3. Score de pagamento (baseado em atrasos)
-    if 'Num_of_Delayed_Payment' in df.columns:
-        df['Payment_Score'] = 100 - (df['Num_of_Delayed_Payment'] * 5)
-        df['Payment_Score'] = df['Payment_Score'].clip(0, 100)
-        print("   - Criada: Payment_Score")
+    # Mesmas definicoes usadas pelo FeatureTransformer na API:
+    # Debt_Income_Ratio, Total_Credit_Usage e Payment_Score
+    for name, required, func in ENGINEERED_FEATURES:
+        if all(col in df.columns for col in required):
+            df[name] = func(df)
+            print(f"   - Criada: {name}")
     
     return df
 
@@ -164,23 +250,53 @@ def main():
     print("PREPARACAO DE DADOS - QUANTUMFINANCE CREDIT SCORE")
     print("="*60)
     
+    profiler = PipelineProfiler("prepare_data", track_memory=PROFILE_TRACK_MEMORY)
+    
     # 1. Carregar e explorar
-    df = load_and_explore()
+    with profiler.stage("load_and_explore") as stage:
+        df = load_and_explore()
+        stage.rows = len(df)
+    
+    # 2. Converter colunas textuais estruturadas
+    with profiler.stage("parse_structured_features", rows=len(df)):
+        df = parse_structured_features(df)
+    
+    # 3. Limpar dados numéricos (faltantes ficam NaN ate a validacao)
+    with profiler.stage("clean_numeric_columns", rows=len(df)):
+        df = clean_numeric_columns(df, fill_missing=False)
+    
+    # 4. Validar faixas de valores (linhas invalidas vao para quarentena)
+    with profiler.stage("validate_data", rows=len(df)):
+        df, validation_report = validate_data(df, quarantine_path=DATA_PROCESSED / "quarantine.csv")
+    
+    # 4b. Preencher faltantes com a mediana das linhas validas
+    with profiler.stage("fill_missing_numeric", rows=len(df)):
+        df = fill_missing_numeric(df)
     
-    # 2. Limpar dados numéricos
-    df = clean_numeric_columns(df)
+    # 5. Limpar dados categóricos
+    with profiler.stage("clean_categorical_columns", rows=len(df)):
+        df = clean_categorical_columns(df)
     
-    # 3. Limpar dados categóricos
-    df = clean_categorical_columns(df)
+    # 6. Criar features
+    with profiler.stage("create_features", rows=len(df)):
+        df_processed = create_features(df)
     
-    # 4. Criar features
-    df_processed = create_features(df)
+    # 7. Preparar dataset final
+    with profiler.stage("prepare_final_dataset") as stage:
+        df_final = prepare_final_dataset(df_processed)
+        stage.rows = len(df_final)
     
-    # 5. Preparar dataset final
-    df_final = prepare_final_dataset(df_processed)
+    # 8. Salvar
+    with profiler.stage("save_data", rows=len(df_final)):
+        save_data(df_processed, df_final)
+        with open(DATA_PROCESSED / "validation_report.json", 'w') as f:
+            json.dump(validation_report, f, indent=2)
     
-    # 6. Salvar
-    save_data(df_processed, df_final)
+    # 9. Perfil de desempenho (JSON + MLflow)
+    profiler.print_report()
+    profile_path = profiler.save()
+    print(f"   - Perfil salvo em: {profile_path}")
+    profiler.log_to_mlflow(profile_path)
     
     print("\nPROCESSAMENTO CONCLUIDO COM SUCESSO!")
     print("   Proximos passos:")
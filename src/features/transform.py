@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline unico de transformacao de features (treino e API)
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Concentra limpeza, features engenheiradas, codificacao e padronizacao em um
+objeto ajustado uma vez no treinamento e salvo junto com o modelo. A API usa
+o mesmo objeto, evitando listas de colunas mantidas a mao.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.features.parsers import (
+    parse_structured_columns, parse_credit_history_age_value,
+    parse_type_of_loan_value, CREDIT_HISTORY_MONTHS
+)
+
+# Mapeamento dos campos da API (snake_case) para as colunas do dataset
+FIELD_TO_COLUMN = {
+    'age': 'Age',
+    'occupation': 'Occupation',
+    'annual_income': 'Annual_Income',
+    'monthly_inhand_salary': 'Monthly_Inhand_Salary',
+    'num_bank_accounts': 'Num_Bank_Accounts',
+    'num_credit_card': 'Num_Credit_Card',
+    'interest_rate': 'Interest_Rate',
+    'num_of_loan': 'Num_of_Loan',
+    'type_of_loan': 'Type_of_Loan',
+    'delay_from_due_date': 'Delay_from_due_date',
+    'num_of_delayed_payment': 'Num_of_Delayed_Payment',
+    'changed_credit_limit': 'Changed_Credit_Limit',
+    'num_credit_inquiries': 'Num_Credit_Inquiries',
+    'credit_mix': 'Credit_Mix',
+    'outstanding_debt': 'Outstanding_Debt',
+    'credit_utilization_ratio': 'Credit_Utilization_Ratio',
+    'credit_history_age': 'Credit_History_Age',
+    'payment_of_min_amount': 'Payment_of_Min_Amount',
+    'total_emi_per_month': 'Total_EMI_per_month',
+    'amount_invested_monthly': 'Amount_invested_monthly',
+    'payment_behaviour': 'Payment_Behaviour',
+    'monthly_balance': 'Monthly_Balance',
+}
+
+# Colunas numericas que chegam "sujas" no dataset bruto ("28_", "1,000")
+NUMERIC_COLUMNS = ['Age', 'Annual_Income', 'Monthly_Inhand_Salary',
+                   'Num_Bank_Accounts', 'Num_Credit_Card', 'Interest_Rate',
+                   'Num_of_Loan', 'Outstanding_Debt', 'Credit_Utilization_Ratio',
+                   'Total_EMI_per_month', 'Amount_invested_monthly', 'Monthly_Balance',
+                   'Num_of_Delayed_Payment', 'Num_Credit_Inquiries',
+                   'Changed_Credit_Limit', CREDIT_HISTORY_MONTHS]
+
+# Features engenheiradas: (nome, colunas necessarias, funcao)
+# As funcoes usam apenas operacoes numpy, valendo para Series e escalares.
+ENGINEERED_FEATURES = [
+    ('Debt_Income_Ratio', ('Outstanding_Debt', 'Annual_Income'),
+     lambda d: d['Outstanding_Debt'] / np.where(d['Annual_Income'] == 0, 1, d['Annual_Income'])),
+    ('Total_Credit_Usage', ('Num_Credit_Card', 'Credit_Utilization_Ratio'),
+     lambda d: d['Num_Credit_Card'] * d['Credit_Utilization_Ratio']),
+    ('Payment_Score', ('Num_of_Delayed_Payment',),
+     lambda d: np.clip(100 - (d['Num_of_Delayed_Payment'] * 5), 0, 100)),
+]
+
+_NUMERIC_JUNK = re.compile(r'[_,]')
+
+
+def clean_numeric_series(series: pd.Series) -> pd.Series:
+    """Remove '_' e ',' e converte para numerico (invalidos viram NaN)."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    cleaned = series.astype(str).str.replace(_NUMERIC_JUNK, '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce')
+
+
+def clean_numeric_value(value) -> float:
+    """Versao escalar de clean_numeric_series."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(_NUMERIC_JUNK.sub('', str(value)))
+    except ValueError:
+        return np.nan
+
+
+def add_engineered_features(df):
+    """Adiciona as features engenheiradas disponiveis ao DataFrame."""
+    for name, required, func in ENGINEERED_FEATURES:
+        if all(col in df.columns for col in required):
+            df[name] = func(df)
+    return df
+
+
+class FeatureTransformer:
+    """
+    Transformacao completa de features ajustada no treinamento.
+
+    Aceita tanto o schema bruto (como recebido pela API) quanto o dataset
+    final ja limpo, pois todas as etapas sem estado sao idempotentes.
+    Codigos categoricos nao sao padronizados (media 0, escala 1).
+    """
+
+    def __init__(self):
+        self.feature_names_ = None
+        self.input_columns_ = None
+        self.categorical_columns_ = None
+        self.numeric_columns_ = None
+        self.medians_ = None
+        self.category_maps_ = None
+        self.fallback_codes_ = None
+        self.mean_ = None
+        self.scale_ = None
+        self.var_ = None
+        self.n_samples_seen_ = None
+
+    def fit(self, df):
+        """Ajusta medianas, codigos categoricos e padronizacao."""
+        df = self._clean(df, NUMERIC_COLUMNS)
+
+        engineered = {name for name, _, _ in ENGINEERED_FEATURES}
+        self.categorical_columns_ = [c for c in df.columns if df[c].dtype == object]
+        self.numeric_columns_ = [c for c in df.columns
+                                 if c not in self.categorical_columns_ and c not in engineered]
+        self.input_columns_ = [c for c in df.columns if c not in engineered]
+        self.medians_ = df[self.numeric_columns_].median().fillna(0).to_dict()
+
+        df = self._complete(df)
+        self.feature_names_ = list(df.columns)
+
+        # Codigos em ordem alfabetica, como o LabelEncoder
+        self.category_maps_ = {}
+        self.fallback_codes_ = {}
+        for col in self.categorical_columns_:
+            categories = sorted(df[col].unique())
+            self.category_maps_[col] = {value: code for code, value in enumerate(categories)}
+            self.fallback_codes_[col] = self.category_maps_[col][df[col].mode().iloc[0]]
+
+        X = self._encode(df)
+
+        self.n_samples_seen_ = len(X)
+        self._set_scaling(X.mean(axis=0), X.var(axis=0))
+
+        return self
+
+    def partial_fit(self, df, update_scaling=True):
+        """
+        Atualiza codificacao e padronizacao com novas linhas.
+
+        Categorias novas recebem os proximos codigos (os existentes nao
+        mudam); media e variancia sao combinadas com as acumuladas, com custo
+        proporcional as novas linhas. As medianas de imputacao ficam fixas.
+        Com update_scaling=False so a contagem de linhas avanca.
+        """
+        if getattr(self, 'n_samples_seen_', None) is None:
+            raise ValueError("n_samples_seen_ desconhecido: informe as linhas usadas no ajuste")
+
+        df = self._complete(self._clean(df, self.numeric_columns_))
+        for col in self.categorical_columns_:
+            mapping = self.category_maps_[col]
+            for value in sorted(set(df[col].unique()) - set(mapping)):
+                mapping[value] = len(mapping)
+
+        X = self._encode(df)
+        n_old, n_new = self.n_samples_seen_, len(X)
+        if not update_scaling:
+            self.n_samples_seen_ = n_old + n_new
+            return self
+
+        n_total = n_old + n_new
+        old_var = getattr(self, 'var_', None)
+        old_var = self.scale_ ** 2 if old_var is None else old_var
+
+        delta = X.mean(axis=0) - self.mean_
+        mean = self.mean_ + delta * n_new / n_total
+        var = (old_var * n_old + X.var(axis=0) * n_new + delta ** 2 * n_old * n_new / n_total) / n_total
+
+        self.n_samples_seen_ = n_total
+        self._set_scaling(mean, var)
+        return self
+
+    def transform(self, df) -> np.ndarray:
+        """Transforma um DataFrame inteiro de forma vetorizada."""
+        df = self._clean(df, self.numeric_columns_)
+        df = self._complete(df)
+        X = self._encode(df)
+        return (X - self.mean_) / self.scale_
+
+    def fit_transform(self, df) -> np.ndarray:
+        """Ajusta e transforma."""
+        return self.fit(df).transform(df)
+
+    def categorical_mask(self) -> np.ndarray:
+        """Mascara booleana das colunas categoricas (codigos inteiros) na saida."""
+        return np.array([col in self.category_maps_ for col in self.feature_names_])
+
+    def transform_one(self, record: dict) -> np.ndarray:
+        """Transforma um unico registro sem passar pelo pandas."""
+        values = dict(record)
+
+        if 'Credit_History_Age' in values:
+            values[CREDIT_HISTORY_MONTHS] = parse_credit_history_age_value(
+                values.pop('Credit_History_Age'))
+        if 'Type_of_Loan' in values:
+            values.update(parse_type_of_loan_value(values.pop('Type_of_Loan')))
+
+        for col in self.numeric_columns_:
+            value = clean_numeric_value(values.get(col, np.nan))
+            values[col] = self.medians_[col] if np.isnan(value) else value
+
+        for name, _, func in ENGINEERED_FEATURES:
+            values[name] = float(func(values))
+
+        row = np.empty(len(self.feature_names_))
+        for i, col in enumerate(self.feature_names_):
+            mapping = self.category_maps_.get(col)
+            if mapping is None:
+                row[i] = values[col]
+            else:
+                value = values.get(col)
+                value = 'Unknown' if value is None or value != value else str(value)
+                row[i] = mapping.get(value, self.fallback_codes_[col])
+
+        return ((row - self.mean_) / self.scale_).reshape(1, -1)
+
+    def _set_scaling(self, mean, var):
+        """Define media/escala; categoricas ficam com media 0 e escala 1."""
+        is_categorical = self.categorical_mask()
+        scale = np.sqrt(var)
+        scale[scale == 0] = 1.0
+        self.var_ = np.where(is_categorical, 0.0, var)
+        self.mean_ = np.where(is_categorical, 0.0, mean)
+        self.scale_ = np.where(is_categorical, 1.0, scale)
+
+    def _clean(self, df, numeric_columns):
+        """Etapas sem estado: parsers, conversao numerica e categoricas."""
+        df = parse_structured_columns(df.copy())
+
+        for col in numeric_columns:
+            if col in df.columns:
+                df[col] = clean_numeric_series(df[col])
+
+        for col in (self.categorical_columns_ or []):
+            if col in df.columns:
+                df[col] = df[col].fillna('Unknown').astype(str)
+        if self.categorical_columns_ is None:
+            for col in df.select_dtypes(include=['object']).columns:
+                df[col] = df[col].fillna('Unknown').astype(str)
+
+        return df
+
+    def _complete(self, df):
+        """Preenche faltantes com medianas e cria features engenheiradas."""
+        df = df.reindex(columns=self.input_columns_)
+        df[self.numeric_columns_] = df[self.numeric_columns_].fillna(self.medians_)
+        return add_engineered_features(df)
+
+    def _encode(self, df) -> np.ndarray:
+        """Monta a matriz final (ordem de feature_names_) com codigos categoricos."""
+        X = np.empty((len(df), len(self.feature_names_)))
+        for i, col in enumerate(self.feature_names_):
+            mapping = self.category_maps_.get(col)
+            if mapping is None:
+                X[:, i] = df[col].to_numpy(dtype=float)
+            else:
+                codes = df[col].map(mapping)
+                X[:, i] = codes.fillna(self.fallback_codes_[col]).to_numpy(dtype=float)
+        return X
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Artefatos de modelos: serializacao unica e escrita em segundo plano
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Cada modelo e serializado uma unica vez (formato MLflow, model.pkl em pickle)
+em um diretorio de staging. Upload para a run do MLflow, copia para models/
+e registro no Model Registry reutilizam esse arquivo e rodam em uma thread
+de escrita, sem bloquear o treinamento.
+
+Em models/, florestas podem ser gravadas no formato compacto: os nos de
+todas as arvores ficam em um array por campo (indices int32, limiares
+float32 arredondados para baixo, contagens em float32 quando exatas), sem
+alterar nenhuma predicao. Sem compressao os arrays ficam em .npy simples;
+com compressao rapida (zlib nivel 1) o artefato fica menor para
+transferencia. Na carga os campos sao copiados para o layout de nos do
+scikit-learn (float64 nos valores), entao a memoria em uso e a mesma do
+pickle nos dois casos.
+"""
+
+import copy
+import io
+import json
+import os
+import shutil
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+MODEL_FILE = "model.pkl"
+FOREST_DIR = "forest"
+
+# Formatos do artefato em models/ e compressoes disponiveis
+ARTIFACT_FORMATS = ("pickle", "compact")
+COMPRESSIONS = ("none", "fast")
+FAST_COMPRESSION_LEVEL = 1
+
+
+def stage_model(model, directory):
+    """Serializa o modelo uma vez no formato MLflow; retorna o diretorio."""
+    import mlflow.sklearn
+
+    directory = Path(directory)
+    mlflow.sklearn.save_model(model, str(directory), serialization_format="pickle")
+    return directory
+
+
+def load_staged_model(directory):
+    """Le o model.pkl de um diretorio de staging."""
+    return joblib.load(Path(directory) / MODEL_FILE)
+
+
+def upload_model(run_id, directory, artifact_path="model"):
+    """Envia o diretorio do modelo como artefato de uma run existente."""
+    from mlflow.tracking import MlflowClient
+
+    MlflowClient().log_artifacts(run_id, str(directory), artifact_path=artifact_path)
+    return f"runs:/{run_id}/{artifact_path}"
+
+
+def link_or_copy(source, destination):
+    """Cria hard link do arquivo (mesmo disco) ou copia quando nao for possivel."""
+    source, destination = Path(source), Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+    return destination
+
+
+class BackgroundWriter:
+    """
+    Fila de escrita atendida por uma unica thread.
+
+    As tarefas rodam na ordem de envio (um registro enviado depois de um
+    upload sempre encontra o artefato pronto). wait() bloqueia ate o fim e
+    propaga o primeiro erro.
+    """
+
+    def __init__(self, name="artifact-writer"):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._tasks = []
+
+    def submit(self, func, *args, **kwargs):
+        """Enfileira func(*args, **kwargs) e retorna o Future."""
+        future = self._executor.submit(func, *args, **kwargs)
+        self._tasks.append((func.__name__, future))
+        return future
+
+    def wait(self):
+        """Espera todas as tarefas; retorna o tempo bloqueado em segundos."""
+        start = time.perf_counter()
+        try:
+            for _, future in self._tasks:
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True)
+        return time.perf_counter() - start
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._executor.shutdown(wait=True)
+        return False
+
+
+def latest_model_dir(models_dir):
+    """Pasta do modelo mais recente (<tipo>_<AAAAMMDD>_<HHMMSS>), de qualquer tipo."""
+    model_dirs = [path.parent for path in Path(models_dir).glob(f"*/{MODEL_FILE}")]
+    if not model_dirs:
+        return None
+    return max(model_dirs, key=lambda path: path.name.split("_")[-2:])
+
+
+def _floor_float32(values):
+    """Arredonda para float32 em direcao a -inf: para x float32, x <= t equivale a x <= t32."""
+    rounded = values.astype(np.float32)
+    above = rounded > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def _narrow(values, dtype):
+    """Converte para dtype apenas se a conversao for exata."""
+    narrowed = values.astype(dtype)
+    return narrowed if np.array_equal(narrowed, values) else values
+
+
+def _compact_field(name, values):
+    """Menor dtype que preserva as predicoes para um campo dos nos."""
+    if name == 'threshold':
+        return _floor_float32(values)
+    if name == 'impurity':
+        return values.astype(np.float32)  # so usada nas importancias
+    if values.dtype.kind == 'i':
+        return _narrow(values, np.int32)
+    if values.dtype.kind == 'f':
+        return _narrow(values, np.float32)  # contagens inteiras < 2**24
+    return values
+
+
+def _write_array(directory, name, values, compression):
+    """Grava um array como .npy (sem compressao) ou .npy.z (zlib rapido)."""
+    if compression == "none":
+        np.save(directory / f"{name}.npy", values)
+        return
+    buffer = io.BytesIO()
+    np.save(buffer, values)
+    (directory / f"{name}.npy.z").write_bytes(zlib.compress(buffer.getvalue(), FAST_COMPRESSION_LEVEL))
+
+
+def _read_array(directory, name, compression):
+    """Le um array gravado por _write_array."""
+    if compression == "none":
+        return np.load(directory / f"{name}.npy")
+    return np.load(io.BytesIO(zlib.decompress((directory / f"{name}.npy.z").read_bytes())))
+
+
+def is_forest(model):
+    """Indica se o modelo e um conjunto de arvores do sklearn (formato compacto)."""
+    return all(hasattr(estimator, 'tree_') for estimator in getattr(model, 'estimators_', [None]))
+
+
+def save_compact_forest(model, directory, compression="none"):
+    """
+    Grava os nos das arvores em arrays por campo; retorna o esqueleto.
+
+    O esqueleto e a floresta sem os tree_ (so hiperparametros e atributos
+    ajustados), pequeno o bastante para o pickle.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    states = [estimator.tree_.__getstate__() for estimator in model.estimators_]
+    nodes = np.concatenate([state['nodes'] for state in states])
+    fields = {name: _compact_field(name, nodes[name]) for name in nodes.dtype.names}
+    fields['values'] = _compact_field('values', np.concatenate([state['values'] for state in states]))
+    for name, values in fields.items():
+        _write_array(directory, name, values, compression)
+
+    meta = {'compression': compression, 'fields': list(nodes.dtype.names),
+            'node_counts': [int(state['node_count']) for state in states],
+            'max_depths': [int(state['max_depth']) for state in states]}
+    with open(directory / "meta.json", 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    skeleton = copy.copy(model)
+    skeleton.estimators_ = []
+    for estimator in model.estimators_:
+        estimator = copy.copy(estimator)
+        del estimator.tree_
+        skeleton.estimators_.append(estimator)
+    skeleton.compact_forest_ = directory.name
+    return skeleton
+
+
+def load_compact_forest(skeleton, directory):
+    """Reconstroi os tree_ do esqueleto a partir dos arrays (copiados para NODE_DTYPE)."""
+    from sklearn.tree._tree import Tree, NODE_DTYPE
+
+    directory = Path(directory)
+    with open(directory / "meta.json") as f:
+        meta = json.load(f)
+    fields = {name: _read_array(directory, name, meta['compression'])
+              for name in meta['fields'] + ['values']}
+
+    offsets = np.concatenate([[0], np.cumsum(meta['node_counts'])])
+    for i, estimator in enumerate(skeleton.estimators_):
+        start, end = offsets[i], offsets[i + 1]
+        nodes = np.empty(end - start, dtype=NODE_DTYPE)
+        for name in NODE_DTYPE.names:
+            nodes[name] = fields[name][start:end]
+        values = np.ascontiguousarray(fields['values'][start:end], dtype=np.float64)
+
+        tree = Tree(estimator.n_features_in_, np.atleast_1d(estimator.n_classes_).astype(np.intp),
+                    estimator.n_outputs_)
+        tree.__setstate__({'max_depth': meta['max_depths'][i], 'node_count': int(end - start),
+                           'nodes': nodes, 'values': values})
+        estimator.tree_ = tree
+
+    del skeleton.compact_forest_
+    return skeleton
+
+
+def save_model_artifact(model, directory, artifact_format="pickle", compression="none"):
+    """
+    Grava o model.pkl no formato escolhido e retorna seu caminho.
+
+    "compact" vale para florestas (outros modelos caem no pickle). O
+    model.pkl e sempre o ultimo arquivo gravado.
+    """
+    directory = Path(directory)
+    path = directory / MODEL_FILE
+    if artifact_format == "compact" and is_forest(model):
+        skeleton = save_compact_forest(model, directory / FOREST_DIR, compression)
+        joblib.dump(skeleton, path)
+    else:
+        compress = ('zlib', FAST_COMPRESSION_LEVEL) if compression == "fast" else 0
+        joblib.dump(model, path, compress=compress)
+    return path
+
+
+def load_model_artifact(directory):
+    """Le o model.pkl de uma pasta de models/ em qualquer formato."""
+    directory = Path(directory)
+    model = joblib.load(directory / MODEL_FILE)
+    forest_dir = getattr(model, 'compact_forest_', None)
+    if forest_dir is not None:
+        model = load_compact_forest(model, directory / forest_dir)
+    return model
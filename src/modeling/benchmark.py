@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de inferencia e selecao de modelos com restricoes
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Mede o custo de servir cada candidato (latencia por linha e por lote,
+memoria, tamanho serializado e tempo de carga) e escolhe o melhor pela
+metrica de qualidade respeitando limites como "p99 por linha < X ms".
+
+Tambem compara os formatos de artefato do model.pkl (tamanho, carga e
+primeira predicao em um processo novo, como um pod recem-criado):
+    python src/modeling/benchmark.py --artifacts
+"""
+
+import argparse
+import json
+import multiprocessing
+import pickle
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config import MODELS_DIR, DATA_FINAL, REPORTS_DIR
+
+# Tamanho do lote medido (maximo aceito por /predict/batch)
+BATCH_SIZE = 100
+
+
+def _percentiles(timings, prefix):
+    """p50/p95/p99 em milissegundos."""
+    timings_ms = np.asarray(timings) * 1000
+    return {f"{prefix}_p{q}_ms": float(np.percentile(timings_ms, q)) for q in (50, 95, 99)}
+
+
+def benchmark_model(model, X_sample, n_single=200, n_batches=20, batch_size=BATCH_SIZE,
+                    model_file=None):
+    """
+    Mede o modelo como a API o usa (predict_proba em float64).
+
+    Retorna tamanho serializado, memoria e tempo para desserializar,
+    percentis de latencia por linha e por lote e vazao do lote. Com
+    model_file, usa o arquivo ja serializado em vez de serializar de novo.
+    """
+    X_sample = np.asarray(X_sample, dtype=float)
+    stats = {}
+
+    # Tamanho serializado e custo de carga (memoria alocada ao desserializar)
+    if model_file is not None:
+        payload = Path(model_file).read_bytes()
+    else:
+        payload = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    stats['artifact_size_mb'] = len(payload) / 1024 ** 2
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    mem_start, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    loaded = pickle.loads(payload)
+    stats['load_time_ms'] = (time.perf_counter() - start) * 1000
+    _, mem_peak = tracemalloc.get_traced_memory()
+    if not was_tracing:
+        tracemalloc.stop()
+    stats['memory_mb'] = max(mem_peak - mem_start, 0) / 1024 ** 2
+    del loaded
+
+    # Uma linha por chamada (/predict)
+    loaded_rows = len(X_sample)
+    timings = []
+    for i in range(n_single):
+        row = X_sample[i % loaded_rows:i % loaded_rows + 1]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+    stats.update(_percentiles(timings, "latency_single"))
+
+    # Lotes (/predict/batch)
+    batch = X_sample[np.arange(batch_size) % loaded_rows]
+    timings = []
+    for _ in range(n_batches):
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        timings.append(time.perf_counter() - start)
+    stats.update(_percentiles(timings, "latency_batch"))
+    stats['batch_rows_per_s'] = batch_size / float(np.median(timings))
+
+    return stats
+
+
+def parse_constraints(texts):
+    """Converte ['latency_single_p99_ms<20', ...] em {metrica: limite}."""
+    constraints = {}
+    for text in texts:
+        name, _, limit = text.partition('<')
+        constraints[name.strip()] = float(limit)
+    return constraints
+
+
+def select_model(candidates, metric='f1_score', constraints=None):
+    """
+    Escolhe o candidato com maior `metric` entre os que respeitam os limites.
+
+    candidates: {nome: {metrica: valor}}; constraints: {metrica: maximo}.
+    Se nenhum respeitar, escolhe o que menos viola (menor razao valor/limite).
+    Retorna (nome, viaveis).
+    """
+    constraints = constraints or {}
+
+    def violation(values):
+        return max((values[name] / limit for name, limit in constraints.items()), default=0.0)
+
+    feasible = [name for name, values in candidates.items() if violation(values) < 1]
+    if feasible:
+        best = max(feasible, key=lambda name: candidates[name][metric])
+    else:
+        best = min(candidates, key=lambda name: violation(candidates[name]))
+    return best, feasible
+
+
+def _cold_load(directory, row):
+    """Carrega o artefato em um processo novo: (carga ms, primeira predicao ms, proba)."""
+    import sklearn.ensemble  # noqa: F401 - importar o sklearn nao conta como carga
+    from src.modeling.artifacts import load_model_artifact
+
+    start = time.perf_counter()
+    model = load_model_artifact(directory)
+    loaded = time.perf_counter()
+    proba = model.predict_proba(row)
+    return (loaded - start) * 1000, (time.perf_counter() - loaded) * 1000, proba
+
+
+def benchmark_artifacts(model, X_sample, directory, repeats=3):
+    """
+    Compara formatos/compressoes do model.pkl.
+
+    "none" e o formato sem compressao (arquivos maiores, sem custo de
+    descompressao); "fast" usa zlib nivel 1.
+
+    Para cada opcao: tamanho em disco, mediana da carga e da primeira
+    predicao (uma linha) em processos novos e se as predicoes no X_sample
+    sao identicas as do modelo original.
+    """
+    from src.modeling.artifacts import (save_model_artifact, load_model_artifact,
+                                        ARTIFACT_FORMATS, COMPRESSIONS)
+
+    X_sample = np.asarray(X_sample, dtype=float)
+    expected = model.predict_proba(X_sample)
+    context = multiprocessing.get_context('spawn')
+    results = {}
+
+    for artifact_format in ARTIFACT_FORMATS:
+        for compression in COMPRESSIONS:
+            option = f"{artifact_format}/{compression}"
+            option_dir = Path(directory) / f"{artifact_format}_{compression}"
+            option_dir.mkdir(parents=True, exist_ok=True)
+            save_model_artifact(model, option_dir, artifact_format, compression)
+
+            timings = []
+            for _ in range(repeats):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    timings.append(pool.submit(_cold_load, str(option_dir), X_sample[:1]).result())
+
+            loaded = load_model_artifact(option_dir)
+            results[option] = {
+                'size_mb': sum(f.stat().st_size for f in option_dir.rglob('*') if f.is_file()) / 1024 ** 2,
+                'load_time_ms': float(np.median([t[0] for t in timings])),
+                'first_prediction_ms': float(np.median([t[1] for t in timings])),
+                'identical_predictions': bool(np.array_equal(loaded.predict_proba(X_sample), expected)),
+            }
+            print(f"   < {option:<16} {results[option]['size_mb']:8.2f} MB | "
+                  f"carga {results[option]['load_time_ms']:8.1f} ms | "
+                  f"1a predicao {results[option]['first_prediction_ms']:6.1f} ms")
+
+    return results
+
+
+def main():
+    """Compara os formatos de artefato do modelo mais recente."""
+    import joblib
+    import pandas as pd
+    from src.modeling.artifacts import latest_model_dir, load_model_artifact
+
+    parser = argparse.ArgumentParser(description="Benchmark de formatos de artefato")
+    parser.add_argument("--artifacts", action="store_true", help="Compara formatos do model.pkl")
+    parser.add_argument("--model-dir", default=None, help="Pasta do modelo (padrao: mais recente)")
+    parser.add_argument("--rows", type=int, default=1000, help="Linhas para checar as predicoes")
+    parser.add_argument("--repeats", type=int, default=3, help="Processos novos por opcao")
+    args = parser.parse_args()
+    if not args.artifacts:
+        parser.print_help()
+        return
+
+    model_dir = Path(args.model_dir) if args.model_dir else latest_model_dir(MODELS_DIR)
+    if model_dir is None:
+        print("ERRO: Nenhum modelo encontrado!")
+        return
+    print(f"Modelo: {model_dir.name}")
+    model = load_model_artifact(model_dir)
+    encoders = joblib.load(model_dir / "encoders.pkl")
+    sample = pd.read_csv(DATA_FINAL / "credit_score_final.csv", nrows=args.rows)
+    X_sample = encoders['transformer'].transform(sample.drop(columns=['Credit_Score']))
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = benchmark_artifacts(model, X_sample, directory, repeats=args.repeats)
+
+    REPORTS_DIR.mkdir(exist_ok=True)
+    report_path = REPORTS_DIR / f"artifacts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_path, 'w') as f:
+        json.dump({'model': model_dir.name, 'results': results}, f, indent=2)
+    print(f"   - Relatorio salvo em: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
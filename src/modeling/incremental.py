@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Retreino incremental com as linhas rotuladas desde o ultimo modelo
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Atualiza o modelo mais recente sem refazer o treino completo:
+- Random Forest: cresce novas arvores (warm_start) so com as linhas novas e
+  aposenta as mais antigas, mantendo o tamanho da floresta;
+- Regressao Logistica: passos de gradiente (partial fit) partindo dos
+  coeficientes atuais.
+
+A transformacao de features e atualizada com partial_fit: categorias novas
+recebem os proximos codigos e, para modelos lineares, media/variancia sao
+combinadas com as acumuladas e coeficientes e intercepto sao reescritos na
+nova escala (mesmas predicoes de antes para as mesmas entradas brutas). Arvores
+nao dependem da escala: a padronizacao fica fixa e as arvores antigas
+continuam identicas. O custo depende apenas do numero de linhas novas.
+
+As linhas novas vem de um lote separado (--new-data, schema do CSV final).
+O CSV final e regravado a cada preparacao e a validacao remove linhas para
+a quarentena, entao posicoes nele nao identificam as linhas ja usadas.
+
+Uso:
+    python src/modeling/incremental.py --new-data lote.csv
+"""
+
+import argparse
+import copy
+import json
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config import MODELS_DIR, RANDOM_STATE
+from src.modeling.artifacts import latest_model_dir, load_model_artifact
+from src.monitoring.drift import REFERENCE_FILE
+
+# Estado do retreino salvo junto com o modelo
+STATE_FILE = "training_state.json"
+
+# Partial fit da Regressao Logistica
+LINEAR_EPOCHS = 5
+LINEAR_LEARNING_RATE = 0.05
+LINEAR_BATCH_SIZE = 256
+
+
+def load_state(model_dir, encoders):
+    """Estado do retreino; modelos do treino completo usam o ajuste da transformacao."""
+    state_path = Path(model_dir) / STATE_FILE
+    if state_path.exists():
+        with open(state_path) as f:
+            return json.load(f)
+    return {'rows_seen': getattr(encoders['transformer'], 'n_samples_seen_', None),
+            'refreshes': 0, 'base_model': Path(model_dir).name}
+
+
+def rescale_linear(model, old_mean, old_scale, new_mean, new_scale):
+    """Ajusta coeficientes e intercepto para a nova padronizacao (in-place)."""
+    coef = model.coef_.copy()
+    model.coef_ = coef * new_scale / old_scale
+    model.intercept_ = model.intercept_ + coef @ ((new_mean - old_mean) / old_scale)
+    return model
+
+
+def refresh_forest(forest, X, y, n_trees, seed):
+    """
+    Cresce n_trees arvores com (X, y) e aposenta as n_trees mais antigas.
+
+    Classes ausentes no lote entram com peso zero (o treino as ignora), para
+    que as novas arvores tenham a mesma saida das antigas.
+    """
+    sample_weight = np.ones(len(y))
+    missing = np.setdiff1d(forest.classes_, y)
+    if len(missing):
+        X = np.vstack([X, np.repeat(X[:1], len(missing), axis=0)])
+        y = np.concatenate([y, missing])
+        sample_weight = np.concatenate([sample_weight, np.zeros(len(missing))])
+
+    n_trees = min(n_trees, len(forest.estimators_))
+    forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + n_trees,
+                      random_state=seed)
+    forest.fit(X, y, sample_weight=sample_weight)
+
+    forest.estimators_ = forest.estimators_[n_trees:]
+    forest.set_params(warm_start=False, n_estimators=len(forest.estimators_))
+    return forest
+
+
+def partial_fit_logistic(model, X, y, n_samples_seen, epochs=LINEAR_EPOCHS,
+                         learning_rate=LINEAR_LEARNING_RATE, batch_size=LINEAR_BATCH_SIZE,
+                         seed=RANDOM_STATE):
+    """
+    Mini-lotes de gradiente da log-loss multinomial a partir dos coeficientes atuais.
+
+    A penalidade L2 segue a da LogisticRegression (1/C) diluida pelo total de
+    linhas ja vistas.
+    """
+    if model.coef_.shape[0] > 1 and model.multi_class == 'ovr':
+        raise ValueError("partial fit suporta apenas a regressao logistica multinomial")
+
+    targets = (np.asarray(y)[:, None] == model.classes_[None, :]).astype(float)
+    l2 = 1.0 / (model.C * n_samples_seen)
+    rng = np.random.RandomState(seed)
+
+    for _ in range(epochs):
+        order = rng.permutation(len(X))
+        for start in range(0, len(X), batch_size):
+            rows = order[start:start + batch_size]
+            error = model.predict_proba(X[rows]) - targets[rows]
+            if model.coef_.shape[0] == 1:
+                error = error[:, 1:]
+            model.coef_ -= learning_rate * (error.T @ X[rows] / len(rows) + l2 * model.coef_)
+            model.intercept_ -= learning_rate * error.mean(axis=0)
+    return model
+
+
+def incremental_update(model, encoders, new_df, rows_seen, n_trees=None, seed=RANDOM_STATE):
+    """
+    Atualiza transformacao e modelo com as linhas novas (schema do CSV final).
+
+    Retorna (modelo, encoders, metricas no lote antes da atualizacao). As
+    metricas sao medidas antes de treinar com o lote (avaliacao prequencial).
+    """
+    model, encoders = copy.deepcopy(model), copy.deepcopy(encoders)
+    transformer = encoders['transformer']
+    if getattr(transformer, 'n_samples_seen_', None) is None:
+        transformer.n_samples_seen_ = rows_seen
+
+    X_raw = new_df.drop(columns=['Credit_Score'])
+    y = encoders['target'].transform(new_df['Credit_Score'])
+
+    # 1. Avaliar o modelo atual no lote novo
+    y_pred = model.predict(transformer.transform(X_raw))
+    metrics = {
+        'accuracy': accuracy_score(y, y_pred),
+        'precision': precision_score(y, y_pred, average='weighted', zero_division=0),
+        'recall': recall_score(y, y_pred, average='weighted', zero_division=0),
+        'f1_score': f1_score(y, y_pred, average='weighted', zero_division=0)
+    }
+
+    # 2. Atualizar a transformacao e treinar com as linhas novas
+    if isinstance(model, RandomForestClassifier):
+        transformer.partial_fit(X_raw, update_scaling=False)
+        X = transformer.transform(X_raw)
+        if n_trees is None:
+            n_trees = int(round(len(model.estimators_) * len(X) / transformer.n_samples_seen_))
+        refresh_forest(model, X, y, max(n_trees, 1), seed)
+    elif isinstance(model, LogisticRegression):
+        old_mean, old_scale = transformer.mean_.copy(), transformer.scale_.copy()
+        transformer.partial_fit(X_raw)
+        rescale_linear(model, old_mean, old_scale, transformer.mean_, transformer.scale_)
+        X = transformer.transform(X_raw)
+        partial_fit_logistic(model, X, y, transformer.n_samples_seen_, seed=seed)
+    else:
+        raise ValueError(f"{type(model).__name__} nao suporta retreino incremental; "
+                         f"use o treino completo")
+
+    return model, encoders, metrics
+
+
+def main():
+    """Atualiza o modelo mais recente com os dados rotulados novos."""
+    from src.modeling import train_model
+
+    parser = argparse.ArgumentParser(description="Retreino incremental do modelo")
+    parser.add_argument("--model-dir", default=None, help="Modelo base (padrao: mais recente)")
+    parser.add_argument("--new-data", required=True,
+                        help="CSV so com as linhas novas (schema do CSV final)")
+    parser.add_argument("--since-row", type=int, default=None,
+                        help="Total de linhas ja usadas pelo modelo base (se nao houver estado salvo)")
+    parser.add_argument("--trees", type=int, default=None,
+                        help="Arvores substituidas (padrao: proporcional ao lote)")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("RETREINO INCREMENTAL - QUANTUMFINANCE")
+    print("="*60)
+
+    # 1. Modelo base e estado
+    model_dir = Path(args.model_dir) if args.model_dir else latest_model_dir(MODELS_DIR)
+    if model_dir is None:
+        print("ERRO: Nenhum modelo encontrado!")
+        return
+    model = load_model_artifact(model_dir)
+    encoders = joblib.load(model_dir / "encoders.pkl")
+    state = load_state(model_dir, encoders)
+    if args.since_row is not None:
+        state['rows_seen'] = args.since_row
+    if state['rows_seen'] is None:
+        print("ERRO: Linhas usadas pelo modelo base desconhecidas (use --since-row)")
+        return
+    print(f"Modelo base: {model_dir.name} ({state['rows_seen']} linhas vistas)")
+
+    # 2. Linhas novas
+    new_df = pd.read_csv(args.new_data)
+    if new_df.empty:
+        print("Nenhuma linha nova no lote.")
+        return
+    print(f"   - {len(new_df)} linhas novas")
+
+    # 3. Atualizar
+    try:
+        model, encoders, prequential = incremental_update(
+            model, encoders, new_df, state['rows_seen'], n_trees=args.trees,
+            seed=RANDOM_STATE + state['refreshes'] + 1)
+    except ValueError as e:
+        # Ex: HistGradientBoosting (selecionavel no treino completo)
+        print(f"ERRO: {e}")
+        return
+    print("\nMetricas no lote novo (antes da atualizacao):")
+    for metric, value in prequential.items():
+        print(f"   - {metric}: {value:.4f}")
+
+    # 4. Salvar como uma nova versao do mesmo tipo
+    model_name = model_dir.name.rsplit("_", 2)[0]
+    # Histogramas de referencia (sem padronizacao) continuam validos
+    reference_file = model_dir / REFERENCE_FILE
+    # Sem holdout, o modelo atualizado nao tem metricas proprias: as do lote
+    # medem o modelo anterior e ficam no estado, nao no metrics.json
+    new_dir = train_model.save_model(model, encoders, model_name, {},
+                                     reference_file=reference_file if reference_file.exists() else None)
+    # rows_seen conta as linhas ja usadas (peso das estatisticas acumuladas)
+    state = {'rows_seen': state['rows_seen'] + len(new_df), 'refreshes': state['refreshes'] + 1,
+             'base_model': state['base_model'], 'previous_model': model_dir.name,
+             'new_rows': len(new_df), 'prequential_before_update': prequential,
+             'updated_at': datetime.now().isoformat()}
+    with open(new_dir / STATE_FILE, 'w') as f:
+        json.dump(state, f, indent=2)
+
+    print("\n" + "="*60)
+    print("RETREINO CONCLUIDO!")
+    print(f"   - Modelo salvo em: {new_dir}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
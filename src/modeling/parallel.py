@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Treinamento de modelos candidatos em paralelo
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+A matriz de treino e gravada uma unica vez em arquivos .npy e cada processo
+a abre com memmap (somente leitura): as paginas sao compartilhadas pelo
+sistema operacional e nenhum worker recebe uma copia serializada dos dados.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+
+def share_arrays(arrays, directory, dtype=None):
+    """Grava arrays como .npy para leitura via memmap; retorna {nome: caminho}."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    paths = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if dtype is not None and array.dtype.kind == 'f':
+            array = array.astype(dtype, copy=False)
+        path = directory / f"{name}.npy"
+        np.save(path, array)
+        paths[name] = str(path)
+
+    return paths
+
+
+def load_shared(paths):
+    """Abre os arrays gravados por share_arrays sem copia-los para a memoria."""
+    return {name: np.load(path, mmap_mode='r') for name, path in paths.items()}
+
+
+def split_cores(multithreaded, n_cores=None):
+    """
+    Distribui os nucleos entre os candidatos.
+
+    multithreaded: {nome: bool}. Candidatos de uma thread ficam com um nucleo;
+    o restante e dividido entre os que usam n_jobs.
+    """
+    n_cores = n_cores or os.cpu_count() or 1
+    n_single = sum(1 for threaded in multithreaded.values() if not threaded)
+    n_threaded = len(multithreaded) - n_single
+    share = max(1, (n_cores - n_single) // max(n_threaded, 1))
+    return {name: share if threaded else 1 for name, threaded in multithreaded.items()}
+
+
+def run_parallel(worker, tasks, max_workers=None):
+    """
+    Executa worker(**kwargs) para cada tarefa em um pool de processos.
+
+    tasks: {nome: kwargs}. Retorna {nome: resultado} quando todos terminam.
+    Usa 'spawn' para que os workers nao herdem o estado do MLflow do pai.
+    """
+    context = multiprocessing.get_context('spawn')
+    max_workers = max_workers or len(tasks)
+    results = {}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {executor.submit(worker, **kwargs): name for name, kwargs in tasks.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            results[name] = future.result()
+            print(f"   < concluido: {name} ({time.perf_counter() - start:.2f}s)")
+
+    return results
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+Treino do Random Forest dividido em shards de arvores
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+As n_estimators arvores sao divididas em shards treinados em processos
+separados ("process") ou por workers conectados a uma fila TCP ("queue"),
+que podem estar em outros hosts; localmente a fila e atendida por processos
+da propria maquina. As arvores voltam para o processo principal e formam um
+RandomForestClassifier comum, salvo com save_model e lido pela API.
+
+Cada arvore usa a mesma semente e a mesma amostra bootstrap que o
+RandomForestClassifier sortearia a partir de RANDOM_STATE, e a ordem das
+arvores e preservada: o resultado e identico bit a bit ao treino em um
+unico processo, qualquer que seja o numero de shards.
+
+Uso:
+    python src/modeling/sharded_forest.py --shards 8
+    python src/modeling/sharded_forest.py --backend queue --local-workers 2
+    python src/modeling/sharded_forest.py --worker 10.0.0.5:50055   # em outro host
+
+Workers em outros hosts precisam enxergar o cache de features no mesmo
+caminho (ex: volume compartilhado) e a mesma chave em QF_SHARD_QUEUE_AUTHKEY.
+A fila desserializa (pickle) o que recebe, entao sem essa chave ela so aceita
+conexoes no loopback, com uma chave aleatoria por execucao.
+"""
+
+import argparse
+import ipaddress
+import multiprocessing
+import queue
+import secrets
+import time
+from multiprocessing.managers import BaseManager
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.utils import check_random_state
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config import (RANDOM_STATE, FOREST_SHARDS, SHARD_QUEUE_HOST, SHARD_QUEUE_PORT,
+                    SHARD_QUEUE_AUTHKEY)
+from src.modeling.parallel import load_shared, run_parallel
+
+
+def tree_seeds(n_estimators, random_state=RANDOM_STATE):
+    """Sementes das arvores, as mesmas que o RandomForestClassifier sorteia."""
+    return check_random_state(random_state).randint(np.iinfo(np.int32).max, size=n_estimators)
+
+
+def split_shards(n_estimators, n_shards):
+    """Divide os indices das arvores em shards contiguos: [(inicio, fim), ...]."""
+    bounds = np.linspace(0, n_estimators, min(n_shards, n_estimators) + 1).astype(int)
+    return [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def tree_params(params):
+    """Hiperparametros de cada arvore derivados dos da floresta."""
+    forest = RandomForestClassifier(**params)
+    return {name: getattr(forest, name) for name in forest.estimator_params
+            if name != 'random_state'}, forest.bootstrap
+
+
+def fit_trees(X, y, seeds, params):
+    """
+    Treina as arvores de um shard como o RandomForestClassifier faria.
+
+    y ja codificado (0..n_classes-1); a amostra bootstrap vira peso por linha.
+    """
+    params_tree, bootstrap = tree_params(params)
+    y = np.asarray(y, dtype=np.float64)
+    n_samples = len(y)
+
+    trees = []
+    for seed in seeds:
+        tree = DecisionTreeClassifier(**params_tree, random_state=int(seed))
+        sample_weight = None
+        if bootstrap:
+            indices = np.random.RandomState(seed).randint(0, n_samples, n_samples, dtype=np.int32)
+            sample_weight = np.bincount(indices, minlength=n_samples).astype(np.float64)
+        tree.fit(X, y, sample_weight=sample_weight)
+        trees.append(tree)
+    return trees
+
+
+def fit_shard(data_paths, seeds, params):
+    """Treina um shard lendo os dados de treino do cache via memmap."""
+    data = load_shared(data_paths)
+    _, y_encoded = np.unique(data['y_train'], return_inverse=True)
+    return fit_trees(data['X_train'], y_encoded, seeds, params)
+
+
+def merge_forest(shards, classes, n_features, params, n_jobs=-1):
+    """Junta as arvores dos shards (na ordem) em um RandomForestClassifier."""
+    trees = [tree for _, shard_trees in sorted(shards.items()) for tree in shard_trees]
+
+    forest = RandomForestClassifier(**{**params, 'n_estimators': len(trees)},
+                                    random_state=RANDOM_STATE, n_jobs=n_jobs)
+    forest.estimators_ = trees
+    forest.classes_ = np.asarray(classes)
+    forest.n_classes_ = len(classes)
+    forest.n_outputs_ = 1
+    forest.n_features_in_ = n_features
+    return forest
+
+
+# Fila TCP de shards: o processo principal publica tarefas e recolhe arvores
+_TASKS = queue.Queue()
+_RESULTS = queue.Queue()
+
+def _get_tasks():
+    return _TASKS
+
+def _get_results():
+    return _RESULTS
+
+
+class ShardQueueManager(BaseManager):
+    """Servidor de filas acessivel por workers locais ou remotos."""
+
+
+ShardQueueManager.register('get_tasks', callable=_get_tasks)
+ShardQueueManager.register('get_results', callable=_get_results)
+
+
+def is_loopback(host):
+    """Indica se o endereco so aceita conexoes da propria maquina."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def queue_authkey(host, authkey=SHARD_QUEUE_AUTHKEY):
+    """
+    Chave da fila em host.
+
+    Sem chave configurada, so o loopback e aceito e a chave e sorteada (os
+    workers locais a recebem como argumento).
+    """
+    if authkey:
+        return authkey
+    if not is_loopback(host):
+        raise ValueError(f"Fila em {host} exige QF_SHARD_QUEUE_AUTHKEY "
+                         "(a fila executa o que desserializa)")
+    return secrets.token_hex(16)
+
+
+def run_worker(address, authkey=SHARD_QUEUE_AUTHKEY):
+    """Atende shards da fila ate receber o sinal de fim (None)."""
+    if not authkey:
+        raise ValueError("Worker remoto exige QF_SHARD_QUEUE_AUTHKEY (a mesma da fila)")
+    manager = ShardQueueManager(address=address, authkey=authkey.encode('utf-8'))
+    manager.connect()
+    tasks, results = manager.get_tasks(), manager.get_results()
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        start = time.perf_counter()
+        trees = fit_shard(task['data_paths'], task['seeds'], task['params'])
+        results.put((task['shard'], trees))
+        print(f"   < shard {task['shard']} ({len(trees)} arvores, "
+              f"{time.perf_counter() - start:.2f}s)")
+
+
+def train_shards_process(data_paths, seeds, params, n_shards):
+    """Um processo por shard (pool local)."""
+    tasks = {start: {'data_paths': data_paths, 'seeds': seeds[start:end], 'params': params}
+             for start, end in split_shards(len(seeds), n_shards)}
+    return run_parallel(fit_shard, tasks)
+
+
+def train_shards_queue(data_paths, seeds, params, n_shards, local_workers=None,
+                       host=SHARD_QUEUE_HOST, port=SHARD_QUEUE_PORT,
+                       authkey=SHARD_QUEUE_AUTHKEY, timeout=None):
+    """
+    Publica os shards na fila TCP e espera as arvores.
+
+    local_workers processos desta maquina atendem a fila (substituto local de
+    outros hosts); com 0, apenas workers remotos iniciados com --worker.
+    """
+    shards = split_shards(len(seeds), n_shards)
+    local_workers = len(shards) if local_workers is None else local_workers
+    authkey = queue_authkey(host, authkey)
+
+    manager = ShardQueueManager(address=(host, port), authkey=authkey.encode('utf-8'))
+    manager.start()
+    context = multiprocessing.get_context('spawn')
+    workers = []
+    try:
+        tasks, results = manager.get_tasks(), manager.get_results()
+        for start, end in shards:
+            tasks.put({'shard': start, 'seeds': seeds[start:end],
+                       'params': params, 'data_paths': data_paths})
+
+        for _ in range(local_workers):
+            worker = context.Process(target=run_worker, args=(manager.address, authkey))
+            worker.start()
+            workers.append(worker)
+        print(f"   - Fila em {manager.address[0]}:{manager.address[1]} "
+              f"({len(shards)} shards, {local_workers} worker(s) local(is))")
+
+        collected = {}
+        while len(collected) < len(shards):
+            shard, trees = results.get(timeout=timeout)
+            collected[shard] = trees
+
+        # Sinal de fim para os workers locais (remotos encerram com Ctrl+C)
+        for _ in workers:
+            tasks.put(None)
+        for worker in workers:
+            worker.join()
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        manager.shutdown()
+
+    return collected
+
+
+def train_sharded_forest(data_paths, params, n_shards=FOREST_SHARDS, backend='process',
+                         **queue_options):
+    """Treina a floresta em shards e retorna o RandomForestClassifier montado."""
+    data = load_shared(data_paths)
+    classes = np.unique(data['y_train'])
+    seeds = tree_seeds(params['n_estimators'])
+
+    if backend == 'queue':
+        shards = train_shards_queue(data_paths, seeds, params, n_shards, **queue_options)
+    else:
+        shards = train_shards_process(data_paths, seeds, params, n_shards)
+
+    return merge_forest(shards, classes, data['X_train'].shape[1], params)
+
+
+def parse_address(text):
+    """Converte 'host:porta' em (host, porta)."""
+    host, _, port = text.rpartition(':')
+    return host or SHARD_QUEUE_HOST, int(port)
+
+
+def main():
+    """Treina o Random Forest em shards, salva e registra o modelo."""
+    from src.modeling import train_model
+    from src.pipeline.profiling import PipelineProfiler
+    import mlflow
+
+    parser = argparse.ArgumentParser(description="Random Forest treinado em shards")
+    parser.add_argument("--shards", type=int, default=FOREST_SHARDS, help="Numero de shards")
+    parser.add_argument("--backend", choices=["process", "queue"], default="process")
+    parser.add_argument("--local-workers", type=int, default=None,
+                        help="Workers locais da fila (0 = so hosts remotos)")
+    parser.add_argument("--bind", default=f"{SHARD_QUEUE_HOST}:{SHARD_QUEUE_PORT}",
+                        help="Endereco da fila (backend queue)")
+    parser.add_argument("--worker", metavar="HOST:PORTA", default=None,
+                        help="Executa apenas como worker de uma fila existente")
+    args = parser.parse_args()
+
+    if args.worker:
+        if not SHARD_QUEUE_AUTHKEY:
+            print("ERRO: Defina QF_SHARD_QUEUE_AUTHKEY com a chave da fila!")
+            sys.exit(1)
+        print(f"Worker conectado a {args.worker}")
+        run_worker(parse_address(args.worker))
+        return
+
+    print("\n" + "="*60)
+    print("RANDOM FOREST EM SHARDS - QUANTUMFINANCE")
+    print("="*60)
+
+    host, _ = parse_address(args.bind)
+    if args.backend == 'queue' and not SHARD_QUEUE_AUTHKEY and not is_loopback(host):
+        print(f"ERRO: Fila em {host} exige QF_SHARD_QUEUE_AUTHKEY!")
+        sys.exit(1)
+
+    profiler = PipelineProfiler("sharded_forest", track_memory=False)
+
+    # 1. Features do cache (compartilhadas com os workers via memmap)
+    features = train_model.load_features(profiler)
+    if features is None:
+        return
+    data_paths, encoders, manifest = features
+    data = load_shared(data_paths)
+    params = dict(train_model.RF_PARAMS)
+
+    # 2. Treinar shards e montar a floresta
+    print(f"\nTreinando {params['n_estimators']} arvores em {args.shards} shards ({args.backend})...")
+    queue_options = {}
+    if args.backend == 'queue':
+        host, port = parse_address(args.bind)
+        queue_options = {'local_workers': args.local_workers, 'host': host, 'port': port}
+    with profiler.stage("fit_shards", rows=len(data['y_train'])):
+        model = train_sharded_forest(data_paths, params, args.shards, args.backend,
+                                     **queue_options)
+
+    # 3. Avaliar
+    with profiler.stage("evaluate", rows=len(data['y_test'])):
+        y_pred = model.predict(data['X_test'])
+        metrics = {
+            'accuracy': accuracy_score(data['y_test'], y_pred),
+            'precision': precision_score(data['y_test'], y_pred, average='weighted'),
+            'recall': recall_score(data['y_test'], y_pred, average='weighted'),
+            'f1_score': f1_score(data['y_test'], y_pred, average='weighted')
+        }
+    for metric, value in metrics.items():
+        print(f"   - {metric}: {value:.4f}")
+
+    # 4. Salvar e registrar como um Random Forest comum
+    with profiler.stage("save_model"):
+        model_dir = train_model.save_model(model, encoders, "random_forest", metrics,
+                                           X_reference=data['X_train'])
+    with profiler.stage("mlflow_register_model"):
+        with mlflow.start_run(run_name="random_forest_sharded") as run:
+            train_model.log_candidate(model, "RandomForest", metrics,
+                                      {**params, 'shards': args.shards, 'backend': args.backend,
+                                       'feature_cache': manifest['key']})
+        # Versao registrada aponta para o modelo ja enviado (serializado uma vez)
+        train_model.register_best_model(model, "random_forest", metrics,
+                                        model_uri=f"runs:/{run.info.run_id}/model")
+
+    profiler.print_report()
+    profile_path = profiler.save()
+    profiler.log_to_mlflow(profile_path, run_id=run.info.run_id)
+
+    print("\n" + "="*60)
+    print("TREINAMENTO CONCLUIDO!")
+    print(f"   - Modelo salvo em: {model_dir}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
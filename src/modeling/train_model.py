@@ -14,23 +14,39 @@ import numpy as np
 from pathlib import Path
 import joblib
 import json
+import tempfile
+import time
 from datetime import datetime
 
 # Bibliotecas de ML
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from threadpoolctl import threadpool_limits
 
 # MLflow para tracking
 import mlflow
 import mlflow.sklearn
+from mlflow.tracking import MlflowClient
 
 # Configuracoes
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from config import DATA_FINAL, MODELS_DIR, MLFLOW_TRACKING_URI, MLFLOW_EXPERIMENT_NAME, RANDOM_STATE, TEST_SIZE
+from config import PROFILE_TRACK_MEMORY, SELECTION_METRIC, SELECTION_CONSTRAINTS
+from config import MODEL_ARTIFACT_FORMAT, MODEL_ARTIFACT_COMPRESSION, DRIFT_BINS
+from src.features import transform, parsers
+from src.features.transform import FeatureTransformer
+from src.features.feature_cache import FeatureCache
+from src.pipeline.profiling import PipelineProfiler
+from src.monitoring.drift import Reference, unscale, REFERENCE_FILE
+from src.modeling.parallel import load_shared, split_cores, run_parallel
+from src.modeling.benchmark import benchmark_model, select_model
+from src.modeling.artifacts import (stage_model, load_staged_model, upload_model,
+                                    link_or_copy, save_model_artifact, BackgroundWriter,
+                                    MODEL_FILE)
 
 # Criar pasta de modelos
 MODELS_DIR.mkdir(exist_ok=True)
@@ -39,6 +55,31 @@ MODELS_DIR.mkdir(exist_ok=True)
 mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
 mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
 
+# Hiperparametros padrao da Regressao Logistica
+LR_PARAMS = {
+    'C': 1.0,
+    'max_iter': 1000,
+}
+
+# Hiperparametros padrao do Random Forest
+RF_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 20,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+}
+
+# Hiperparametros padrao do Gradient Boosting por histogramas
+HGB_PARAMS = {
+    'learning_rate': 0.1,
+    'max_iter': 500,
+    'max_leaf_nodes': 31,
+    'l2_regularization': 0.0,
+    'early_stopping': True,
+    'validation_fraction': 0.1,
+    'n_iter_no_change': 10,
+}
+
 def load_data():
     """Carrega dados finais para treinamento."""
     print("Carregando dados finais...")
@@ -61,21 +102,20 @@ def prepare_features(df):
     X = df.drop(columns=['Credit_Score'])
     y = df['Credit_Score']
     
-    # Guardar nomes das features
-    feature_names = X.columns.tolist()
-    print(f"   - {len(feature_names)} features")
-    
     # Dicionario para encoders
     encoders = {}
     
-    # 1. Codificar colunas categoricas
-    categorical_cols = X.select_dtypes(include=['object']).columns
-    print(f"\nCodificando {len(categorical_cols)} colunas categoricas...")
+    # 1. Limpeza, features engenheiradas, codificacao e padronizacao.
+    # O mesmo objeto e salvo com o modelo e usado pela API.
+    print("\nAjustando transformacao de features...")
+    transformer = FeatureTransformer()
+    X_scaled = transformer.fit_transform(X)
+    encoders['transformer'] = transformer
     
-    for col in categorical_cols:
-        le = LabelEncoder()
-        X[col] = le.fit_transform(X[col].astype(str))
-        encoders[col] = le
+    # Guardar nomes das features
+    feature_names = transformer.feature_names_
+    print(f"   - {len(feature_names)} features")
+    print(f"   - {len(transformer.categorical_columns_)} colunas categoricas codificadas")
     
     # 2. Codificar target
     print("\nCodificando target...")
@@ -87,21 +127,15 @@ def prepare_features(df):
     for i, classe in enumerate(target_encoder.classes_):
         print(f"   - {i}: {classe}")
     
-    # 3. Padronizar features
-    print("\nPadronizando features...")
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    encoders['scaler'] = scaler
-    
     return X_scaled, y_encoded, feature_names, encoders
 
-def train_logistic_regression(X_train, y_train, X_test, y_test):
+def train_logistic_regression(X_train, y_train, X_test, y_test, params=None):
     """Treina Regressao Logistica como baseline."""
     print("\nTreinando Regressao Logistica...")
     
     model = LogisticRegression(
+        **{**LR_PARAMS, **(params or {})},
         random_state=RANDOM_STATE,
-        max_iter=1000,
         multi_class='multinomial'
     )
     
@@ -121,18 +155,15 @@ def train_logistic_regression(X_train, y_train, X_test, y_test):
     
     return model, metrics
 
-def train_random_forest(X_train, y_train, X_test, y_test):
+def train_random_forest(X_train, y_train, X_test, y_test, params=None, n_jobs=-1):
     """Treina Random Forest."""
     print("\nTreinando Random Forest...")
     
-    # Modelo com parametros otimizados manualmente
+    # Modelo com parametros otimizados manualmente (sobrescreviveis via params)
     model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=20,
-        min_samples_split=5,
-        min_samples_leaf=2,
+        **{**RF_PARAMS, **(params or {})},
         random_state=RANDOM_STATE,
-        n_jobs=-1
+        n_jobs=n_jobs
     )
     
     # Treinar
@@ -154,8 +185,199 @@ def train_random_forest(X_train, y_train, X_test, y_test):
     
     return model, metrics, feature_importance
 
-def save_model(model, encoders, model_name, metrics):
-    """Salva modelo e componentes."""
+def train_hist_gradient_boosting(X_train, y_train, X_test, y_test, params=None, n_jobs=None,
+                                 categorical_features=None):
+    """Treina Gradient Boosting por histogramas com categoricas nativas."""
+    print("\nTreinando Hist Gradient Boosting...")
+    
+    # Codigos categoricos do FeatureTransformer nao sao padronizados,
+    # entao podem ser usados diretamente como categorias
+    model = HistGradientBoostingClassifier(
+        **{**HGB_PARAMS, **(params or {})},
+        categorical_features=categorical_features,
+        random_state=RANDOM_STATE
+    )
+    
+    # Treinar (parada antecipada em uma fracao de validacao do treino)
+    with threadpool_limits(limits=n_jobs, user_api='openmp'):
+        model.fit(X_train, y_train)
+    
+    # Prever
+    y_pred = model.predict(X_test)
+    
+    # Metricas
+    metrics = {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'precision': precision_score(y_test, y_pred, average='weighted'),
+        'recall': recall_score(y_test, y_pred, average='weighted'),
+        'f1_score': f1_score(y_test, y_pred, average='weighted')
+    }
+    
+    return model, metrics
+
+def load_features(profiler):
+    """
+    Carrega X/y divididos e encoders do cache de features.
+
+    Sem entrada valida (dataset, codigo das transformacoes ou divisao
+    diferentes), le o CSV final, ajusta as transformacoes, divide e grava o
+    cache. Retorna (data_paths, encoders, manifest) ou None sem dados.
+    """
+    data_path = DATA_FINAL / "credit_score_final.csv"
+    if not data_path.exists():
+        print("ERRO: Arquivo de dados finais nao encontrado!")
+        return None
+    
+    cache = FeatureCache(data_path, code=[prepare_features, transform, parsers],
+                         params={'test_size': TEST_SIZE, 'random_state': RANDOM_STATE})
+    if cache.exists():
+        print(f"\nFeatures carregadas do cache: {cache.path}")
+        with profiler.stage("load_feature_cache"):
+            return cache.load()
+    
+    # 1. Carregar dados
+    with profiler.stage("load_data") as stage:
+        df = load_data()
+        stage.rows = len(df)
+    
+    # 2. Preparar features
+    with profiler.stage("prepare_features", rows=len(df)):
+        X, y, feature_names, encoders = prepare_features(df)
+    
+    # 3. Dividir dados
+    print("\nDividindo dados...")
+    with profiler.stage("train_test_split", rows=len(X)):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
+        )
+    
+    with profiler.stage("save_feature_cache", rows=len(X)):
+        result = cache.save({'X_train': X_train, 'y_train': y_train,
+                             'X_test': X_test, 'y_test': y_test},
+                            encoders, feature_names)
+    print(f"   - Cache de features salvo em: {cache.path}")
+    return result
+
+def log_candidate(model, model_type, metrics, params=None, log_model=True):
+    """Registra um modelo candidato na run MLflow ativa."""
+    mlflow.log_param("model_type", model_type)
+    if params:
+        mlflow.log_params(params)
+    mlflow.log_metrics(metrics)
+    if log_model:
+        mlflow.sklearn.log_model(model, "model")
+
+# Modelos candidatos: nome -> (tipo, funcao de treino, argumentos, usa varios nucleos)
+CANDIDATES = {
+    'logistic_regression': ('LogisticRegression', train_logistic_regression, {'params': LR_PARAMS}, False),
+    'random_forest': ('RandomForest', train_random_forest, {'params': RF_PARAMS}, True),
+    'hist_gradient_boosting': ('HistGradientBoosting', train_hist_gradient_boosting,
+                               {'params': HGB_PARAMS}, True),
+}
+
+# Candidatos que recebem a mascara de colunas categoricas
+NATIVE_CATEGORICAL = {'hist_gradient_boosting'}
+
+def fit_candidate(name, data_paths, experiment_id, parent_run_id, feature_names, staging_dir,
+                  n_jobs=1, categorical_features=None):
+    """
+    Treina e registra um candidato em um processo do pool (run MLflow aninhada).
+
+    O modelo e serializado uma unica vez em staging_dir/<nome>; o processo pai
+    le esse arquivo e o envia para a run em segundo plano.
+    """
+    model_type, train, kwargs, multithreaded = CANDIDATES[name]
+    data = load_shared(data_paths)
+    if multithreaded:
+        kwargs = {**kwargs, 'n_jobs': n_jobs}
+    if name in NATIVE_CATEGORICAL:
+        kwargs = {**kwargs, 'categorical_features': categorical_features}
+
+    start = time.perf_counter()
+    result = train(data['X_train'], data['y_train'], data['X_test'], data['y_test'], **kwargs)
+    fit_time = time.perf_counter() - start
+    model, metrics = result[0], result[1]
+    stats = {'fit_time_s': fit_time}
+
+    mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+    with mlflow.start_run(experiment_id=experiment_id, run_name=name,
+                          tags={"mlflow.parentRunId": parent_run_id}) as run:
+        log_candidate(model, model_type, metrics, kwargs.get('params'), log_model=False)
+        mlflow.log_metrics(stats)
+        if hasattr(model, 'n_iter_'):
+            mlflow.log_metric("n_iter", model.n_iter_)
+
+        # Log feature importance
+        if hasattr(model, 'feature_importances_'):
+            for i, imp in enumerate(model.feature_importances_[:10]):  # Top 10 features
+                mlflow.log_metric(f"feature_imp_{feature_names[i]}", imp)
+
+    model_path = stage_model(model, Path(staging_dir) / name)
+    return str(model_path), metrics, stats, run.info.run_id
+
+def train_candidates(data_paths, experiment_id, parent_run_id, feature_names, staging_dir,
+                     categorical_features=None, names=None):
+    """
+    Treina os candidatos em paralelo, um processo por modelo. Retorna
+    {nome: (diretorio do modelo serializado, metricas, custos, run_id)}.
+
+    data_paths aponta para os .npy do cache de features (float32, o dtype
+    usado pelas arvores do scikit-learn), abertos via memmap por todos os
+    processos.
+    """
+    names = list(names or CANDIDATES)
+    cores = split_cores({name: CANDIDATES[name][3] for name in names})
+
+    tasks = {name: {'name': name, 'data_paths': data_paths,
+                    'experiment_id': experiment_id, 'parent_run_id': parent_run_id,
+                    'feature_names': feature_names, 'staging_dir': str(staging_dir),
+                    'n_jobs': cores[name],
+                    'categorical_features': categorical_features}
+             for name in names}
+    return run_parallel(fit_candidate, tasks)
+
+def register_best_model(model, model_name, metrics, model_uri=None):
+    """
+    Registra o melhor modelo no Model Registry do MLflow.
+
+    Com model_uri (runs:/<run do candidato>/model), a versao aponta para o
+    artefato ja enviado e a run best_model_<nome> so guarda metricas e a
+    referencia, sem serializar o modelo de novo. Usa o MlflowClient para
+    poder rodar na thread de escrita.
+    """
+    if model_uri is not None:
+        client = MlflowClient()
+        experiment = client.get_experiment_by_name(MLFLOW_EXPERIMENT_NAME)
+        run = client.create_run(experiment.experiment_id, run_name=f"best_model_{model_name}",
+                                tags={"source_model_uri": model_uri})
+        client.log_param(run.info.run_id, "model_type", model_name)
+        for metric, value in metrics.items():
+            client.log_metric(run.info.run_id, metric, value)
+        client.set_terminated(run.info.run_id)
+        return mlflow.register_model(model_uri, "credit_score_classifier")
+    
+    with mlflow.start_run(run_name=f"best_model_{model_name}"):
+        mlflow.log_param("model_type", model_name)
+        mlflow.log_metrics(metrics)
+        mlflow.sklearn.log_model(
+            model, 
+            "model",
+            registered_model_name="credit_score_classifier"
+        )
+
+def save_model(model, encoders, model_name, metrics, model_file=None, encoders_file=None,
+               artifact_format=MODEL_ARTIFACT_FORMAT, compression=MODEL_ARTIFACT_COMPRESSION,
+               X_reference=None, reference_file=None):
+    """
+    Salva modelo e componentes.
+
+    model_file/encoders_file reaproveitam arquivos ja serializados (staging,
+    cache de features) via hard link ou copia; model_file so vale para o
+    formato pickle sem compressao. X_reference (X de treino) gera os
+    histogramas de referencia do monitoramento de drift; reference_file
+    reaproveita os de outro modelo. O model.pkl e gravado por ultimo: a API
+    so enxerga a pasta quando ela esta completa.
+    """
     print(f"\nSalvando modelo {model_name}...")
     
     # Criar pasta com timestamp
@@ -163,16 +385,31 @@ def save_model(model, encoders, model_name, metrics):
     model_dir = MODELS_DIR / f"{model_name}_{timestamp}"
     model_dir.mkdir(exist_ok=True)
     
-    # Salvar modelo
-    joblib.dump(model, model_dir / "model.pkl")
-    
     # Salvar encoders
-    joblib.dump(encoders, model_dir / "encoders.pkl")
+    if encoders_file is not None:
+        link_or_copy(encoders_file, model_dir / "encoders.pkl")
+    else:
+        joblib.dump(encoders, model_dir / "encoders.pkl")
     
     # Salvar metricas
     with open(model_dir / "metrics.json", 'w') as f:
         json.dump(metrics, f, indent=2)
     
+    # Salvar histogramas de referencia (drift)
+    if reference_file is not None:
+        link_or_copy(reference_file, model_dir / REFERENCE_FILE)
+    elif X_reference is not None:
+        transformer = encoders['transformer']
+        reference = Reference.build(unscale(X_reference, transformer), transformer.feature_names_,
+                                    transformer.categorical_mask(), n_bins=DRIFT_BINS)
+        reference.save(model_dir / REFERENCE_FILE)
+    
+    # Salvar modelo
+    if model_file is not None and (artifact_format, compression) == ("pickle", "none"):
+        link_or_copy(model_file, model_dir / MODEL_FILE)
+    else:
+        save_model_artifact(model, model_dir, artifact_format, compression)
+    
     print(f"   - Modelo salvo em: {model_dir}")
     
     return model_dir
@@ -183,102 +420,123 @@ def main():
     print("TREINAMENTO DE MODELOS - QUANTUMFINANCE")
     print("="*60)
     
-    # 1. Carregar dados
-    df = load_data()
-    if df is None:
-        return
-    
-    # 2. Preparar features
-    X, y, feature_names, encoders = prepare_features(df)
+    profiler = PipelineProfiler("train_model", track_memory=PROFILE_TRACK_MEMORY)
     
-    # 3. Dividir dados
-    print("\nDividindo dados...")
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-    )
-    print(f"   - Treino: {X_train.shape[0]} amostras")
-    print(f"   - Teste: {X_test.shape[0]} amostras")
+    # 1-3. Carregar dados, preparar features e dividir (com cache)
+    features = load_features(profiler)
+    if features is None:
+        return
+    data_paths, encoders, manifest = features
+    feature_names = manifest['feature_names']
+    n_train = manifest['arrays']['y_train']['shape'][0]
+    n_test = manifest['arrays']['y_test']['shape'][0]
+    print(f"   - Treino: {n_train} amostras")
+    print(f"   - Teste: {n_test} amostras")
     
     # 4. Iniciar experimento MLflow
     print("\nIniciando experimento MLflow...")
     
-    with mlflow.start_run(run_name="comparacao_modelos"):
+    # Uploads, copias e registro vao para a thread de escrita
+    writer = BackgroundWriter()
+    staging = tempfile.TemporaryDirectory(prefix="candidates_")
+    
+    with mlflow.start_run(run_name="comparacao_modelos") as parent_run:
         
         # Log informacoes do dataset
-        mlflow.log_param("dataset_size", len(df))
+        mlflow.log_param("dataset_size", n_train + n_test)
+        mlflow.log_param("feature_cache", manifest['key'])
         mlflow.log_param("n_features", len(feature_names))
         mlflow.log_param("test_size", TEST_SIZE)
         
-        # 4.1 Treinar Logistic Regression
+        # 4.1 Treinar candidatos em paralelo (cada um em sua run aninhada)
         print("\n" + "-"*40)
-        with mlflow.start_run(run_name="logistic_regression", nested=True):
-            lr_model, lr_metrics = train_logistic_regression(X_train, y_train, X_test, y_test)
-            
-            # Log no MLflow
-            mlflow.log_param("model_type", "LogisticRegression")
-            mlflow.log_metrics(lr_metrics)
-            mlflow.sklearn.log_model(lr_model, "model")
-            
-            print("\nMetricas Logistic Regression:")
-            for metric, value in lr_metrics.items():
-                print(f"   - {metric}: {value:.4f}")
+        print(f"Treinando {len(CANDIDATES)} candidatos em paralelo...")
+        with profiler.stage("fit_candidates_parallel", rows=n_train):
+            results = train_candidates(data_paths,
+                                       parent_run.info.experiment_id, parent_run.info.run_id,
+                                       feature_names, staging.name,
+                                       encoders['transformer'].categorical_mask())
         
-        # 4.2 Treinar Random Forest
-        print("\n" + "-"*40)
-        with mlflow.start_run(run_name="random_forest", nested=True):
-            rf_model, rf_metrics, feature_imp = train_random_forest(X_train, y_train, X_test, y_test)
-            
-            # Log no MLflow
-            mlflow.log_param("model_type", "RandomForest")
-            mlflow.log_param("n_estimators", 100)
-            mlflow.log_param("max_depth", 20)
-            mlflow.log_metrics(rf_metrics)
-            mlflow.sklearn.log_model(rf_model, "model")
-            
-            # Log feature importance
-            for i, imp in enumerate(feature_imp[:10]):  # Top 10 features
-                mlflow.log_metric(f"feature_imp_{feature_names[i]}", imp)
-            
-            print("\nMetricas Random Forest:")
-            for metric, value in rf_metrics.items():
+        # Cada modelo ja esta serializado: o envio para a run fica em segundo plano
+        model_uris, models = {}, {}
+        for name, (model_path, _, _, run_id) in results.items():
+            model_uris[name] = writer.submit(upload_model, run_id, model_path)
+            models[name] = load_staged_model(model_path)
+        
+        for name, (_, metrics, _, _) in results.items():
+            print(f"\nMetricas {name}:")
+            for metric, value in metrics.items():
                 print(f"   - {metric}: {value:.4f}")
+        
+        # 4.2 Benchmark de inferencia (sequencial, sem disputar CPU com treinos)
+        print("\nMedindo custo de inferencia dos candidatos...")
+        X_bench = load_shared(data_paths)['X_test'][:1000]
+        with profiler.stage("benchmark_candidates"):
+            for name, (model_path, _, stats, run_id) in results.items():
+                bench = benchmark_model(models[name], X_bench,
+                                        model_file=Path(model_path) / MODEL_FILE)
+                stats.update(bench)
+                with mlflow.start_run(run_id=run_id, nested=True):
+                    mlflow.log_metrics(bench)
+        
+        # 5. Escolher melhor modelo (metrica de qualidade sujeita aos limites)
+        candidates = {name: {**metrics, **stats} for name, (_, metrics, stats, _) in results.items()}
+        model_name, feasible = select_model(candidates, SELECTION_METRIC, SELECTION_CONSTRAINTS)
+        objective = f"max {SELECTION_METRIC}" + "".join(
+            f" | {name} < {limit}" for name, limit in SELECTION_CONSTRAINTS.items())
+        mlflow.log_param("selection_objective", objective)
+        mlflow.log_param("best_model", model_name)
     
-    # 5. Escolher melhor modelo
     print("\n" + "="*40)
-    if rf_metrics['f1_score'] > lr_metrics['f1_score']:
-        print("MELHOR MODELO: Random Forest")
-        best_model = rf_model
-        best_metrics = rf_metrics
-        model_name = "random_forest"
-        
-        # Mostrar top features
+    print(f"Objetivo: {objective}")
+    print(f"{'modelo':<24}{'F1':>8}{'treino (s)':>12}{'disco (MB)':>12}{'memoria (MB)':>14}"
+          f"{'p99 linha (ms)':>16}{'p99 lote (ms)':>15}  viavel")
+    for name, values in candidates.items():
+        print(f"{name:<24}{values['f1_score']:>8.4f}{values['fit_time_s']:>12.2f}"
+              f"{values['artifact_size_mb']:>12.2f}{values['memory_mb']:>14.2f}"
+              f"{values['latency_single_p99_ms']:>16.3f}{values['latency_batch_p99_ms']:>15.3f}"
+              f"  {'sim' if name in feasible else 'nao'}")
+    
+    if not feasible:
+        print("\nAVISO: nenhum candidato atende aos limites; escolhido o que menos os viola")
+    best_model = models[model_name]
+    best_metrics = candidates[model_name]
+    print(f"\nMELHOR MODELO: {model_name}")
+    
+    # Mostrar top features
+    if hasattr(best_model, 'feature_importances_'):
         print("\nTop 10 Features Importantes:")
-        feature_scores = zip(feature_names, feature_imp)
+        feature_scores = zip(feature_names, best_model.feature_importances_)
         sorted_features = sorted(feature_scores, key=lambda x: x[1], reverse=True)
         for i, (feat, score) in enumerate(sorted_features[:10]):
             print(f"   {i+1}. {feat}: {score:.4f}")
-    else:
-        print("MELHOR MODELO: Logistic Regression")
-        best_model = lr_model
-        best_metrics = lr_metrics
-        model_name = "logistic_regression"
-    
-    # 6. Salvar melhor modelo
-    model_dir = save_model(best_model, encoders, model_name, best_metrics)
     
-    # 7. Registrar modelo no MLflow
-    with mlflow.start_run(run_name=f"best_model_{model_name}"):
-        mlflow.log_param("model_type", model_name)
-        mlflow.log_metrics(best_metrics)
-        mlflow.sklearn.log_model(
-            best_model, 
-            "model",
-            registered_model_name="credit_score_classifier"
-        )
+    # 6. Salvar melhor modelo (copia do arquivo ja serializado, em segundo plano)
+    best_file = Path(results[model_name][0]) / MODEL_FILE
+    encoders_file = Path(data_paths['X_train']).parent / "encoders.pkl"
+    saved = writer.submit(save_model, best_model, encoders, model_name, best_metrics,
+                          model_file=best_file, encoders_file=encoders_file,
+                          X_reference=load_shared(data_paths)['X_train'])
+    
+    # 7. Registrar no MLflow o artefato ja enviado pela run do candidato
+    writer.submit(lambda: register_best_model(best_model, model_name, best_metrics,
+                                              model_uri=model_uris[model_name].result()))
+    
+    # Espera a fila de escrita (unico ponto em que o treino aguarda I/O)
+    with profiler.stage("wait_artifact_writer"):
+        writer.wait()
+    staging.cleanup()
+    model_dir = saved.result()
+    
+    # 8. Perfil de desempenho (JSON + MLflow, na run de comparacao)
+    profiler.print_report()
+    profile_path = profiler.save()
+    print(f"   - Perfil salvo em: {profile_path}")
+    profiler.log_to_mlflow(profile_path, run_id=parent_run.info.run_id)
     
     print("\n" + "="*60)
     print("TREINAMENTO CONCLUIDO!")
-    print(f"   - Melhor modelo: {model_name}")
+    print(f"   - Melhor modelo: {model_name} ({model_dir})")
     print(f"   - F1-Score: {best_metrics['f1_score']:.4f}")
     print(f"   - Accuracy: {best_metrics['accuracy']:.4f}")
     print("\nPara visualizar experimentos:")
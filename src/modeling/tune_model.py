@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+Busca de hiperparametros por successive halving
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Configuracoes de varias familias de modelos comecam com pouco orcamento
+(fracao das linhas de treino e, nas florestas, menos arvores). A cada rodada
+so a melhor fracao 1/eta avanca, com eta vezes mais orcamento, ate a ultima
+rodada usar todos os dados. As tentativas rodam em paralelo (um processo por
+nucleo) e cada uma vira uma run aninhada no MLflow. Ao fim do orcamento de
+tempo os processos sao encerrados e vale o modelo da melhor rodada concluida;
+o retreino com todos os dados so acontece se couber no tempo restante.
+
+A poda e a escolha usam uma validacao separada do treino
+(TUNING_VALIDATION_SIZE); o conjunto de teste so entra no relatorio final.
+
+Uso:
+    python src/modeling/tune_model.py
+    python src/modeling/tune_model.py --budget 300 --trials 27 --eta 3
+    python src/modeling/tune_model.py --families random_forest
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from sklearn.model_selection import train_test_split
+
+from config import (RANDOM_STATE, REPORTS_DIR, MLFLOW_TRACKING_URI,
+                    TUNING_BUDGET_S, TUNING_TRIALS, TUNING_ETA, TUNING_VALIDATION_SIZE)
+from src.modeling import train_model
+from src.modeling.parallel import load_shared
+from src.pipeline.profiling import PipelineProfiler
+
+import mlflow
+
+# Espaco de busca por familia (valores sorteados de cada lista)
+SEARCH_SPACE = {
+    'logistic_regression': {
+        'C': [0.01, 0.1, 1.0, 10.0, 100.0],
+        'max_iter': [1000],
+    },
+    'random_forest': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [10, 20, 30, None],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': ['sqrt', 0.5],
+    },
+    'hist_gradient_boosting': {
+        'learning_rate': [0.03, 0.1, 0.3],
+        'max_iter': [200, 500, 1000],
+        'max_leaf_nodes': [15, 31, 63],
+        'l2_regularization': [0.0, 0.1, 1.0],
+        'min_samples_leaf': [20, 50],
+    },
+}
+
+# Hiperparametro reduzido junto com a fracao de linhas nas rodadas baratas
+BUDGET_PARAMS = {'random_forest': 'n_estimators', 'hist_gradient_boosting': 'max_iter'}
+
+# Minimo de linhas de treino de uma tentativa
+MIN_TRIAL_ROWS = 500
+
+
+def sample_configs(families, n_trials, seed=RANDOM_STATE):
+    """Sorteia n_trials configuracoes (familia e hiperparametros)."""
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n_trials):
+        family = families[rng.integers(len(families))]
+        space = SEARCH_SPACE[family]
+        params = {name: values[rng.integers(len(values))] for name, values in space.items()}
+        configs.append((family, params))
+    return configs
+
+
+def rung_fractions(n_trials, eta):
+    """Fracao dos dados de cada rodada (a ultima usa todos)."""
+    n_rungs = int(math.log(max(n_trials, 1), eta) + 1e-9) + 1
+    return [eta ** -(n_rungs - 1 - rung) for rung in range(n_rungs)]
+
+
+def scale_params(family, params, fraction):
+    """Reduz o hiperparametro de orcamento na mesma proporcao das linhas."""
+    budget_param = BUDGET_PARAMS.get(family)
+    if budget_param is None or fraction >= 1:
+        return dict(params)
+    return {**params, budget_param: max(10, int(params[budget_param] * fraction))}
+
+
+def validation_split(y, size=TUNING_VALIDATION_SIZE, seed=RANDOM_STATE):
+    """Indices (ajuste, validacao) estratificados e fixos das linhas de treino."""
+    return train_test_split(np.arange(len(y)), test_size=size, random_state=seed, stratify=y)
+
+
+def evaluate(model, X, y):
+    """Metricas do modelo em (X, y), com as mesmas chaves do treino."""
+    y_pred = model.predict(X)
+    return {
+        'accuracy': accuracy_score(y, y_pred),
+        'precision': precision_score(y, y_pred, average='weighted'),
+        'recall': recall_score(y, y_pred, average='weighted'),
+        'f1_score': f1_score(y, y_pred, average='weighted')
+    }
+
+
+def estimate_full_fit(trial):
+    """Tempo estimado (s) para treinar a configuracao com todos os dados."""
+    # Linhas e, nas florestas, arvores/iteracoes crescem com 1/fraction
+    scale = 1 / trial['fraction']
+    if trial['family'] in BUDGET_PARAMS:
+        scale *= scale
+    return trial['fit_time'] * scale
+
+
+def run_trial(trial_id, family, params, rung, fraction, data_paths,
+              experiment_id, parent_run_id, categorical_features=None):
+    """Treina uma configuracao com parte do orcamento (executa em um worker)."""
+    model_type, train, _, multithreaded = train_model.CANDIDATES[family]
+    data = load_shared(data_paths)
+    fit_rows, val_rows = validation_split(data['y_train'])
+    X_val, y_val = data['X_train'][val_rows], data['y_train'][val_rows]
+
+    # Subamostra fixa por tentativa; a avaliacao usa sempre a validacao completa
+    if fraction < 1:
+        n_rows = min(len(fit_rows), max(MIN_TRIAL_ROWS, int(len(fit_rows) * fraction)))
+        rng = np.random.default_rng([RANDOM_STATE, trial_id])
+        fit_rows = np.sort(rng.choice(fit_rows, n_rows, replace=False))
+    X_train, y_train = data['X_train'][fit_rows], data['y_train'][fit_rows]
+
+    trial_params = scale_params(family, params, fraction)
+    kwargs = {'params': trial_params}
+    if multithreaded:
+        kwargs['n_jobs'] = 1
+    if family in train_model.NATIVE_CATEGORICAL:
+        kwargs['categorical_features'] = categorical_features
+
+    start = time.perf_counter()
+    result = train(X_train, y_train, X_val, y_val, **kwargs)
+    fit_time = time.perf_counter() - start
+    model, metrics = result[0], result[1]
+
+    mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+    with mlflow.start_run(experiment_id=experiment_id, run_name=f"trial_{trial_id}_rung_{rung}",
+                          tags={"mlflow.parentRunId": parent_run_id}):
+        mlflow.log_params({'model_type': model_type, 'rung': rung, 'fraction': fraction,
+                           'train_rows': len(y_train), **trial_params})
+        mlflow.log_metrics({**metrics, 'fit_time_s': fit_time})
+
+    return {
+        'trial_id': trial_id,
+        'family': family,
+        'params': params,
+        'rung': rung,
+        'fraction': fraction,
+        'metrics': metrics,
+        'fit_time': fit_time,
+        'model': model,
+    }
+
+
+def successive_halving(configs, data_paths, experiment_id, parent_run_id,
+                       eta=TUNING_ETA, budget_s=TUNING_BUDGET_S, max_workers=None,
+                       categorical_features=None):
+    """
+    Executa a busca e retorna (historico, melhor tentativa com o modelo).
+
+    O orcamento de tempo e rigido: ao esgota-lo o pool e encerrado e a melhor
+    tentativa da rodada mais alta concluida e escolhida. Se a busca parou
+    antes da ultima rodada, a melhor configuracao so e treinada com todos os
+    dados quando a estimativa cabe no tempo restante (e com o mesmo prazo).
+    """
+    fractions = rung_fractions(len(configs), eta)
+    deadline = time.monotonic() + budget_s
+    context = multiprocessing.get_context('spawn')
+    pool = context.Pool(max_workers or os.cpu_count() or 1)
+
+    survivors = list(enumerate(configs))
+    history, completed = [], []
+    trial_kwargs = {'data_paths': data_paths, 'experiment_id': experiment_id,
+                    'parent_run_id': parent_run_id, 'categorical_features': categorical_features}
+    try:
+        for rung, fraction in enumerate(fractions):
+            print(f"\nRodada {rung}: {len(survivors)} configuracao(oes) com "
+                  f"{fraction:.1%} dos dados")
+
+            pending = [pool.apply_async(run_trial, kwds={
+                'trial_id': trial_id, 'family': family, 'params': params,
+                'rung': rung, 'fraction': fraction, **trial_kwargs,
+            }) for trial_id, (family, params) in survivors]
+
+            finished = []
+            for result in pending:
+                remaining = deadline - time.monotonic()
+                try:
+                    finished.append(result.get(timeout=max(remaining, 0)))
+                except multiprocessing.TimeoutError:
+                    break
+            history.extend(finished)
+
+            if len(finished) < len(pending):
+                print(f"   - Orcamento de {budget_s}s esgotado na rodada {rung}")
+                # Sem rodada completa, vale o que terminou na primeira
+                completed = completed or finished
+                break
+
+            # So os modelos da rodada mais alta concluida ficam em memoria
+            for trial in completed:
+                trial['model'] = None
+            completed = finished
+            for trial in sorted(finished, key=lambda t: -t['metrics']['f1_score']):
+                print(f"   - trial {trial['trial_id']:>3} {trial['family']:<20} "
+                      f"F1 {trial['metrics']['f1_score']:.4f} ({trial['fit_time']:.2f}s)")
+
+            keep = max(1, len(finished) // eta)
+            ranked = sorted(finished, key=lambda t: -t['metrics']['f1_score'])[:keep]
+            survivors = [(t['trial_id'], (t['family'], t['params'])) for t in ranked]
+
+        if not completed:
+            raise RuntimeError("Nenhuma tentativa concluida dentro do orcamento de tempo")
+
+        best = max(completed, key=lambda t: t['metrics']['f1_score'])
+        if best['fraction'] < 1:
+            best = _retrain_within_budget(pool, best, len(fractions) - 1, deadline, trial_kwargs,
+                                          history)
+    finally:
+        pool.terminate()
+        pool.join()
+
+    return history, best
+
+
+def _retrain_within_budget(pool, best, rung, deadline, trial_kwargs, history):
+    """Treina a melhor configuracao com todos os dados se couber no prazo."""
+    remaining = deadline - time.monotonic()
+    estimate = estimate_full_fit(best)
+    if estimate > remaining:
+        print(f"   - Retreino com todos os dados (~{estimate:.0f}s) nao cabe nos "
+              f"{max(remaining, 0):.0f}s restantes; mantido o modelo da rodada {best['rung']}")
+        return best
+
+    print(f"\nRetreinando trial {best['trial_id']} com todos os dados (~{estimate:.0f}s)...")
+    result = pool.apply_async(run_trial, kwds={
+        'trial_id': best['trial_id'], 'family': best['family'], 'params': best['params'],
+        'rung': rung, 'fraction': 1, **trial_kwargs})
+    try:
+        final = result.get(timeout=max(deadline - time.monotonic(), 0))
+    except multiprocessing.TimeoutError:
+        print(f"   - Prazo esgotado no retreino; mantido o modelo da rodada {best['rung']}")
+        return best
+    history.append(final)
+    return final
+
+
+def save_report(history, best, path=None):
+    """Salva o historico da busca em JSON (sem os modelos)."""
+    if path is None:
+        REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = REPORTS_DIR / f"tuning_{timestamp}.json"
+
+    strip = lambda trial: {k: v for k, v in trial.items() if k != 'model'}
+    with open(path, 'w') as f:
+        json.dump({'best': strip(best), 'trials': [strip(t) for t in history]}, f, indent=2)
+
+    return Path(path)
+
+
+def main():
+    """Executa a busca e salva o melhor modelo."""
+    parser = argparse.ArgumentParser(description="Busca de hiperparametros por successive halving")
+    parser.add_argument("--budget", type=float, default=TUNING_BUDGET_S, help="Tempo maximo (s)")
+    parser.add_argument("--trials", type=int, default=TUNING_TRIALS, help="Configuracoes iniciais")
+    parser.add_argument("--eta", type=int, default=TUNING_ETA, help="Fator de reducao por rodada")
+    parser.add_argument("--workers", type=int, default=None, help="Processos em paralelo")
+    parser.add_argument("--families", nargs="+", default=list(SEARCH_SPACE),
+                        choices=list(SEARCH_SPACE), help="Familias de modelos")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("BUSCA DE HIPERPARAMETROS - QUANTUMFINANCE")
+    print("="*60)
+
+    # 1. Carregar features (cache compartilhado com train_model.py via memmap)
+    features = train_model.load_features(PipelineProfiler("tune_model", track_memory=False))
+    if features is None:
+        return
+    data_paths, encoders, manifest = features
+
+    # 2. Busca
+    configs = sample_configs(args.families, args.trials)
+    with mlflow.start_run(run_name="tuning_successive_halving") as parent_run:
+        mlflow.log_params({'budget_s': args.budget, 'trials': args.trials, 'eta': args.eta,
+                           'families': ",".join(args.families),
+                           'feature_cache': manifest['key']})
+
+        start = time.perf_counter()
+        history, best = successive_halving(
+            configs, data_paths, parent_run.info.experiment_id, parent_run.info.run_id,
+            eta=args.eta, budget_s=args.budget, max_workers=args.workers,
+            categorical_features=encoders['transformer'].categorical_mask())
+        elapsed = time.perf_counter() - start
+
+        # Teste usado uma unica vez, no modelo escolhido pela validacao
+        data = load_shared(data_paths)
+        metrics = evaluate(best['model'], data['X_test'], data['y_test'])
+        best['test_metrics'] = metrics
+
+        report_path = save_report(history, best)
+        mlflow.log_metrics({'search_wall_s': elapsed, 'n_trials_run': len(history),
+                            'best_val_f1_score': best['metrics']['f1_score'],
+                            'best_f1_score': metrics['f1_score']})
+        mlflow.log_params({f"best_{k}": v for k, v in best['params'].items()})
+        mlflow.log_param("best_family", best['family'])
+        mlflow.log_artifact(str(report_path), artifact_path="tuning")
+
+    print(f"\nBusca concluida em {elapsed:.1f}s ({len(history)} tentativas)")
+    print(f"   - Melhor: {best['family']} {best['params']}")
+    print(f"   - F1-Score validacao: {best['metrics']['f1_score']:.4f} "
+          f"({best['fraction']:.1%} dos dados)")
+    print(f"   - F1-Score teste: {metrics['f1_score']:.4f}")
+    print(f"   - Relatorio: {report_path}")
+
+    # 3. Modelo final: o da melhor tentativa (sem treino fora do orcamento)
+    model = best['model']
+    train_model.save_model(model, encoders, best['family'], metrics, X_reference=data['X_train'])
+    train_model.register_best_model(model, best['family'], metrics)
+
+    print("\n" + "="*60)
+    print("BUSCA CONCLUIDA!")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
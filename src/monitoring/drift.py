@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Monitoramento de drift das features com histogramas de referencia
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+No treino, cada feature ganha bins fixos (quantis do X de treino, um bin por
+codigo nas categoricas) e as contagens de referencia, salvos ao lado do
+model.pkl. Na API, cada requisicao soma suas linhas as contagens do bucket
+de tempo atual (custo fixo por linha, vetorizado no lote). PSI e KS por
+janela deslizante sao calculados somando os buckets da janela, sem reler o
+historico de predicoes.
+
+Os bins usam os valores codificados antes da padronizacao (X * escala +
+media), validos mesmo se a padronizacao for atualizada no retreino.
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+REFERENCE_FILE = "reference_histograms.npz"
+
+# Suavizacao das proporcoes (bins vazios) no PSI
+EPSILON = 1e-4
+
+
+def unscale(X, transformer):
+    """Valores codificados antes da padronizacao."""
+    return np.asarray(X, dtype=float) * transformer.scale_ + transformer.mean_
+
+
+def _cut_points(values, n_bins):
+    """Cortes entre valores distintos proximos dos quantis (nenhum valor cai num corte)."""
+    distinct = np.unique(values)
+    if len(distinct) < 2:
+        return np.empty(0)
+    quantiles = np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])
+    upper = np.clip(np.searchsorted(distinct, quantiles, side='right'), 1, len(distinct) - 1)
+    return np.unique((distinct[upper - 1] + distinct[upper]) / 2)
+
+
+class Reference:
+    """Bins fixos por feature e proporcoes de referencia."""
+
+    def __init__(self, feature_names, cuts, counts):
+        self.feature_names = list(feature_names)
+        self.cuts = cuts                      # (features x max_cortes), completado com +inf
+        self.n_bins = np.isfinite(cuts).sum(axis=1) + 1
+        self.offsets = np.concatenate([[0], np.cumsum(self.n_bins)[:-1]])
+        self.counts = np.asarray(counts, dtype=float)
+
+    @classmethod
+    def build(cls, X, feature_names, categorical_mask, n_bins=10):
+        """Bins a partir do X de treino (ja sem padronizacao)."""
+        X = np.asarray(X, dtype=float)
+        cuts = []
+        for i in range(X.shape[1]):
+            if categorical_mask[i]:
+                # Um bin por codigo; codigos novos (retreino) vao para o ultimo
+                cuts.append(np.arange(int(np.nanmax(X[:, i])) + 1) + 0.5)
+            else:
+                cuts.append(_cut_points(X[:, i], n_bins))
+        padded = np.full((len(cuts), max(len(c) for c in cuts)), np.inf)
+        for i, c in enumerate(cuts):
+            padded[i, :len(c)] = c
+
+        reference = cls(feature_names, padded, [])
+        reference.counts = reference.bin_counts(X)
+        return reference
+
+    def bin_counts(self, X, chunk_rows=10_000):
+        """Contagens de X em todos os bins (vetor unico, features concatenadas)."""
+        X = np.asarray(X, dtype=float)
+        counts = np.zeros(int(self.n_bins.sum()))
+        for start in range(0, len(X), chunk_rows):
+            chunk = X[start:start + chunk_rows]
+            bins = (self.cuts[None, :, :] <= chunk[:, :, None]).sum(axis=2) + self.offsets
+            counts += np.bincount(bins.ravel(), minlength=len(counts))
+        return counts
+
+    def save(self, path):
+        """Grava em .npz."""
+        np.savez(path, feature_names=np.array(self.feature_names), cuts=self.cuts,
+                 counts=self.counts)
+        return Path(path)
+
+    @classmethod
+    def load(cls, path):
+        """Le de .npz."""
+        with np.load(path) as data:
+            return cls(data['feature_names'].tolist(), data['cuts'], data['counts'])
+
+
+def drift_scores(reference, counts):
+    """PSI e KS (sobre os bins) por feature entre referencia e contagens ao vivo."""
+    scores = {}
+    for name, start, n in zip(reference.feature_names, reference.offsets, reference.n_bins):
+        ref = reference.counts[start:start + n]
+        live = counts[start:start + n]
+        if live.sum() == 0:
+            continue
+        p_ref = np.clip(ref / ref.sum(), EPSILON, None)
+        p_live = np.clip(live / live.sum(), EPSILON, None)
+        psi = float(np.sum((p_live - p_ref) * np.log(p_live / p_ref)))
+        ks = float(np.max(np.abs(np.cumsum(live) / live.sum() - np.cumsum(ref) / ref.sum())))
+        scores[name] = {'psi': psi, 'ks': ks}
+    return scores
+
+
+class DriftMonitor:
+    """
+    Contagens ao vivo em buckets de tempo circulares.
+
+    update() custa O(linhas x features) e nao depende do historico; uma
+    janela soma no maximo n_buckets vetores de contagens.
+    """
+
+    def __init__(self, reference, bucket_seconds=60, n_buckets=60):
+        self.reference = reference
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+        self._counts = np.zeros((n_buckets, int(reference.n_bins.sum())))
+        self._bucket_ids = np.full(n_buckets, -1, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def _bucket(self, now):
+        return int((time.time() if now is None else now) // self.bucket_seconds)
+
+    def update(self, X, now=None):
+        """Soma as linhas (sem padronizacao) ao bucket atual."""
+        counts = self.reference.bin_counts(X)
+        bucket = self._bucket(now)
+        slot = bucket % self.n_buckets
+        with self._lock:
+            if self._bucket_ids[slot] != bucket:
+                self._counts[slot] = 0
+                self._bucket_ids[slot] = bucket
+            self._counts[slot] += counts
+
+    def window_counts(self, seconds, now=None):
+        """Contagens dos buckets dentro da janela (inclui o bucket atual)."""
+        current = self._bucket(now)
+        n = min(max(int(np.ceil(seconds / self.bucket_seconds)), 1), self.n_buckets)
+        with self._lock:
+            active = (self._bucket_ids > current - n) & (self._bucket_ids <= current)
+            return self._counts[active].sum(axis=0)
+
+    def report(self, windows, threshold=0.2, now=None):
+        """PSI/KS por janela, com as features acima do limite de PSI."""
+        report = {}
+        for seconds in windows:
+            counts = self.window_counts(seconds, now)
+            rows = int(counts[:self.reference.n_bins[0]].sum())
+            scores = drift_scores(self.reference, counts)
+            report[f"{seconds}s"] = {
+                'rows': rows,
+                'max_psi': max((s['psi'] for s in scores.values()), default=0.0),
+                'drifted': sorted(name for name, s in scores.items() if s['psi'] > threshold),
+                'features': scores,
+            }
+        return report
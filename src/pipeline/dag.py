@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Executor de DAG com cache em disco para os pipelines
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Cada etapa declara dependencias e parametros. A saida fica em cache com uma
+chave derivada do codigo da etapa, dos parametros e das chaves das etapas
+anteriores; apenas etapas invalidadas sao executadas novamente e etapas
+independentes rodam em paralelo.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+import joblib
+
+
+class Stage:
+    """Etapa do pipeline: func(*saidas_das_dependencias, **params)."""
+
+    def __init__(self, name, func, deps=(), params=None, code=None, cache=True):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.params = params or {}
+        # Funcoes/modulos cujo codigo-fonte invalida o cache quando muda
+        self.code = list(code) if code else [func]
+        self.cache = cache
+
+
+def source_hash(objects):
+    """Hash do codigo-fonte de funcoes ou modulos."""
+    digest = hashlib.sha256()
+    for obj in objects:
+        try:
+            digest.update(inspect.getsource(obj).encode('utf-8'))
+        except (OSError, TypeError):
+            digest.update(repr(obj).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class DAGRunner:
+    """
+    Executa um conjunto de etapas respeitando dependencias.
+
+    Etapas com cache valido nao sao executadas, e suas saidas so sao lidas do
+    disco se alguma etapa posterior precisar delas.
+    """
+
+    def __init__(self, stages, cache_dir, max_workers=None, profiler=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.profiler = profiler
+        self._check_graph()
+        self.keys = self._compute_keys()
+
+    def _check_graph(self):
+        """Valida dependencias e ausencia de ciclos."""
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo no pipeline envolvendo a etapa '{name}'")
+            if name not in self.stages:
+                raise ValueError(f"Etapa desconhecida: '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _compute_keys(self):
+        """Chave de cache de cada etapa (nao depende das saidas, so do grafo)."""
+        keys = {}
+
+        def key(name):
+            if name not in keys:
+                stage = self.stages[name]
+                payload = {
+                    'name': name,
+                    'code': source_hash(stage.code),
+                    'params': stage.params,
+                    'deps': [key(dep) for dep in stage.deps],
+                }
+                encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+                keys[name] = hashlib.sha256(encoded).hexdigest()[:16]
+            return keys[name]
+
+        for name in self.stages:
+            key(name)
+        return keys
+
+    def cache_path(self, name):
+        """Arquivo de cache da etapa."""
+        return self.cache_dir / f"{name}-{self.keys[name]}.pkl"
+
+    def is_cached(self, name):
+        """Indica se a etapa tem saida valida em cache."""
+        return self.stages[name].cache and self.cache_path(name).exists()
+
+    def plan(self, targets=None, force=()):
+        """Etapas que precisam executar para produzir os alvos."""
+        targets = list(targets or self.stages)
+        force = set(force)
+        to_run = set()
+
+        def need(name):
+            # Precisa executar se nao tem cache (ou foi forcada); nesse caso
+            # as dependencias precisam estar disponiveis (cache ou execucao)
+            if name in to_run:
+                return
+            if name in force or not self.is_cached(name):
+                to_run.add(name)
+                for dep in self.stages[name].deps:
+                    need(dep)
+
+        for target in targets:
+            need(target)
+        return to_run
+
+    def run(self, targets=None, force=()):
+        """Executa o pipeline e retorna as saidas dos alvos."""
+        targets = list(targets or self.stages)
+        to_run = self.plan(targets, force)
+        results = {}
+
+        print(f"\nPipeline: {len(to_run)} etapa(s) a executar, "
+              f"{len(self.stages) - len(to_run)} em cache ou desnecessaria(s)")
+
+        def output(name):
+            if name not in results:
+                results[name] = joblib.load(self.cache_path(name))
+            return results[name]
+
+        def execute(name):
+            stage = self.stages[name]
+            inputs = [output(dep) for dep in stage.deps]
+            start = time.perf_counter()
+            if self.profiler is not None:
+                with self.profiler.stage(name):
+                    result = stage.func(*inputs, **stage.params)
+            else:
+                result = stage.func(*inputs, **stage.params)
+            elapsed = time.perf_counter() - start
+
+            if stage.cache:
+                path = self.cache_path(name)
+                tmp_path = path.with_suffix('.tmp')
+                joblib.dump(result, tmp_path)
+                os.replace(tmp_path, path)
+            return result, elapsed
+
+        pending = set(to_run)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Dispara todas as etapas cujas dependencias ja estao prontas
+                ready = [name for name in pending
+                         if all(dep not in pending and dep not in running.values()
+                                for dep in self.stages[name].deps)]
+                for name in sorted(ready):
+                    pending.discard(name)
+                    print(f"   > executando: {name}")
+                    running[executor.submit(execute, name)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name], elapsed = future.result()
+                    print(f"   < concluida: {name} ({elapsed:.2f}s)")
+
+        for name in sorted(set(self.stages) - to_run):
+            if name in targets:
+                print(f"   = em cache: {name}")
+
+        return {name: output(name) for name in targets}
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentacao por etapa dos pipelines de dados e treinamento
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Mede tempo de parede, tempo de CPU, pico de memoria e numero de linhas de
+cada etapa, gera um perfil em JSON e registra tudo no MLflow.
+"""
+
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config import REPORTS_DIR, MLFLOW_TRACKING_URI, MLFLOW_EXPERIMENT_NAME
+
+
+class StageRecord:
+    """Medidas de uma etapa do pipeline."""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.peak_mem_mb = None
+
+    def to_dict(self):
+        """Converte para dicionario serializavel."""
+        return {
+            'name': self.name,
+            'wall_s': round(self.wall_s, 6),
+            'cpu_s': round(self.cpu_s, 6),
+            'peak_mem_mb': None if self.peak_mem_mb is None else round(self.peak_mem_mb, 3),
+            'rows': self.rows,
+        }
+
+
+class PipelineProfiler:
+    """
+    Coleta medidas de cada etapa de um pipeline.
+
+    Uso:
+        profiler = PipelineProfiler("prepare_data")
+        with profiler.stage("load") as rec:
+            df = load()
+            rec.rows = len(df)
+        profiler.save()
+
+    O pico de memoria usa tracemalloc (alocacoes Python e numpy), o que
+    adiciona algum overhead; desative com track_memory=False.
+    """
+
+    def __init__(self, pipeline_name, track_memory=True):
+        self.pipeline_name = pipeline_name
+        self.track_memory = track_memory
+        self.started_at = datetime.now()
+        self.stages = []
+
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Mede o bloco como uma etapa; o registro pode receber `rows`."""
+        record = StageRecord(name, rows)
+
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            mem_start, _ = tracemalloc.get_traced_memory()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_s = time.perf_counter() - wall_start
+            record.cpu_s = time.process_time() - cpu_start
+            if self.track_memory:
+                _, mem_peak = tracemalloc.get_traced_memory()
+                record.peak_mem_mb = max(mem_peak - mem_start, 0) / 1024 ** 2
+            self.stages.append(record)
+
+    def summary(self):
+        """Retorna o perfil completo como dicionario."""
+        return {
+            'pipeline': self.pipeline_name,
+            'started_at': self.started_at.isoformat(),
+            'host': {
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count(),
+            },
+            'total_wall_s': round(sum(s.wall_s for s in self.stages), 6),
+            'total_cpu_s': round(sum(s.cpu_s for s in self.stages), 6),
+            'stages': [s.to_dict() for s in self.stages],
+        }
+
+    def metrics(self):
+        """Metricas planas no formato do MLflow (profile.<etapa>.<medida>)."""
+        metrics = {}
+        for stage in self.stages:
+            prefix = f"profile.{stage.name}"
+            metrics[f"{prefix}.wall_s"] = stage.wall_s
+            metrics[f"{prefix}.cpu_s"] = stage.cpu_s
+            if stage.peak_mem_mb is not None:
+                metrics[f"{prefix}.peak_mem_mb"] = stage.peak_mem_mb
+            if stage.rows is not None:
+                metrics[f"{prefix}.rows"] = stage.rows
+        metrics["profile.total_wall_s"] = sum(s.wall_s for s in self.stages)
+        return metrics
+
+    def save(self, path=None):
+        """Salva o perfil em JSON (padrao: reports/profile_<pipeline>_<timestamp>.json)."""
+        if path is None:
+            REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+            timestamp = self.started_at.strftime("%Y%m%d_%H%M%S")
+            path = REPORTS_DIR / f"profile_{self.pipeline_name}_{timestamp}.json"
+
+        path = Path(path)
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+        return path
+
+    def log_to_mlflow(self, path, run_id=None):
+        """Registra metricas e o JSON do perfil no MLflow.
+
+        Sem run_id, cria uma run propria "profile_<pipeline>".
+        """
+        import mlflow
+        from mlflow.tracking import MlflowClient
+
+        mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+        client = MlflowClient()
+
+        if run_id is None:
+            experiment = client.get_experiment_by_name(MLFLOW_EXPERIMENT_NAME)
+            experiment_id = (experiment.experiment_id if experiment is not None
+                             else client.create_experiment(MLFLOW_EXPERIMENT_NAME))
+            run = client.create_run(experiment_id, run_name=f"profile_{self.pipeline_name}")
+            run_id = run.info.run_id
+            close_run = True
+        else:
+            close_run = False
+
+        timestamp = int(time.time() * 1000)
+        for key, value in self.metrics().items():
+            client.log_metric(run_id, key, float(value), timestamp=timestamp)
+        client.log_artifact(run_id, str(path), artifact_path="profile")
+
+        if close_run:
+            client.set_terminated(run_id)
+
+        return run_id
+
+    def print_report(self):
+        """Imprime um resumo legivel das etapas."""
+        print("\nPerfil por etapa:")
+        for stage in self.stages:
+            mem = "" if stage.peak_mem_mb is None else f" | pico {stage.peak_mem_mb:8.1f} MB"
+            rows = "" if stage.rows is None else f" | {stage.rows} linhas"
+            print(f"   - {stage.name:<32} {stage.wall_s:8.3f}s parede | "
+                  f"{stage.cpu_s:8.3f}s CPU{mem}{rows}")
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline completo (dados -> treino) executado como DAG com cache
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+Data: 2025
+
+Reaproveita as funcoes de prepare_data.py e train_model.py como etapas.
+Grava os mesmos arquivos de `make data` (data/processed e data/final), que
+o retreino incremental e os benchmarks leem.
+Alterar um hiperparametro do Random Forest, por exemplo, executa de novo
+apenas o treino do Random Forest e a selecao final.
+
+Uso:
+    python src/pipeline/run_pipeline.py
+    python src/pipeline/run_pipeline.py --rf-param max_depth=10
+    python src/pipeline/run_pipeline.py --force clean_numeric --workers 2
+    python src/pipeline/run_pipeline.py --constraint "latency_single_p99_ms<5"
+"""
+
+import argparse
+import json
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config import DATA_RAW, DATA_PROCESSED, DATA_FINAL, CACHE_DIR, RANDOM_STATE, TEST_SIZE
+from config import SELECTION_METRIC, SELECTION_CONSTRAINTS
+from src.features import prepare_data, transform, parsers
+from src.modeling import train_model, benchmark
+from src.pipeline.dag import Stage, DAGRunner
+from src.pipeline.profiling import PipelineProfiler
+
+import mlflow
+
+
+def stage_load(path, fingerprint):
+    """Carrega o CSV bruto (fingerprint so participa da chave de cache)."""
+    print(f"Carregando dados brutos de {path}...")
+    return pd.read_csv(path)
+
+def stage_parse_structured(df):
+    """Converte colunas textuais estruturadas."""
+    return prepare_data.parse_structured_features(df.copy())
+
+def stage_clean_numeric(df):
+    """Limpa colunas numericas (faltantes ficam NaN ate a validacao)."""
+    return prepare_data.clean_numeric_columns(df.copy(), fill_missing=False)
+
+def stage_validate(df, quarantine_path):
+    """Remove linhas fora das faixas validas (quarentena em arquivo)."""
+    df_valid, report = prepare_data.validate_data(df, quarantine_path=quarantine_path)
+    return {'df': df_valid, 'report': report}
+
+def stage_fill_missing(validated):
+    """Preenche faltantes numericos com a mediana das linhas validas."""
+    return prepare_data.fill_missing_numeric(validated['df'].copy())
+
+def stage_clean_categorical(df):
+    """Limpa colunas categoricas."""
+    return prepare_data.clean_categorical_columns(df.copy())
+
+def stage_create_features(df):
+    """Cria features engenheiradas."""
+    return prepare_data.create_features(df.copy())
+
+def stage_prepare_final(df):
+    """Remove identificadores e reordena o target."""
+    return prepare_data.prepare_final_dataset(df)
+
+def stage_save_data(df_processed, df_final, validated, report_path):
+    """Grava os CSVs processado/final, o resumo e o relatorio de validacao (sem cache)."""
+    prepare_data.save_data(df_processed, df_final)
+    with open(report_path, 'w') as f:
+        json.dump(validated['report'], f, indent=2)
+    return str(DATA_FINAL / "credit_score_final.csv")
+
+def stage_prepare_features(df):
+    """Ajusta o FeatureTransformer e codifica o target."""
+    X, y, feature_names, encoders = train_model.prepare_features(df)
+    return {'X': X, 'y': y, 'feature_names': feature_names, 'encoders': encoders}
+
+def stage_split(features, test_size, random_state):
+    """Divide treino e teste."""
+    X_train, X_test, y_train, y_test = train_test_split(
+        features['X'], features['y'], test_size=test_size,
+        random_state=random_state, stratify=features['y']
+    )
+    return {'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test}
+
+def stage_train_logistic_regression(split):
+    """Treina a Regressao Logistica."""
+    model, metrics = train_model.train_logistic_regression(
+        split['X_train'], split['y_train'], split['X_test'], split['y_test'])
+    return {'model': model, 'metrics': metrics}
+
+def stage_train_random_forest(split, params):
+    """Treina o Random Forest com os hiperparametros informados."""
+    model, metrics, _ = train_model.train_random_forest(
+        split['X_train'], split['y_train'], split['X_test'], split['y_test'], params)
+    return {'model': model, 'metrics': metrics, 'params': params}
+
+def stage_train_hist_gradient_boosting(split, features):
+    """Treina o Gradient Boosting por histogramas com categoricas nativas."""
+    model, metrics = train_model.train_hist_gradient_boosting(
+        split['X_train'], split['y_train'], split['X_test'], split['y_test'],
+        categorical_features=features['encoders']['transformer'].categorical_mask())
+    return {'model': model, 'metrics': metrics}
+
+def stage_select_and_register(features, split, lr_result, rf_result, hgb_result, metric,
+                              constraints):
+    """Mede inferencia, registra candidatos, escolhe o melhor e salva (sem cache)."""
+    candidates = {
+        'logistic_regression': ('LogisticRegression', lr_result, None),
+        'random_forest': ('RandomForest', rf_result, rf_result['params']),
+        'hist_gradient_boosting': ('HistGradientBoosting', hgb_result, train_model.HGB_PARAMS),
+    }
+    X_bench = features['X'][:1000]
+
+    values, run_ids = {}, {}
+    with mlflow.start_run(run_name="pipeline_dag"):
+        mlflow.log_param("n_features", len(features['feature_names']))
+        for name, (model_type, result, params) in candidates.items():
+            bench = benchmark.benchmark_model(result['model'], X_bench)
+            values[name] = {**result['metrics'], **bench}
+            with mlflow.start_run(run_name=name, nested=True) as run:
+                train_model.log_candidate(result['model'], model_type, result['metrics'], params)
+                mlflow.log_metrics(bench)
+                run_ids[name] = run.info.run_id
+
+        model_name, feasible = benchmark.select_model(values, metric, constraints)
+        mlflow.log_param("best_model", model_name)
+
+    best = candidates[model_name][1]
+    for name in candidates:
+        print(f"   - {name:<24} {metric} {values[name][metric]:.4f} | "
+              f"p99 linha {values[name]['latency_single_p99_ms']:.3f} ms"
+              f"{'' if name in feasible else ' (fora dos limites)'}")
+    print(f"\nMELHOR MODELO: {model_name} ({metric} {values[model_name][metric]:.4f})")
+
+    model_dir = train_model.save_model(best['model'], features['encoders'], model_name,
+                                       values[model_name], X_reference=split['X_train'])
+    train_model.register_best_model(best['model'], model_name, values[model_name],
+                                    model_uri=f"runs:/{run_ids[model_name]}/model")
+    return str(model_dir)
+
+
+def build_stages(raw_path, rf_params, constraints=None):
+    """Define o grafo de etapas do pipeline."""
+    raw_path = Path(raw_path)
+    stat = raw_path.stat()
+    fingerprint = f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    return [
+        Stage("load", stage_load,
+              params={'path': str(raw_path), 'fingerprint': fingerprint}),
+        Stage("parse_structured", stage_parse_structured, deps=["load"],
+              code=[stage_parse_structured, prepare_data.parse_structured_features, parsers]),
+        Stage("clean_numeric", stage_clean_numeric, deps=["parse_structured"],
+              code=[stage_clean_numeric, prepare_data.clean_numeric_columns,
+                    transform.clean_numeric_series]),
+        Stage("validate", stage_validate, deps=["clean_numeric"],
+              params={'quarantine_path': str(DATA_PROCESSED / "quarantine.csv")},
+              code=[stage_validate, prepare_data.validate_data, prepare_data.build_validation_rules,
+                    prepare_data.VALIDATION_EXTRA_BOUNDS, prepare_data.CreditScoreInput]),
+        Stage("fill_missing", stage_fill_missing, deps=["validate"],
+              code=[stage_fill_missing, prepare_data.fill_missing_numeric]),
+        Stage("clean_categorical", stage_clean_categorical, deps=["fill_missing"],
+              code=[stage_clean_categorical, prepare_data.clean_categorical_columns]),
+        Stage("create_features", stage_create_features, deps=["clean_categorical"],
+              code=[stage_create_features, prepare_data.create_features, transform]),
+        Stage("prepare_final", stage_prepare_final, deps=["create_features"],
+              code=[stage_prepare_final, prepare_data.prepare_final_dataset]),
+        Stage("save_data", stage_save_data, deps=["create_features", "prepare_final", "validate"],
+              params={'report_path': str(DATA_PROCESSED / "validation_report.json")},
+              cache=False),
+        Stage("prepare_features", stage_prepare_features, deps=["prepare_final"],
+              code=[stage_prepare_features, train_model.prepare_features, transform]),
+        Stage("split", stage_split, deps=["prepare_features"],
+              params={'test_size': TEST_SIZE, 'random_state': RANDOM_STATE}),
+        Stage("train_logistic_regression", stage_train_logistic_regression, deps=["split"],
+              code=[stage_train_logistic_regression, train_model.train_logistic_regression]),
+        Stage("train_random_forest", stage_train_random_forest, deps=["split"],
+              params={'params': {**train_model.RF_PARAMS, **rf_params}},
+              code=[stage_train_random_forest, train_model.train_random_forest]),
+        Stage("train_hist_gradient_boosting", stage_train_hist_gradient_boosting,
+              deps=["split", "prepare_features"],
+              code=[stage_train_hist_gradient_boosting, train_model.train_hist_gradient_boosting,
+                    train_model.HGB_PARAMS]),
+        Stage("select_and_register", stage_select_and_register,
+              deps=["prepare_features", "split", "train_logistic_regression",
+                    "train_random_forest", "train_hist_gradient_boosting"],
+              params={'metric': SELECTION_METRIC,
+                      'constraints': SELECTION_CONSTRAINTS if constraints is None else constraints},
+              cache=False),
+    ]
+
+
+def parse_param(text):
+    """Converte 'chave=valor' em (chave, valor) interpretando o valor como JSON."""
+    key, _, value = text.partition('=')
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+
+def main():
+    """Executa o pipeline com cache."""
+    parser = argparse.ArgumentParser(description="Pipeline QuantumFinance com cache por etapa")
+    parser.add_argument("--data", default=str(DATA_RAW / "train.csv"), help="CSV bruto de entrada")
+    parser.add_argument("--workers", type=int, default=None, help="Etapas em paralelo")
+    parser.add_argument("--force", action="append", default=[], help="Etapa a reexecutar")
+    parser.add_argument("--rf-param", action="append", default=[],
+                        help="Hiperparametro do Random Forest (ex: max_depth=10)")
+    parser.add_argument("--constraint", action="append", default=None,
+                        help="Limite da selecao (ex: latency_single_p99_ms<20)")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("PIPELINE QUANTUMFINANCE (DAG COM CACHE)")
+    print("="*60)
+
+    rf_params = dict(parse_param(p) for p in args.rf_param)
+    profiler = PipelineProfiler("pipeline_dag", track_memory=False)
+    constraints = None if args.constraint is None else benchmark.parse_constraints(args.constraint)
+    runner = DAGRunner(build_stages(args.data, rf_params, constraints), CACHE_DIR / "stages",
+                       max_workers=args.workers, profiler=profiler)
+    outputs = runner.run(targets=["save_data", "select_and_register"], force=args.force)
+
+    profiler.print_report()
+    profile_path = profiler.save()
+    print(f"   - Perfil salvo em: {profile_path}")
+
+    print("\n" + "="*60)
+    print("PIPELINE CONCLUIDO!")
+    print(f"   - Dados finais salvos em: {outputs['save_data']}")
+    print(f"   - Modelo salvo em: {outputs['select_and_register']}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
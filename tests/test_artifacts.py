@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para artefatos de modelos e escrita em segundo plano
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import tempfile
+import threading
+import numpy as np
+import sys
+import os
+from pathlib import Path
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modeling.artifacts import (
+    stage_model, load_staged_model, link_or_copy, BackgroundWriter, MODEL_FILE,
+    save_model_artifact, load_model_artifact, latest_model_dir, _floor_float32
+)
+
+
+class TestArtifacts(unittest.TestCase):
+    """Testa serializacao unica, copias e fila de escrita."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_stage_and_load(self):
+        """Testa modelo salvo no formato MLflow e lido pelo joblib (API)."""
+        from sklearn.linear_model import LogisticRegression
+
+        X = np.random.rand(40, 3)
+        y = (X[:, 0] > 0.5).astype(int)
+        model = LogisticRegression().fit(X, y)
+
+        directory = stage_model(model, self.root / "lr")
+        loaded = load_staged_model(directory)
+
+        self.assertTrue((directory / "MLmodel").exists())
+        self.assertTrue((directory / MODEL_FILE).exists())
+        np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+    def test_link_or_copy(self):
+        """Testa reaproveitamento do arquivo sem nova serializacao."""
+        source = self.root / "a.pkl"
+        source.write_bytes(b"conteudo")
+
+        destination = link_or_copy(source, self.root / "sub" / "b.pkl")
+        link_or_copy(source, destination)  # sobrescreve sem erro
+
+        self.assertEqual(destination.read_bytes(), b"conteudo")
+
+    def test_compact_forest_roundtrip(self):
+        """Testa formato compacto sem alterar predicoes, com e sem compressao."""
+        from sklearn.ensemble import RandomForestClassifier
+
+        rng = np.random.RandomState(0)
+        X = rng.rand(300, 4)
+        y = (X[:, 0] + X[:, 1] > 1).astype(int) + (X[:, 2] > 0.8)
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+        X_check = np.vstack([X, rng.rand(300, 4)])
+
+        for compression, suffix in (("none", ".npy"), ("fast", ".npy.z")):
+            directory = self.root / compression
+            save_model_artifact(model, directory, "compact", compression)
+            loaded = load_model_artifact(directory)
+
+            self.assertTrue((directory / "forest" / f"threshold{suffix}").exists())
+            self.assertFalse(hasattr(loaded, 'compact_forest_'))
+            np.testing.assert_array_equal(loaded.predict_proba(X_check), model.predict_proba(X_check))
+            self.assertEqual(loaded.estimators_[0].tree_.node_count,
+                             model.estimators_[0].tree_.node_count)
+
+        # Arrays sem compressao em dtypes reduzidos
+        threshold = np.load(self.root / "none" / "forest" / "threshold.npy")
+        left_child = np.load(self.root / "none" / "forest" / "left_child.npy")
+        self.assertEqual(threshold.dtype, np.float32)
+        self.assertEqual(left_child.dtype, np.int32)
+
+    def test_compact_falls_back_to_pickle(self):
+        """Testa modelos que nao sao florestas gravados como pickle."""
+        from sklearn.linear_model import LogisticRegression
+
+        X = np.random.rand(40, 3)
+        model = LogisticRegression().fit(X, (X[:, 0] > 0.5).astype(int))
+        save_model_artifact(model, self.root, "compact", "fast")
+
+        self.assertFalse((self.root / "forest").exists())
+        np.testing.assert_array_equal(load_model_artifact(self.root).coef_, model.coef_)
+
+    def test_floor_float32(self):
+        """Testa arredondamento para baixo: x <= t equivale a x <= t32 em float32."""
+        thresholds = np.array([0.1, 1 / 3, -0.7, 2.5])
+        floored = _floor_float32(thresholds)
+
+        self.assertTrue(np.all(floored.astype(np.float64) <= thresholds))
+        above = np.nextafter(floored, np.float32(np.inf))
+        self.assertTrue(np.all(above.astype(np.float64) > thresholds))
+
+    def test_latest_model_dir(self):
+        """Testa escolha pelo timestamp do nome, de qualquer tipo."""
+        for name in ("random_forest_20250101_120000", "logistic_regression_20250102_080000"):
+            (self.root / name).mkdir()
+            (self.root / name / MODEL_FILE).write_bytes(b"")
+        (self.root / "incompleto_20250103_000000").mkdir()
+
+        self.assertEqual(latest_model_dir(self.root).name, "logistic_regression_20250102_080000")
+
+    def test_writer_runs_in_order_off_main_thread(self):
+        """Testa ordem FIFO, thread separada e propagacao de erros."""
+        calls = []
+
+        def task(value):
+            calls.append((value, threading.current_thread() is threading.main_thread()))
+            return value
+
+        writer = BackgroundWriter()
+        futures = [writer.submit(task, i) for i in range(5)]
+        writer.wait()
+
+        self.assertEqual([value for value, _ in calls], list(range(5)))
+        self.assertFalse(any(on_main for _, on_main in calls))
+        self.assertEqual(futures[-1].result(), 4)
+
+        def fail():
+            raise IOError("disco cheio")
+
+        writer = BackgroundWriter()
+        writer.submit(fail)
+        with self.assertRaises(IOError):
+            writer.wait()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o cliente de lotes da aplicacao Streamlit
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import threading
+import time
+import pandas as pd
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.client import split_chunks, retry_delay, post_with_retry, predict_batches, HealthCheck
+
+
+class FakeResponse:
+    """Resposta HTTP minima."""
+
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = headers or {}
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Sessao que responde 429 nas primeiras chamadas de cada lote."""
+
+    def __init__(self, rejections=0, retry_after=None):
+        self.rejections = rejections
+        self.retry_after = retry_after
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._seen = {}
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.calls.append(len(json['predictions']))
+            key = json['predictions'][0]['age']
+            self._seen[key] = self._seen.get(key, 0) + 1
+            rejected = self._seen[key] <= self.rejections
+        try:
+            if rejected:
+                headers = {'Retry-After': self.retry_after} if self.retry_after else {}
+                return FakeResponse(429, "Rate limit exceeded", headers)
+            results = [{'credit_score': 'Good', 'confidence': 0.9, 'risk_level': 'Baixo',
+                        'age': row['age']} for row in json['predictions']]
+            return FakeResponse(200, {'results': results})
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TestBatchClient(unittest.TestCase):
+    """Testa divisao em lotes, repeticao e envio paralelo."""
+
+    def test_split_chunks(self):
+        """Testa lotes de no maximo chunk_size linhas."""
+        self.assertEqual(split_chunks(250, 100), [(0, 100), (100, 200), (200, 250)])
+        self.assertEqual(split_chunks(0, 100), [])
+
+    def test_retry_after_header(self):
+        """Testa Retry-After em segundos e como data HTTP."""
+        self.assertEqual(retry_delay(FakeResponse(429, headers={'Retry-After': '7'}), 0), 7.0)
+        when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        delay = retry_delay(FakeResponse(429, headers={'Retry-After': when}), 0)
+        self.assertTrue(25 <= delay <= 30)
+
+    def test_exponential_backoff(self):
+        """Testa backoff crescente e limitado sem Retry-After."""
+        response = FakeResponse(429)
+        self.assertLessEqual(retry_delay(response, 0, base=1.0), 1.0)
+        self.assertGreaterEqual(retry_delay(response, 3, base=1.0), 4.0)
+        self.assertLessEqual(retry_delay(response, 20, base=1.0, maximum=10.0), 10.0)
+
+    def test_post_with_retry(self):
+        """Testa repeticao ate a resposta 200 respeitando Retry-After."""
+        session = FakeSession(rejections=2, retry_after='3')
+        waits = []
+        response = post_with_retry(session, "http://api/predict/batch", sleep=waits.append,
+                                   json={'predictions': [{'age': 30}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(waits, [3.0, 3.0])
+
+    def test_post_with_retry_waits_rate_limit_window(self):
+        """Testa que 429 segue o prazo de espera, e nao o numero de tentativas."""
+        session = FakeSession(rejections=6, retry_after='60')
+        waits = []
+        response = post_with_retry(session, "http://api/predict/batch", max_retries=2,
+                                   deadline_s=600, sleep=waits.append,
+                                   json={'predictions': [{'age': 30}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(waits, [60.0] * 6)
+
+    def test_post_with_retry_gives_up(self):
+        """Testa que a ultima resposta 429 e devolvida ao esgotar o prazo."""
+        session = FakeSession(rejections=20, retry_after='60')
+        waits = []
+        response = post_with_retry(session, "http://api/predict/batch", deadline_s=150,
+                                   sleep=waits.append, json={'predictions': [{'age': 30}]})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(session.calls), 3)
+        self.assertEqual(sum(waits), 120.0)
+
+    def test_post_with_retry_server_errors(self):
+        """Testa limite de tentativas em 5xx transitorio."""
+        session = FakeSession()
+        session.post = lambda url, **kwargs: session.calls.append(url) or FakeResponse(503)
+        response = post_with_retry(session, "http://api/predict/batch", max_retries=2,
+                                   sleep=lambda s: None, json={'predictions': [{'age': 30}]})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(session.calls), 3)
+
+    def test_predict_batches(self):
+        """Testa que todas as linhas voltam, com paralelismo limitado."""
+        df = pd.DataFrame({'age': range(1050)})
+        session = FakeSession(rejections=1)
+        results = {}
+        for start, end, response in predict_batches(session, "http://api", df, "token",
+                                                    chunk_size=100, max_workers=3,
+                                                    sleep=lambda s: None):
+            self.assertEqual(response.status_code, 200)
+            results[start] = [r['age'] for r in response.json()['results']]
+            self.assertEqual(len(results[start]), end - start)
+
+        ages = [age for start in sorted(results) for age in results[start]]
+        self.assertEqual(ages, list(range(1050)))
+        self.assertLessEqual(session.max_in_flight, 3)
+        self.assertTrue(all(size <= 100 for size in session.calls))
+
+
+class SlowHealthSession:
+    """Sessao cujo /health demora e alterna o estado."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.status_code = 200
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return FakeResponse(self.status_code)
+
+
+class TestHealthCheck(unittest.TestCase):
+    """Testa estado da API em cache com atualizacao em segundo plano."""
+
+    def test_first_check_waits(self):
+        """Testa espera limitada pela primeira verificacao."""
+        health = HealthCheck(SlowHealthSession(0.01), "http://api", ttl=60)
+        self.assertTrue(health.status(wait=2.0))
+
+    def test_status_does_not_block(self):
+        """Testa que o estado vencido e devolvido sem esperar a rede."""
+        session = SlowHealthSession(0.01)
+        health = HealthCheck(session, "http://api", ttl=0.05)
+        self.assertTrue(health.status(wait=2.0))
+
+        session.delay, session.status_code = 0.5, 503
+        time.sleep(0.06)
+        start = time.monotonic()
+        self.assertTrue(health.status())           # valor anterior, atualizacao disparada
+        self.assertTrue(health.status())           # sem segunda thread em paralelo
+        self.assertLess(time.monotonic() - start, 0.1)
+        time.sleep(0.05)
+        self.assertEqual(session.calls, 2)
+
+        time.sleep(0.7)
+        self.assertFalse(health.status())
+
+    def test_cached_within_ttl(self):
+        """Testa que dentro do ttl nao ha novas verificacoes."""
+        session = SlowHealthSession(0.0)
+        health = HealthCheck(session, "http://api", ttl=60)
+        health.status(wait=2.0)
+        for _ in range(10):
+            health.status()
+        self.assertEqual(session.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
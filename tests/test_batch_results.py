@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para os resultados da analise em lote da aplicacao
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import io
+import pandas as pd
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.results import (chunk_scores, merge_results, page_count, get_page, iter_csv,
+                         RESULT_COLUMNS)
+
+
+def api_results(start, end):
+    """Respostas de /predict/batch para as linhas [start, end)."""
+    return [{'credit_score': 'Good' if i % 2 else 'Poor', 'confidence': i / 1000,
+             'risk_level': 'Low' if i % 2 else 'High', 'prediction_id': f"pred_{i}"}
+            for i in range(start, end)]
+
+
+class TestBatchResults(unittest.TestCase):
+    """Testa juncao vetorizada, paginacao e exportacao em blocos."""
+
+    def setUp(self):
+        self.df = pd.DataFrame({'age': range(250), 'occupation': 'Engineer',
+                                'annual_income': 1000.0})
+
+    def test_merge_in_file_order(self):
+        """Testa juncao na ordem do arquivo com lotes fora de ordem."""
+        frames = {}
+        for start, end in [(200, 250), (0, 100), (100, 200)]:
+            frames[start] = chunk_scores(api_results(start, end), self.df.index[start:end])
+        merged = merge_results(self.df, frames)
+
+        self.assertEqual(list(merged.columns), list(self.df.columns) + RESULT_COLUMNS)
+        self.assertEqual(merged['age'].tolist(), list(range(250)))
+        self.assertEqual(merged['confidence'].tolist(), [i / 1000 for i in range(250)])
+
+    def test_failed_chunk_left_out(self):
+        """Testa que linhas de lotes com erro nao aparecem."""
+        frames = {0: chunk_scores(api_results(0, 100), self.df.index[0:100]),
+                  200: chunk_scores(api_results(200, 250), self.df.index[200:250])}
+        merged = merge_results(self.df, frames)
+        self.assertEqual(len(merged), 150)
+        self.assertFalse(merged['credit_score'].isna().any())
+        self.assertIsNone(merge_results(self.df, {}))
+
+    def test_pagination(self):
+        """Testa contagem de paginas e ultima pagina parcial."""
+        self.assertEqual(page_count(250, 100), 3)
+        self.assertEqual(page_count(0, 100), 1)
+        self.assertEqual(get_page(self.df, 3, 100)['age'].tolist(), list(range(200, 250)))
+
+    def test_iter_csv(self):
+        """Testa CSV em blocos igual ao CSV inteiro."""
+        blocks = list(iter_csv(self.df, chunk_rows=60))
+        self.assertEqual(len(blocks), 5)
+        self.assertEqual(b"".join(blocks), self.df.to_csv(index=False).encode('utf-8'))
+        pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(b"".join(blocks))), self.df)
+
+    def test_iter_csv_empty(self):
+        """Testa que um resultado vazio ainda gera o cabecalho."""
+        self.assertEqual(b"".join(iter_csv(self.df.iloc[:0])), b"age,occupation,annual_income\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o benchmark de inferencia e a selecao de modelos
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modeling.benchmark import (benchmark_model, benchmark_artifacts, select_model,
+                                    parse_constraints)
+
+
+class TestBenchmark(unittest.TestCase):
+    """Testa medidas de custo e selecao com restricoes."""
+
+    def setUp(self):
+        self.candidates = {
+            'lento': {'f1_score': 0.80, 'latency_single_p99_ms': 40.0},
+            'rapido': {'f1_score': 0.78, 'latency_single_p99_ms': 2.0},
+            'medio': {'f1_score': 0.79, 'latency_single_p99_ms': 8.0},
+        }
+
+    def test_benchmark_model(self):
+        """Testa metricas geradas para um modelo simples."""
+        from sklearn.linear_model import LogisticRegression
+
+        X = np.random.rand(200, 4)
+        y = (X[:, 0] > 0.5).astype(int)
+        model = LogisticRegression().fit(X, y)
+
+        stats = benchmark_model(model, X[:50], n_single=20, n_batches=5)
+
+        for key in ('artifact_size_mb', 'memory_mb', 'load_time_ms',
+                    'latency_single_p50_ms', 'latency_single_p99_ms',
+                    'latency_batch_p99_ms', 'batch_rows_per_s'):
+            self.assertIn(key, stats)
+        self.assertGreater(stats['artifact_size_mb'], 0)
+        self.assertLessEqual(stats['latency_single_p50_ms'], stats['latency_single_p99_ms'])
+
+    def test_benchmark_artifacts(self):
+        """Testa comparacao de formatos de artefato em processos novos."""
+        import tempfile
+        from sklearn.ensemble import RandomForestClassifier
+
+        X = np.random.rand(200, 4)
+        model = RandomForestClassifier(n_estimators=3, random_state=0).fit(X, X[:, 0] > 0.5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            results = benchmark_artifacts(model, X[:20], directory, repeats=1)
+
+        self.assertEqual(sorted(results), ['compact/fast', 'compact/none', 'pickle/fast', 'pickle/none'])
+        for stats in results.values():
+            self.assertTrue(stats['identical_predictions'])
+            self.assertGreater(stats['load_time_ms'], 0)
+            self.assertGreater(stats['size_mb'], 0)
+
+    def test_select_without_constraints(self):
+        """Testa selecao pela metrica pura."""
+        best, feasible = select_model(self.candidates)
+        self.assertEqual(best, 'lento')
+        self.assertEqual(len(feasible), 3)
+
+    def test_select_with_latency_limit(self):
+        """Testa maior F1 entre os que respeitam o p99."""
+        best, feasible = select_model(self.candidates, 'f1_score',
+                                      parse_constraints(['latency_single_p99_ms<10']))
+        self.assertEqual(best, 'medio')
+        self.assertEqual(sorted(feasible), ['medio', 'rapido'])
+
+    def test_select_when_nothing_feasible(self):
+        """Testa escolha do que menos viola quando nenhum respeita."""
+        best, feasible = select_model(self.candidates, 'f1_score',
+                                      {'latency_single_p99_ms': 1.0})
+        self.assertEqual(best, 'rapido')
+        self.assertEqual(feasible, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para a captura de trafego e o replay
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import tempfile
+import json
+import sys
+import os
+from pathlib import Path
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from src.api.capture import (TrafficCapture, CaptureMiddleware, read_capture, redact_headers,
+                             REDACTED)
+from src.benchmarks.replay import replay_plan, compare_scores
+
+
+async def predict(request: Request):
+    """Rota falsa: score a partir da idade enviada."""
+    data = await request.json()
+    return JSONResponse({'credit_score': 'Good' if data['age'] > 30 else 'Poor',
+                         'confidence': data['age'] / 100})
+
+
+def record(t, scores, status=200, path="/predict"):
+    """Registro de captura minimo."""
+    return {'t': t, 'path': path, 'status': status, 'rows': len(scores or [1]),
+            'body': '{}', 'duration_ms': 1.0, 'scores': scores}
+
+
+class TestTrafficCapture(unittest.TestCase):
+    """Testa amostragem, redacao e escrita da captura."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_redact_headers(self):
+        """Testa que credenciais nao sao gravadas."""
+        headers = redact_headers([(b'Authorization', b'Bearer abc'), (b'cookie', b'sid=1'),
+                                  (b'x-request-id', b'42')])
+        self.assertEqual(headers, {'authorization': REDACTED, 'cookie': REDACTED,
+                                   'x-request-id': '42'})
+
+    def test_middleware_round_trip(self):
+        """Testa corpo intacto para a rota e registro completo no arquivo."""
+        capture = TrafficCapture(self.directory, sample_rate=1.0, flush_interval=60).start()
+        app = Starlette(routes=[Route("/predict", predict, methods=["POST"]),
+                                Route("/health", lambda request: JSONResponse({}))])
+        app.add_middleware(CaptureMiddleware, capture=capture)
+        client = TestClient(app)
+
+        response = client.post("/predict", json={'age': 45}, headers={'Authorization': 'Bearer t'})
+        self.assertEqual(response.json()['credit_score'], 'Good')
+        client.get("/health")
+        capture.close()
+
+        records = read_capture(self.directory)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(json.loads(records[0]['body']), {'age': 45})
+        self.assertEqual(records[0]['scores'], [['Good', 0.45]])
+        self.assertEqual(records[0]['headers']['authorization'], REDACTED)
+        self.assertEqual(capture.stats()['written'], 1)
+
+    def test_capacity_and_sampling(self):
+        """Testa descarte com buffer cheio e taxa de amostragem zero."""
+        capture = TrafficCapture(self.directory, sample_rate=0.0, capacity_bytes=10)
+        self.assertFalse(capture.should_capture("/predict"))
+        self.assertTrue(capture.record("POST", "/predict", [], b"{}", 200, 0.0, 1.0, b"{}"))
+        self.assertFalse(capture.record("POST", "/predict", [], b"x" * 20, 200, 0.0, 1.0, b""))
+        self.assertEqual(capture.stats()['dropped'], 1)
+
+
+class TestReplay(unittest.TestCase):
+    """Testa agendamento e comparacao de scores do replay."""
+
+    def test_plan_scales_offsets(self):
+        """Testa intervalos originais divididos pela velocidade."""
+        records = [record(100.0, None), record(101.0, None), record(104.0, None)]
+        items, offsets = replay_plan(records, speed=2.0)
+        self.assertEqual(offsets, [0.0, 0.5, 2.0])
+        self.assertEqual(items[0], ("/predict", b"{}", 1))
+
+    def test_compare_scores(self):
+        """Testa classes e confiancas divergentes e status diferentes."""
+        records = [record(0, [['Good', 0.9]]), record(1, [['Poor', 0.8], ['Good', 0.7]]),
+                   record(2, [['Good', 0.6]])]
+        replayed = [(200, [['Good', 0.9]]), (200, [['Standard', 0.8], ['Good', 0.75]]),
+                    (429, None)]
+        diff = compare_scores(records, replayed, tolerance=0.01)
+        self.assertEqual((diff['requests'], diff['rows']), (2, 3))
+        self.assertEqual(diff['class_mismatches'], 1)
+        self.assertEqual(diff['confidence_mismatches'], 1)
+        self.assertEqual(diff['status_mismatches'], 1)
+        self.assertAlmostEqual(diff['max_confidence_diff'], 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o executor de DAG com cache
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import tempfile
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.pipeline.dag import Stage, DAGRunner
+
+CALLS = []
+
+
+def base(value):
+    CALLS.append('base')
+    return value
+
+def double(x):
+    CALLS.append('double')
+    return x * 2
+
+def add(x, amount):
+    CALLS.append('add')
+    return x + amount
+
+def combine(a, b):
+    CALLS.append('combine')
+    return a + b
+
+
+def build(amount):
+    return [
+        Stage("base", base, params={'value': 10}),
+        Stage("double", double, deps=["base"]),
+        Stage("add", add, deps=["base"], params={'amount': amount}),
+        Stage("combine", combine, deps=["double", "add"]),
+    ]
+
+
+class TestDAGRunner(unittest.TestCase):
+    """Testa cache e invalidacao das etapas."""
+
+    def setUp(self):
+        CALLS.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_run_and_cache(self):
+        """Testa que a segunda execucao usa apenas o cache."""
+        result = DAGRunner(build(1), self.tmp.name).run(["combine"])
+        self.assertEqual(result["combine"], 20 + 11)
+        self.assertEqual(sorted(CALLS), ['add', 'base', 'combine', 'double'])
+
+        CALLS.clear()
+        result = DAGRunner(build(1), self.tmp.name).run(["combine"])
+        self.assertEqual(result["combine"], 31)
+        self.assertEqual(CALLS, [])
+
+    def test_param_change_invalidates_downstream_only(self):
+        """Testa que mudar um parametro reexecuta so a etapa e dependentes."""
+        DAGRunner(build(1), self.tmp.name).run(["combine"])
+        CALLS.clear()
+
+        result = DAGRunner(build(5), self.tmp.name).run(["combine"])
+        self.assertEqual(result["combine"], 35)
+        self.assertEqual(sorted(CALLS), ['add', 'combine'])
+
+    def test_force(self):
+        """Testa reexecucao forcada de uma etapa."""
+        DAGRunner(build(1), self.tmp.name).run(["combine"])
+        CALLS.clear()
+
+        DAGRunner(build(1), self.tmp.name).run(["double"], force=["double"])
+        self.assertEqual(CALLS, ['double'])
+
+    def test_cycle_detection(self):
+        """Testa erro para grafo com ciclo."""
+        stages = [Stage("a", double, deps=["b"]), Stage("b", double, deps=["a"])]
+        with self.assertRaises(ValueError):
+            DAGRunner(stages, self.tmp.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,7 +17,8 @@ import os
 # Adicionar o diretório src ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.features.prepare_data import create_features, clean_numeric_columns
+from src.features.prepare_data import (create_features, clean_numeric_columns, validate_data,
+                                       build_validation_rules, fill_missing_numeric)
 
 
 class TestDataPreparation(unittest.TestCase):
@@ -86,6 +87,44 @@ class TestDataPreparation(unittest.TestCase):
         bad_client_score = result.iloc[3]['Payment_Score']
         
         self.assertGreater(good_client_score, bad_client_score)
+    
+    def test_validation_rules_from_api_schema(self):
+        """Testa que as regras reutilizam os limites de CreditScoreInput."""
+        rules = build_validation_rules()
+        
+        self.assertEqual(rules['Age'], {'ge': 18, 'le': 100})
+        self.assertEqual(rules['Annual_Income'], {'gt': 0})
+        self.assertIn('le', rules['Num_Bank_Accounts'])
+    
+    def test_validate_data_quarantine(self):
+        """Testa remocao e contagem de linhas fora das faixas."""
+        df = pd.DataFrame({
+            'Age': [25, 8698, -500, 40],
+            'Num_Bank_Accounts': [3, 2, 1, 1500],
+            'Annual_Income': [50000, 60000, 70000, 80000]
+        })
+        
+        valid, report = validate_data(df)
+        
+        self.assertEqual(len(valid), 1)
+        self.assertEqual(valid.iloc[0]['Age'], 25)
+        self.assertEqual(report['violacoes_por_coluna']['Age'], 2)
+        self.assertEqual(report['violacoes_por_coluna']['Num_Bank_Accounts'], 1)
+        self.assertEqual(report['linhas_invalidas'], 3)
+    
+    def test_fill_missing_after_validation(self):
+        """Testa que faltantes passam pela validacao e recebem a mediana das linhas validas."""
+        df = clean_numeric_columns(pd.DataFrame({
+            'Age': ['25', '_', '30', '8698', '35']
+        }), fill_missing=False)
+        self.assertTrue(df['Age'].isnull().any())
+        
+        valid, report = validate_data(df)
+        self.assertEqual(report['faltantes_por_coluna']['Age'], 1)
+        self.assertEqual(report['linhas_invalidas'], 1)
+        
+        result = fill_missing_numeric(valid)
+        self.assertEqual(result['Age'].tolist(), [25.0, 30.0, 30.0, 35.0])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o monitoramento de drift
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import tempfile
+import numpy as np
+import sys
+import os
+from pathlib import Path
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.monitoring.drift import Reference, DriftMonitor, drift_scores, _cut_points
+
+
+class TestReference(unittest.TestCase):
+    """Testa bins e contagens de referencia."""
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = np.column_stack([rng.normal(size=2000), rng.randint(0, 4, 2000)])
+        self.reference = Reference.build(self.X, ['renda', 'ocupacao'], [False, True], n_bins=10)
+
+    def test_cut_points_between_values(self):
+        """Testa que nenhum valor coincide com um corte."""
+        values = np.repeat([1.0, 2.0, 3.0, 4.0], 50)
+        cuts = _cut_points(values, 10)
+        self.assertFalse(np.isin(values, cuts).any())
+        self.assertEqual(list(cuts), [1.5, 2.5, 3.5])
+
+    def test_counts_match_rows(self):
+        """Testa que cada feature soma o numero de linhas."""
+        for start, n in zip(self.reference.offsets, self.reference.n_bins):
+            self.assertEqual(self.reference.counts[start:start + n].sum(), len(self.X))
+        # 4 codigos + 1 bin para codigos novos
+        self.assertEqual(self.reference.n_bins[1], 5)
+
+    def test_new_category_goes_to_last_bin(self):
+        """Testa que codigos novos caem no ultimo bin da categorica."""
+        counts = self.reference.bin_counts(np.array([[0.0, 7.0]]))
+        start, n = self.reference.offsets[1], self.reference.n_bins[1]
+        self.assertEqual(counts[start + n - 1], 1)
+
+    def test_save_load(self):
+        """Testa persistencia em .npz."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.reference.save(Path(tmp) / "ref.npz")
+            loaded = Reference.load(path)
+        self.assertEqual(loaded.feature_names, ['renda', 'ocupacao'])
+        np.testing.assert_array_equal(loaded.counts, self.reference.counts)
+        np.testing.assert_array_equal(loaded.bin_counts(self.X), self.reference.counts)
+
+    def test_psi_detects_shift(self):
+        """Testa PSI baixo na mesma distribuicao e alto com deslocamento."""
+        rng = np.random.RandomState(1)
+        same = np.column_stack([rng.normal(size=2000), rng.randint(0, 4, 2000)])
+        shifted = same + [1.5, 0]
+        same_scores = drift_scores(self.reference, self.reference.bin_counts(same))
+        shifted_scores = drift_scores(self.reference, self.reference.bin_counts(shifted))
+        self.assertLess(same_scores['renda']['psi'], 0.05)
+        self.assertGreater(shifted_scores['renda']['psi'], 0.5)
+        self.assertGreater(shifted_scores['renda']['ks'], same_scores['renda']['ks'])
+        self.assertLess(shifted_scores['ocupacao']['psi'], 0.05)
+
+
+class TestDriftMonitor(unittest.TestCase):
+    """Testa contagens ao vivo em janelas deslizantes."""
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = rng.normal(size=(1000, 1))
+        self.reference = Reference.build(self.X, ['renda'], [False])
+        self.monitor = DriftMonitor(self.reference, bucket_seconds=60, n_buckets=10)
+
+    def test_window_expiry(self):
+        """Testa que buckets antigos saem da janela."""
+        self.monitor.update(self.X[:100], now=0)
+        self.monitor.update(self.X[100:130], now=400)
+        self.assertEqual(self.monitor.window_counts(300, now=400).sum(), 30)
+        self.assertEqual(self.monitor.window_counts(600, now=400).sum(), 130)
+        # Depois de n_buckets, o slot reaproveitado comeca do zero
+        self.monitor.update(self.X[:5], now=600)
+        self.assertEqual(self.monitor.window_counts(600, now=600).sum(), 35)
+
+    def test_report(self):
+        """Testa relatorio com features acima do limite."""
+        self.monitor.update(self.X + 3, now=0)
+        report = self.monitor.report((300,), threshold=0.2, now=0)
+        self.assertEqual(report['300s']['rows'], 1000)
+        self.assertEqual(report['300s']['drifted'], ['renda'])
+
+    def test_empty_window(self):
+        """Testa janela sem predicoes."""
+        report = self.monitor.report((300,), now=0)
+        self.assertEqual(report['300s']['rows'], 0)
+        self.assertEqual(report['300s']['features'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o cache de features
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import tempfile
+import time
+import numpy as np
+import sys
+import os
+from pathlib import Path
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.feature_cache import FeatureCache
+
+
+def transform_v1(df):
+    return df
+
+
+class TestFeatureCache(unittest.TestCase):
+    """Testa gravacao, leitura e invalidacao do cache."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.data_path = self.root / "final.csv"
+        self.data_path.write_text("a,b\n1,2\n")
+        self.arrays = {'X_train': np.random.rand(8, 3), 'y_train': np.arange(8)}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_cache(self, params=None):
+        return FeatureCache(self.data_path, code=[transform_v1], params=params,
+                            cache_dir=self.root / "cache")
+
+    def test_save_and_load(self):
+        """Testa ida e volta com memmap, encoders e manifest."""
+        cache = self.make_cache()
+        self.assertFalse(cache.exists())
+
+        cache.save(self.arrays, {'target': 'encoder'}, ['f1', 'f2', 'f3'])
+        self.assertTrue(cache.exists())
+
+        data_paths, encoders, manifest = self.make_cache().load()
+        arrays = cache.arrays()
+        self.assertEqual(encoders, {'target': 'encoder'})
+        self.assertEqual(manifest['feature_names'], ['f1', 'f2', 'f3'])
+        self.assertEqual(manifest['arrays']['X_train']['shape'], [8, 3])
+        self.assertEqual(set(data_paths), {'X_train', 'y_train'})
+        self.assertIsInstance(arrays['X_train'], np.memmap)
+        self.assertEqual(arrays['X_train'].dtype, np.float32)
+        np.testing.assert_allclose(arrays['X_train'], self.arrays['X_train'], rtol=1e-6)
+        np.testing.assert_array_equal(arrays['y_train'], self.arrays['y_train'])
+
+    def test_key_changes(self):
+        """Testa invalidacao por parametros e por mudanca no dataset."""
+        cache = self.make_cache()
+        cache.save(self.arrays, {}, ['f1', 'f2', 'f3'])
+
+        self.assertNotEqual(self.make_cache({'test_size': 0.3}).key, cache.key)
+
+        time.sleep(0.01)
+        self.data_path.write_text("a,b\n1,2\n3,4\n")
+        self.assertFalse(self.make_cache().exists())
+
+    def test_no_partial_entries(self):
+        """Testa que so entradas completas ficam no diretorio do cache."""
+        cache = self.make_cache()
+        cache.save(self.arrays, {}, ['f1', 'f2', 'f3'])
+
+        entries = [p.name for p in (self.root / "cache").iterdir()]
+        self.assertEqual(entries, [cache.key])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o retreino incremental
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import copy
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+from src.features.transform import FeatureTransformer
+from src.modeling.incremental import (rescale_linear, refresh_forest,
+                                      partial_fit_logistic, incremental_update)
+
+
+def make_data(n_rows, seed, occupations=('Engineer', 'Doctor')):
+    """Dataset no schema final com target dependente das features."""
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame({
+        'Age': rng.randint(20, 60, n_rows).astype(float),
+        'Annual_Income': rng.uniform(1e4, 1e5, n_rows),
+        'Outstanding_Debt': rng.uniform(0, 5e3, n_rows),
+        'Occupation': rng.choice(occupations, n_rows),
+    })
+    score = df['Annual_Income'] / 1e5 - df['Outstanding_Debt'] / 5e3 + rng.normal(0, 0.2, n_rows)
+    df['Credit_Score'] = np.where(score > 0.3, 'Good', np.where(score > -0.3, 'Standard', 'Poor'))
+    return df
+
+
+class TestIncrementalRetraining(unittest.TestCase):
+    """Testa atualizacao da transformacao e dos modelos com linhas novas."""
+
+    def setUp(self):
+        self.old = make_data(400, 0)
+        self.new = make_data(100, 1, occupations=('Engineer', 'Lawyer'))
+        self.transformer = FeatureTransformer().fit(self.old.drop(columns=['Credit_Score']))
+        self.target = LabelEncoder().fit(self.old['Credit_Score'])
+        self.X = self.transformer.transform(self.old.drop(columns=['Credit_Score']))
+        self.y = self.target.transform(self.old['Credit_Score'])
+
+    def test_partial_fit_matches_full_statistics(self):
+        """Testa media/variancia combinadas iguais as do ajuste em todos os dados."""
+        updated = copy.deepcopy(self.transformer).partial_fit(self.new.drop(columns=['Credit_Score']))
+        full = FeatureTransformer().fit(pd.concat([self.old, self.new]).drop(columns=['Credit_Score']))
+
+        numeric = ~updated.categorical_mask()
+        np.testing.assert_allclose(updated.mean_[numeric], full.mean_[numeric])
+        np.testing.assert_allclose(updated.scale_[numeric], full.scale_[numeric])
+        self.assertEqual(updated.n_samples_seen_, 500)
+
+        # Categorias existentes mantem o codigo; novas vao para o fim
+        mapping = updated.category_maps_['Occupation']
+        self.assertEqual(mapping['Doctor'], self.transformer.category_maps_['Occupation']['Doctor'])
+        self.assertEqual(mapping['Lawyer'], 2)
+
+    def test_rescaled_linear_keeps_predictions(self):
+        """Testa que a regressao logistica reescrita na nova escala preve o mesmo."""
+        raw = self.old.drop(columns=['Credit_Score'])
+        linear = LogisticRegression(max_iter=1000).fit(self.X, self.y)
+        before = linear.predict_proba(self.X)
+
+        updated = copy.deepcopy(self.transformer).partial_fit(self.new.drop(columns=['Credit_Score']))
+        rescale_linear(linear, self.transformer.mean_, self.transformer.scale_,
+                       updated.mean_, updated.scale_)
+
+        np.testing.assert_allclose(linear.predict_proba(updated.transform(raw)), before)
+
+    def test_refresh_forest_retires_oldest(self):
+        """Testa crescimento de arvores novas e remocao das mais antigas."""
+        forest = RandomForestClassifier(n_estimators=10, random_state=0).fit(self.X, self.y)
+        newest = forest.estimators_[3:]
+
+        only_two_classes = self.y != 0
+        refresh_forest(forest, self.X[only_two_classes], self.y[only_two_classes], 3, seed=1)
+
+        self.assertEqual(len(forest.estimators_), 10)
+        self.assertEqual(forest.n_estimators, 10)
+        self.assertIs(forest.estimators_[0], newest[0])
+        self.assertEqual(forest.predict_proba(self.X).shape, (len(self.X), 3))
+
+    def test_partial_fit_logistic_reduces_loss(self):
+        """Testa que o partial fit melhora a log-loss nas linhas novas."""
+        linear = LogisticRegression(max_iter=1000).fit(self.X[:50], self.y[:50])
+        X_new, y_new = self.X[50:], self.y[50:]
+
+        def log_loss(model):
+            return -np.log(model.predict_proba(X_new)[np.arange(len(y_new)), y_new]).mean()
+
+        before = log_loss(linear)
+        partial_fit_logistic(linear, X_new, y_new, n_samples_seen=len(self.X))
+        self.assertLess(log_loss(linear), before)
+
+    def test_incremental_update(self):
+        """Testa atualizacao completa sem alterar o modelo original."""
+        forest = RandomForestClassifier(n_estimators=10, random_state=0).fit(self.X, self.y)
+        encoders = {'transformer': self.transformer, 'target': self.target}
+
+        model, new_encoders, metrics = incremental_update(forest, encoders, self.new,
+                                                          rows_seen=len(self.old))
+
+        self.assertIsNot(model, forest)
+        self.assertEqual(len(model.estimators_), 10)
+        # Arvores mantidas continuam validas: a padronizacao nao muda
+        np.testing.assert_array_equal(new_encoders['transformer'].mean_, self.transformer.mean_)
+        self.assertIn('Lawyer', new_encoders['transformer'].category_maps_['Occupation'])
+        self.assertEqual(self.transformer.n_samples_seen_, 400)
+        self.assertEqual(new_encoders['transformer'].n_samples_seen_, 500)
+        self.assertIn('f1_score', metrics)
+
+    def test_incremental_update_unsupported_model(self):
+        """Testa erro claro para modelos sem retreino incremental."""
+        model = HistGradientBoostingClassifier(max_iter=5).fit(self.X, self.y)
+        encoders = {'transformer': self.transformer, 'target': self.target}
+
+        with self.assertRaises(ValueError):
+            incremental_update(model, encoders, self.new, rows_seen=len(self.old))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o gerador de carga da API
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import json
+import os
+import sys
+from collections import Counter
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.models import BatchCreditScoreInput, CreditScoreInput
+from src.benchmarks.loadgen import build_requests, arrival_offsets, read_process, LoadStats
+
+
+class TestRequestMix(unittest.TestCase):
+    """Testa a mistura de requisicoes pre-serializadas."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.requests = build_requests(2_000, batch_fraction=0.2, pool_size=500, seed=1)
+
+    def test_fraction_and_valid_bodies(self):
+        """Testa fracao de lotes, tamanhos e corpos aceitos pela API."""
+        batches = [r for r in self.requests if r[0] == "/predict/batch"]
+        self.assertAlmostEqual(len(batches) / len(self.requests), 0.2, delta=0.03)
+        self.assertTrue({rows for _, _, rows in batches} <= {10, 50, 100})
+        for endpoint, body, rows in self.requests[:200]:
+            data = json.loads(body)
+            if endpoint == "/predict":
+                CreditScoreInput(**data)
+            else:
+                self.assertEqual(len(BatchCreditScoreInput(**data).predictions), rows)
+
+    def test_hot_customers(self):
+        """Testa popularidade concentrada (Zipf) entre os clientes."""
+        bodies = Counter(body for endpoint, body, _ in self.requests if endpoint == "/predict")
+        top = sum(count for _, count in bodies.most_common(10))
+        self.assertGreater(top / sum(bodies.values()), 0.2)
+
+
+class TestLoadStats(unittest.TestCase):
+    """Testa contagens, aquecimento e latencia a partir do horario previsto."""
+
+    def test_summary(self):
+        """Testa taxas de erro e 429 e descarte do aquecimento."""
+        stats = LoadStats(measure_from=10.0)
+        stats.record("/predict", 200, 1, 5.0, 5.0, 5.1)  # aquecimento
+        for status_code in (200, 200, 429, 500, None):
+            stats.record("/predict", status_code, 1, 10.0, 10.0, 10.01)
+        stats.record("/predict/batch", 200, 50, 11.0, 11.0, 11.02)
+
+        summary = stats.summary(elapsed_s=2.0)
+        self.assertEqual(summary['requests'], 6)
+        self.assertAlmostEqual(summary['throughput_rps'], 1.5)
+        self.assertAlmostEqual(summary['rows_per_s'], 26.0)
+        self.assertEqual(summary['endpoints']['/predict']['errors'], 2)
+        self.assertAlmostEqual(summary['endpoints']['/predict']['rate_limited_rate'], 0.2)
+
+    def test_latency_from_intended_time(self):
+        """Testa que a espera antes do envio entra na latencia (sem coordinated omission)."""
+        stats = LoadStats()
+        stats.record("/predict", 200, 1, intended=0.0, sent=0.5, finished=0.51)
+        endpoint = stats.summary(1.0)['endpoints']['/predict']
+        self.assertAlmostEqual(endpoint['latency_ms']['p50'], 510, delta=510 * 0.06)
+        self.assertAlmostEqual(endpoint['service_ms']['p50'], 10, delta=10 * 0.06)
+
+
+class TestArrivalsAndProcess(unittest.TestCase):
+    """Testa horarios de chegada e leitura do processo."""
+
+    def test_arrival_offsets(self):
+        """Testa taxa fixa e chegadas de Poisson dentro da duracao."""
+        offsets = arrival_offsets(50, 10)
+        self.assertEqual(len(offsets), 500)
+        self.assertAlmostEqual(offsets[1] - offsets[0], 0.02)
+        poisson = arrival_offsets(50, 10, poisson=True)
+        self.assertLess(poisson.max(), 10)
+        self.assertAlmostEqual(len(poisson), 500, delta=75)
+
+    @unittest.skipUnless(os.path.exists("/proc/self/stat"), "requer /proc")
+    def test_read_process(self):
+        """Testa CPU e RSS do proprio processo."""
+        cpu_s, rss_mb = read_process(os.getpid())
+        self.assertGreater(cpu_s, 0)
+        self.assertGreater(rss_mb, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
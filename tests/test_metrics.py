@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para as metricas de desempenho da API
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import asyncio
+import json
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.metrics import (Histogram, MetricsRegistry, MetricsMiddleware, percentiles,
+                             snapshot_delta, BUCKETS_PER_DECADE)
+
+
+class TestHistogram(unittest.TestCase):
+    """Testa histograma logaritmico e percentis."""
+
+    def test_percentiles_within_resolution(self):
+        """Testa percentis proximos dos exatos (erro relativo de um bucket)."""
+        values = np.random.RandomState(0).lognormal(mean=1.0, sigma=1.0, size=20000)
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+
+        result = percentiles(histogram.sparse())
+        tolerance = 10 ** (1 / BUCKETS_PER_DECADE)
+        for q in (50, 95, 99):
+            exact = np.percentile(values, q)
+            self.assertGreaterEqual(result[f"p{q}"], exact / tolerance)
+            self.assertLessEqual(result[f"p{q}"], exact * tolerance)
+
+    def test_out_of_range(self):
+        """Testa valores abaixo do minimo e acima do maximo."""
+        histogram = Histogram(min_value=1, max_value=100, buckets_per_decade=10)
+        histogram.record(0.5)
+        histogram.record(1e6)
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(histogram.counts[-1], 1)
+
+    def test_empty(self):
+        """Testa percentis de histograma vazio."""
+        self.assertEqual(percentiles({}), {'p50': None, 'p95': None, 'p99': None})
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Testa contadores da API e janelas entre snapshots."""
+
+    def setUp(self):
+        self.metrics = MetricsRegistry()
+
+    def request(self, endpoint, status_code, duration_ms):
+        self.metrics.request_started()
+        self.metrics.request_finished(endpoint, status_code, duration_ms)
+
+    def test_counts_by_status(self):
+        """Testa requisicoes, erros 5xx e rejeicoes 429 por endpoint."""
+        for status_code in (200, 200, 429, 500):
+            self.request("/predict", status_code, 2.0)
+        stats = self.metrics.snapshot()['endpoints']['/predict']
+        self.assertEqual((stats['requests'], stats['errors'], stats['rate_limited']), (4, 1, 1))
+        self.assertEqual(self.metrics.in_flight, 0)
+
+    def test_window_from_json_snapshots(self):
+        """Testa taxas e percentis da janela com snapshots vindos do JSON."""
+        for _ in range(10):
+            self.request("/predict", 200, 1.0)
+        self.metrics.record_batch(100)
+        self.metrics.record_stages("/predict/batch", {'transform': 5.0, 'predict': 1.0})
+        before = json.loads(json.dumps(self.metrics.snapshot()))
+
+        for _ in range(20):
+            self.request("/predict", 200, 100.0)
+        self.metrics.record_batch(100)
+        self.metrics.record_batch(37)
+        after = json.loads(json.dumps(self.metrics.snapshot()))
+        after['timestamp'] = before['timestamp'] + 10.0
+
+        window = snapshot_delta(before, after)
+        self.assertEqual(window['endpoints']['/predict']['requests'], 20)
+        self.assertAlmostEqual(window['rate_per_s'], 2.0)
+        # So as latencias da janela (100 ms) entram nos percentis
+        self.assertAlmostEqual(window['endpoints']['/predict']['p50'], 100.0, delta=6.0)
+        self.assertEqual(window['batch_sizes'], {37: 1, 100: 1})
+        self.assertEqual(window['stages']['/predict/batch transform']['p50'], None)
+
+    def test_restart_resets_window(self):
+        """Testa janela desde o inicio quando o processo muda."""
+        self.request("/predict", 200, 1.0)
+        before = self.metrics.snapshot()
+        before['pid'] = -1
+        window = snapshot_delta(before, self.metrics.snapshot())
+        self.assertEqual(window['endpoints']['/predict']['requests'], 1)
+
+    def test_busy_time(self):
+        """Testa tempo ocupado contado uma vez com requisicoes simultaneas."""
+        self.metrics.request_started()
+        self.metrics.request_started()
+        self.metrics.request_finished("/predict", 200, 1.0)
+        busy_open = self.metrics.busy_seconds()
+        self.metrics.request_finished("/predict", 200, 1.0)
+        busy_closed = self.metrics.busy_seconds()
+        self.assertGreaterEqual(busy_closed, busy_open)
+        self.assertEqual(self.metrics.busy_seconds(), busy_closed)
+
+
+class FakeRoute:
+    """Rota com o path usado como nome do endpoint."""
+
+    def __init__(self, path):
+        self.path = path
+
+
+class TestMetricsMiddleware(unittest.TestCase):
+    """Testa a coleta por requisicao no middleware ASGI."""
+
+    def call(self, middleware, path, route=True):
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'POST', 'path': path}
+        asyncio.run(middleware(scope, receive, send))
+        return sent
+
+    def test_records_route_and_status(self):
+        """Testa status, rota e mensagens repassadas sem alteracao."""
+        async def app(scope, receive, send):
+            scope['route'] = FakeRoute("/predict")
+            await send({'type': 'http.response.start', 'status': 429, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b'{}'})
+
+        metrics = MetricsRegistry()
+        sent = self.call(MetricsMiddleware(app, metrics), "/predict")
+
+        self.assertEqual([message['type'] for message in sent],
+                         ['http.response.start', 'http.response.body'])
+        stats = metrics.snapshot()['endpoints']['/predict']
+        self.assertEqual((stats['requests'], stats['rate_limited']), (1, 1))
+        self.assertEqual(metrics.in_flight, 0)
+
+    def test_exception_counts_as_error(self):
+        """Testa erro 500 sem rota quando a aplicacao falha."""
+        async def app(scope, receive, send):
+            raise RuntimeError("falha")
+
+        metrics = MetricsRegistry()
+        with self.assertRaises(RuntimeError):
+            self.call(MetricsMiddleware(app, metrics), "/nada")
+        self.assertEqual(metrics.snapshot()['endpoints']['other']['errors'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
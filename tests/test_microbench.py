@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para os micro-benchmarks
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.benchmarks.microbench import (time_call, bench_pipeline, compare_reports,
+                                       hardware_differences, hardware_info)
+
+
+def report(medians, **hardware):
+    """Relatorio minimo com as medianas por caso."""
+    return {'hardware': {**hardware_info(), **hardware},
+            'results': {name: {'median_ms': value} for name, value in medians.items()}}
+
+
+class TestTimeCall(unittest.TestCase):
+    """Testa a medicao de tempo por chamada."""
+
+    def test_calibrates_number(self):
+        """Testa varias chamadas por repeticao para funcoes rapidas."""
+        stats = time_call(lambda: None, repeats=3, min_time_s=0.01)
+        self.assertEqual(stats['repeats'], 3)
+        self.assertGreater(stats['number'], 1)
+        self.assertLessEqual(stats['min_ms'], stats['median_ms'])
+        self.assertLessEqual(stats['median_ms'], stats['p95_ms'])
+
+    def test_setup_gives_fresh_input(self):
+        """Testa que cada chamada recebe uma entrada nova do setup."""
+        seen = []
+        time_call(lambda items: items.append(1) or seen.append(len(items)),
+                  setup=list, repeats=4)
+        self.assertEqual(seen, [1] * 5)
+
+
+class TestPipelineCases(unittest.TestCase):
+    """Testa os casos do pipeline de dados em poucas linhas."""
+
+    def test_case_names(self):
+        """Testa um caso por funcao e tamanho."""
+        results = bench_pipeline((800,), repeats=1)
+        self.assertEqual(set(results), {'clean_numeric_columns_800', 'create_features_800'})
+        self.assertGreater(results['clean_numeric_columns_800']['median_ms'], 0)
+
+
+class TestCompare(unittest.TestCase):
+    """Testa a comparacao com a baseline."""
+
+    def test_flags_regressions_only(self):
+        """Testa regressao acima do limite; melhoras e casos novos nao contam."""
+        baseline = report({'a': 10.0, 'b': 10.0, 'c': 10.0})
+        current = report({'a': 10.5, 'b': 13.0, 'c': 5.0, 'novo': 1.0})
+        rows, regressions = compare_reports(baseline, current, threshold=0.10)
+        self.assertEqual([row['case'] for row in rows], ['a', 'b', 'c'])
+        self.assertEqual([row['case'] for row in regressions], ['b'])
+        self.assertAlmostEqual(regressions[0]['change'], 0.3)
+
+    def test_hardware_differences(self):
+        """Testa aviso quando a maquina da baseline e outra."""
+        baseline = report({}, cpu_count=64)
+        self.assertEqual(hardware_differences(baseline, report({}, cpu_count=64)), [])
+        self.assertEqual(hardware_differences(baseline, report({}, cpu_count=2)), ['cpu_count'])
+
+
+if __name__ == '__main__':
+    unittest.main()
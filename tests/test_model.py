@@ -126,6 +126,27 @@ class TestModelTraining(unittest.TestCase):
         
         # Soma deve ser aproximadamente 1
         self.assertAlmostEqual(sum(importances), 1.0, places=5)
+    
+    def test_hist_gradient_boosting_categorical(self):
+        """Testa Gradient Boosting com coluna categorica nativa."""
+        from sklearn.model_selection import train_test_split
+        from src.modeling.train_model import train_hist_gradient_boosting
+        
+        X = self.X.copy()
+        X['Credit_Mix'] = np.random.randint(0, 4, self.n_samples)  # codigos inteiros
+        categorical = np.array([col == 'Credit_Mix' for col in X.columns])
+        X_train, X_test, y_train, y_test = train_test_split(
+            X.to_numpy(), self.y, test_size=0.2, random_state=42
+        )
+        
+        model, metrics = train_hist_gradient_boosting(
+            X_train, y_train, X_test, y_test, params={'max_iter': 50},
+            n_jobs=1, categorical_features=categorical
+        )
+        
+        self.assertTrue(model.is_categorical_[list(X.columns).index('Credit_Mix')])
+        self.assertLessEqual(model.n_iter_, 50)
+        self.assertGreater(metrics['f1_score'], 0.5)
 
 
 class TestModelValidation(unittest.TestCase):
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o treinamento paralelo de candidatos
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import tempfile
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modeling.parallel import share_arrays, load_shared, split_cores, run_parallel
+
+
+def column_sum(data_paths, column):
+    """Worker de teste: soma uma coluna lida via memmap."""
+    data = load_shared(data_paths)
+    return isinstance(data['X'], np.memmap), float(data['X'][:, column].sum())
+
+
+class TestParallelTraining(unittest.TestCase):
+    """Testa compartilhamento de dados e pool de processos."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.X = np.arange(12, dtype=float).reshape(4, 3)
+        self.y = np.array([0, 1, 0, 1])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_share_arrays_roundtrip(self):
+        """Testa gravacao e leitura via memmap somente leitura."""
+        paths = share_arrays({'X': self.X, 'y': self.y}, self.tmp_dir.name, dtype=np.float32)
+        data = load_shared(paths)
+
+        self.assertEqual(data['X'].dtype, np.float32)
+        self.assertEqual(data['y'].dtype, self.y.dtype)  # inteiros mantem o dtype
+        self.assertFalse(data['X'].flags.writeable)
+        np.testing.assert_array_equal(data['X'], self.X)
+
+    def test_split_cores(self):
+        """Testa divisao de nucleos entre candidatos."""
+        cores = split_cores({'lr': False, 'rf': True, 'gb': True}, n_cores=8)
+        self.assertEqual(cores, {'lr': 1, 'rf': 3, 'gb': 3})
+
+        cores = split_cores({'lr': False, 'rf': True}, n_cores=1)
+        self.assertEqual(cores['rf'], 1)
+
+    def test_run_parallel(self):
+        """Testa execucao em processos lendo os mesmos arquivos."""
+        paths = share_arrays({'X': self.X}, self.tmp_dir.name)
+        tasks = {f"col{i}": {'data_paths': paths, 'column': i} for i in range(3)}
+
+        results = run_parallel(column_sum, tasks)
+
+        self.assertEqual(set(results), set(tasks))
+        for i in range(3):
+            is_memmap, total = results[f"col{i}"]
+            self.assertTrue(is_memmap)
+            self.assertEqual(total, self.X[:, i].sum())
+
+
+if __name__ == '__main__':
+    unittest.main()
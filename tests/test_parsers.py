@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para parsers de colunas estruturadas
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.parsers import (
+    parse_credit_history_age, parse_type_of_loan, parse_structured_columns,
+    LOAN_TYPE_COLUMNS, CREDIT_HISTORY_MONTHS
+)
+
+
+class TestParsers(unittest.TestCase):
+    """Testa parsers de Credit_History_Age e Type_of_Loan."""
+
+    def test_credit_history_age(self):
+        """Testa conversao do historico para meses."""
+        values = pd.Series(['5 Years and 2 Months', '22 Years and 11 Months',
+                            '3 Years', 'NA', None])
+        result = parse_credit_history_age(values)
+
+        self.assertEqual(result.iloc[0], 62)
+        self.assertEqual(result.iloc[1], 275)
+        self.assertEqual(result.iloc[2], 36)
+        self.assertTrue(np.isnan(result.iloc[3]))
+        self.assertTrue(np.isnan(result.iloc[4]))
+
+    def test_credit_history_age_already_numeric(self):
+        """Testa que valores ja convertidos nao sao alterados."""
+        result = parse_credit_history_age(pd.Series([62, 275]))
+        self.assertEqual(result.tolist(), [62.0, 275.0])
+
+    def test_type_of_loan_multi_hot(self):
+        """Testa vetor multi-hot dos tipos de emprestimo."""
+        values = pd.Series(['Auto Loan, Credit-Builder Loan, and Personal Loan',
+                            'Not Specified', None])
+        result = parse_type_of_loan(values)
+
+        # Colunas fixas independentemente dos valores de entrada
+        self.assertEqual(list(result.columns), LOAN_TYPE_COLUMNS)
+        self.assertEqual(result.loc[0, 'Loan_Auto_Loan'], 1)
+        self.assertEqual(result.loc[0, 'Loan_Credit_Builder_Loan'], 1)
+        self.assertEqual(result.loc[0, 'Loan_Mortgage_Loan'], 0)
+        self.assertEqual(result.loc[1, 'Loan_Not_Specified'], 1)
+        self.assertEqual(result.loc[2].sum(), 0)
+
+    def test_parse_structured_columns(self):
+        """Testa substituicao das colunas textuais."""
+        df = pd.DataFrame({
+            'Age': [30, 40],
+            'Type_of_Loan': ['Auto Loan', 'Payday Loan, and Student Loan'],
+            'Credit_History_Age': ['1 Years and 1 Months', '10 Years and 0 Months']
+        })
+        result = parse_structured_columns(df)
+
+        self.assertNotIn('Type_of_Loan', result.columns)
+        self.assertNotIn('Credit_History_Age', result.columns)
+        self.assertEqual(result[CREDIT_HISTORY_MONTHS].tolist(), [13.0, 120.0])
+        self.assertEqual(result.loc[1, 'Loan_Student_Loan'], 1)
+        # Entrada intacta
+        self.assertEqual(list(df.columns), ['Age', 'Type_of_Loan', 'Credit_History_Age'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o log de predicoes da API
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import tempfile
+import numpy as np
+import sys
+import os
+from pathlib import Path
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.prediction_log import PredictionLog
+
+
+class TestPredictionLog(unittest.TestCase):
+    """Testa buffer limitado e escrita Parquet em segundo plano."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_log(self, **kwargs):
+        options = {'capacity': 100, 'flush_interval': 60, 'rows_per_file': 1000}
+        options.update(kwargs)
+        return PredictionLog(self.directory, ['Age', 'Income'], ['Good', 'Poor'], **options)
+
+    def push(self, log, rows, endpoint="/predict/batch"):
+        return log.log(np.ones((rows, 2)), np.full((rows, 2), 0.5), ['Good'] * rows,
+                       [f"pred_{i}" for i in range(rows)], endpoint, "20250101",
+                       {'predict': 1.0, 'total': 2.0})
+
+    def test_flush_writes_parquet(self):
+        """Testa colunas gravadas e arquivo visivel apos o fechamento."""
+        import pyarrow.parquet as pq
+
+        log = self.make_log()
+        self.push(log, 3)
+        self.push(log, 1, endpoint="/predict")
+        self.assertTrue(log.flush(timeout=10))
+        self.assertEqual(list(self.directory.glob("*.parquet")), [])  # ainda em escrita
+        log.close()
+
+        files = list(self.directory.glob("*.parquet"))
+        self.assertEqual(len(files), 1)
+        table = pq.read_table(files[0]).to_pandas()
+        self.assertEqual(len(table), 4)
+        self.assertEqual(list(table['batch_size']), [3, 3, 3, 1])
+        for column in ('prediction_id', 'model_version', 'total_ms', 'proba_Good', 'feature_Income'):
+            self.assertIn(column, table.columns)
+        self.assertEqual(log.stats()['written'], 4)
+
+    def test_overflow_is_dropped_and_counted(self):
+        """Testa descarte contado quando o buffer esta cheio."""
+        log = self.make_log(capacity=5)
+        self.assertTrue(self.push(log, 4))
+        self.assertFalse(self.push(log, 2))
+        self.assertTrue(self.push(log, 1))
+
+        stats = log.stats()
+        self.assertEqual(stats['buffered'], 5)
+        self.assertEqual(stats['dropped'], 2)
+        log.close()
+        self.assertEqual(log.stats()['written'], 5)
+
+    def test_rotation_keeps_max_files(self):
+        """Testa troca de arquivo por linhas e remocao dos mais antigos."""
+        log = self.make_log(rows_per_file=2, max_files=2)
+        for _ in range(4):
+            self.push(log, 2)
+            log.flush(timeout=10)
+        log.close()
+
+        self.assertEqual(len(list(self.directory.glob("*.parquet"))), 2)
+        self.assertEqual(log.stats()['written'], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o profiling de etapas dos pipelines
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import json
+import tempfile
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.pipeline.profiling import PipelineProfiler
+
+
+class TestPipelineProfiler(unittest.TestCase):
+    """Testa a coleta de medidas por etapa."""
+
+    def test_stage_records(self):
+        """Testa registro de tempo, memoria e linhas."""
+        profiler = PipelineProfiler("teste")
+
+        with profiler.stage("alocar") as stage:
+            data = [0] * 1_000_000
+            stage.rows = len(data)
+
+        record = profiler.stages[0]
+        self.assertEqual(record.name, "alocar")
+        self.assertEqual(record.rows, 1_000_000)
+        self.assertGreater(record.wall_s, 0)
+        self.assertGreater(record.peak_mem_mb, 1)
+
+    def test_stage_recorded_on_error(self):
+        """Testa que a etapa e registrada mesmo com excecao."""
+        profiler = PipelineProfiler("teste", track_memory=False)
+
+        with self.assertRaises(ValueError):
+            with profiler.stage("falha"):
+                raise ValueError("erro")
+
+        self.assertEqual(len(profiler.stages), 1)
+        self.assertIsNone(profiler.stages[0].peak_mem_mb)
+
+    def test_save_and_metrics(self):
+        """Testa JSON e metricas planas para o MLflow."""
+        profiler = PipelineProfiler("teste", track_memory=False)
+        with profiler.stage("etapa", rows=10):
+            pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = profiler.save(os.path.join(tmp, "perfil.json"))
+            with open(path) as f:
+                summary = json.load(f)
+
+        self.assertEqual(summary['pipeline'], "teste")
+        self.assertEqual(summary['stages'][0]['rows'], 10)
+        self.assertIn("profile.etapa.wall_s", profiler.metrics())
+        self.assertEqual(profiler.metrics()["profile.etapa.rows"], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para a pontuacao compartilhada (API e modo local)
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+from src.features.transform import FeatureTransformer, FIELD_TO_COLUMN
+from src.api.scoring import load_bundle, score_frame, to_feature_frame, get_risk_level
+
+
+def make_upload(n_rows, seed):
+    """CSV de upload com os campos da API (snake_case)."""
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({
+        'age': rng.randint(20, 60, n_rows),
+        'occupation': rng.choice(['Engineer', 'Doctor', 'Lawyer'], n_rows),
+        'annual_income': rng.uniform(1e4, 1e5, n_rows),
+        'monthly_inhand_salary': rng.uniform(1e3, 8e3, n_rows),
+        'num_bank_accounts': rng.randint(0, 8, n_rows),
+        'num_credit_card': rng.randint(0, 8, n_rows),
+        'interest_rate': rng.uniform(1, 30, n_rows),
+        'num_of_loan': rng.randint(0, 5, n_rows),
+        'type_of_loan': rng.choice(['Auto Loan', 'Auto Loan, Personal Loan', 'Home Loan'], n_rows),
+        'delay_from_due_date': rng.randint(0, 60, n_rows),
+        'num_of_delayed_payment': rng.randint(0, 20, n_rows),
+        'changed_credit_limit': rng.uniform(-5, 20, n_rows),
+        'num_credit_inquiries': rng.randint(0, 10, n_rows),
+        'credit_mix': rng.choice(['Good', 'Standard', 'Bad'], n_rows),
+        'outstanding_debt': rng.uniform(0, 5e3, n_rows),
+        'credit_utilization_ratio': rng.uniform(20, 40, n_rows),
+        'credit_history_age': rng.choice(['5 Years and 2 Months', '15 Years and 0 Months'], n_rows),
+        'payment_of_min_amount': rng.choice(['Yes', 'No'], n_rows),
+        'total_emi_per_month': rng.uniform(0, 500, n_rows),
+        'amount_invested_monthly': rng.uniform(0, 1000, n_rows),
+        'payment_behaviour': rng.choice(['Low_spent_Small_value_payments',
+                                         'High_spent_Large_value_payments'], n_rows),
+        'monthly_balance': rng.uniform(100, 1000, n_rows),
+    })
+
+
+class TestScoring(unittest.TestCase):
+    """Testa carga do modelo e pontuacao vetorizada."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.upload = make_upload(300, 0)
+        features = to_feature_frame(cls.upload)
+        transformer = FeatureTransformer().fit(features)
+        score = cls.upload['annual_income'] / 1e5 - cls.upload['outstanding_debt'] / 5e3
+        labels = np.where(score > 0.3, 'Good', np.where(score > -0.3, 'Standard', 'Poor'))
+        target = LabelEncoder().fit(labels)
+        model = LogisticRegression(max_iter=1000).fit(transformer.transform(features),
+                                                      target.transform(labels))
+
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        for name, fitted in (("logistic_regression_20250101_000000", model),
+                             ("logistic_regression_20250102_000000", model)):
+            model_dir = Path(cls.tmp_dir.name) / name
+            model_dir.mkdir()
+            joblib.dump(fitted, model_dir / "model.pkl")
+            joblib.dump({'transformer': transformer, 'target': target}, model_dir / "encoders.pkl")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_load_latest_bundle(self):
+        """Testa que o pacote mais recente e carregado com a versao do nome."""
+        bundle = load_bundle(self.tmp_dir.name)
+        self.assertEqual(bundle['model_dir'].name, "logistic_regression_20250102_000000")
+        self.assertEqual(bundle['version'], "000000")
+
+    def test_missing_models(self):
+        """Testa erro sem modelos salvos."""
+        with tempfile.TemporaryDirectory() as empty:
+            with self.assertRaises(FileNotFoundError):
+                load_bundle(empty)
+
+    def test_matches_single_row_path(self):
+        """Testa mesmas predicoes do caminho de uma linha da API (transform_one)."""
+        bundle = load_bundle(self.tmp_dir.name)
+        scores = score_frame(bundle, self.upload)
+        transformer, model = bundle['encoders']['transformer'], bundle['model']
+
+        for i in range(0, len(self.upload), 37):
+            record = {FIELD_TO_COLUMN[field]: value
+                      for field, value in self.upload.iloc[i].to_dict().items()}
+            probabilities = model.predict_proba(transformer.transform_one(record))[0]
+            expected = bundle['encoders']['target'].inverse_transform([probabilities.argmax()])[0]
+            self.assertEqual(scores['credit_score'].iloc[i], expected)
+            self.assertAlmostEqual(scores['confidence'].iloc[i], probabilities.max())
+            self.assertEqual(scores['risk_level'].iloc[i], get_risk_level(expected))
+
+    def test_keeps_index_and_ignores_extra_columns(self):
+        """Testa indice preservado e colunas extras do upload ignoradas."""
+        upload = self.upload.iloc[10:20].assign(customer_id=range(10))
+        scores = score_frame(load_bundle(self.tmp_dir.name), upload)
+        self.assertEqual(list(scores.index), list(upload.index))
+        self.assertEqual(list(scores.columns),
+                         ['credit_score', 'confidence', 'risk_level', 'recommendation'])
+
+    def test_missing_columns(self):
+        """Testa erro claro com colunas ausentes."""
+        with self.assertRaises(ValueError) as context:
+            score_frame(load_bundle(self.tmp_dir.name), self.upload.drop(columns=['age']))
+        self.assertIn('age', str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
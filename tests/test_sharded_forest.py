@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o Random Forest treinado em shards
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import tempfile
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sklearn.ensemble import RandomForestClassifier
+from config import RANDOM_STATE
+from src.modeling.parallel import share_arrays
+from src.modeling.sharded_forest import (split_shards, tree_seeds, fit_shard, merge_forest,
+                                         train_shards_queue, is_loopback, queue_authkey)
+
+
+class TestShardedForest(unittest.TestCase):
+    """Testa reprodutibilidade do treino em shards."""
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.RandomState(0)
+        cls.X = rng.rand(300, 6).astype(np.float32)
+        cls.y = (cls.X[:, 0] + rng.rand(300) > 1).astype(int) + (cls.X[:, 1] > 0.7)
+        cls.params = {'n_estimators': 12, 'max_depth': 6, 'min_samples_split': 4}
+        cls.reference = RandomForestClassifier(**cls.params, random_state=RANDOM_STATE).fit(cls.X, cls.y)
+
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.paths = share_arrays({'X_train': cls.X, 'y_train': cls.y}, cls.tmp_dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def merged(self, shards):
+        return merge_forest(shards, np.unique(self.y), self.X.shape[1], self.params)
+
+    def test_split_shards(self):
+        """Testa divisao contigua das arvores."""
+        self.assertEqual(split_shards(10, 3), [(0, 3), (3, 6), (6, 10)])
+        self.assertEqual(len(split_shards(2, 5)), 2)
+
+    def test_identical_to_single_process(self):
+        """Testa resultado identico ao RandomForestClassifier para qualquer numero de shards."""
+        seeds = tree_seeds(self.params['n_estimators'])
+        for n_shards in (1, 3, 5):
+            shards = {start: fit_shard(self.paths, seeds[start:end], self.params)
+                      for start, end in split_shards(len(seeds), n_shards)}
+            forest = self.merged(shards)
+
+            np.testing.assert_array_equal(forest.predict_proba(self.X),
+                                          self.reference.predict_proba(self.X))
+            np.testing.assert_array_equal(forest.feature_importances_,
+                                          self.reference.feature_importances_)
+
+    def test_queue_backend(self):
+        """Testa fila TCP atendida por um worker local."""
+        seeds = tree_seeds(self.params['n_estimators'])
+        shards = train_shards_queue(self.paths, seeds, self.params, n_shards=3,
+                                    local_workers=1, port=0, timeout=120)
+
+        self.assertEqual(sorted(shards), [0, 4, 8])
+        np.testing.assert_array_equal(self.merged(shards).predict(self.X),
+                                      self.reference.predict(self.X))
+
+    def test_queue_authkey(self):
+        """Testa chave obrigatoria fora do loopback e aleatoria no loopback."""
+        self.assertTrue(is_loopback("127.0.0.1"))
+        self.assertTrue(is_loopback("localhost"))
+        self.assertFalse(is_loopback("0.0.0.0"))
+        self.assertFalse(is_loopback("10.0.0.5"))
+
+        self.assertEqual(queue_authkey("0.0.0.0", "segredo"), "segredo")
+        with self.assertRaises(ValueError):
+            queue_authkey("0.0.0.0", None)
+        self.assertNotEqual(queue_authkey("127.0.0.1", None), queue_authkey("127.0.0.1", None))
+
+
+if __name__ == '__main__':
+    unittest.main()
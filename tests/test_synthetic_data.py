@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o gerador de dados sinteticos
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import tempfile
+import pandas as pd
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.generate_synthetic_data import (
+    generate_dataframe, generate_api_payloads, write_dataset, RAW_COLUMNS, CLASS_PROPORTIONS
+)
+from src.api.models import CreditScoreInput
+from src.features.prepare_data import (
+    parse_structured_features, clean_numeric_columns, validate_data, fill_missing_numeric,
+    clean_categorical_columns, create_features, prepare_final_dataset
+)
+
+
+class TestSyntheticData(unittest.TestCase):
+    """Testa schema, formatos sujos e uso no pipeline."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = generate_dataframe(20_000, seed=7)
+
+    def test_schema(self):
+        """Testa colunas na ordem do dataset original."""
+        self.assertEqual(list(self.df.columns), RAW_COLUMNS)
+        self.assertEqual(len(self.df), 20_000)
+
+    def test_class_balance(self):
+        """Testa proporcoes das classes proximas do original."""
+        proportions = self.df['Credit_Score'].value_counts(normalize=True)
+        for label, expected in CLASS_PROPORTIONS.items():
+            self.assertAlmostEqual(proportions[label], expected, delta=0.03)
+
+    def test_dirty_formats(self):
+        """Testa presenca dos defeitos do dataset original."""
+        self.assertTrue(self.df['Age'].str.endswith('_').any())
+        self.assertTrue(self.df['Credit_History_Age'].isna().any())
+        self.assertTrue(self.df['Credit_History_Age'].dropna().str.contains('Years and').all())
+        self.assertTrue(self.df['Type_of_Loan'].dropna().str.contains(', and ').any())
+        self.assertTrue((self.df['Changed_Credit_Limit'] == '_').any())
+
+    def test_streaming_csv_matches_in_memory(self):
+        """Testa que a escrita em blocos gera o mesmo conteudo."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_dataset(os.path.join(tmp, 'train.csv'), 5_000, chunk_size=1_600, seed=7)
+            streamed = pd.read_csv(path)
+
+        expected = generate_dataframe(5_000, seed=7, chunk_size=1_600)
+        pd.testing.assert_series_equal(streamed['Credit_Score'], expected['Credit_Score'])
+        self.assertEqual(streamed['ID'].tolist(), expected['ID'].tolist())
+
+    def test_prepare_data_pipeline(self):
+        """Testa que o dataset passa pelas etapas de preparacao."""
+        df = parse_structured_features(self.df.copy())
+        df = clean_numeric_columns(df, fill_missing=False)
+        df, report = validate_data(df)
+        df = fill_missing_numeric(df)
+        df = clean_categorical_columns(df)
+        df = prepare_final_dataset(create_features(df))
+
+        self.assertGreater(report['linhas_invalidas'], 0)
+        self.assertEqual(df.columns[-1], 'Credit_Score')
+        self.assertTrue(pd.api.types.is_numeric_dtype(df['Age']))
+
+    def test_api_payloads_are_valid(self):
+        """Testa que as requisicoes geradas passam na validacao da API."""
+        payloads = generate_api_payloads(2_000, seed=7)
+        self.assertEqual(len(payloads), 2_000)
+        for payload in payloads:
+            CreditScoreInput(**payload)
+        self.assertIn('NA', {payload['credit_history_age'] for payload in payloads})
+
+
+if __name__ == '__main__':
+    unittest.main()
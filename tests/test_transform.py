@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o pipeline de transformacao de features
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.transform import FeatureTransformer, add_engineered_features
+
+
+class TestFeatureTransformer(unittest.TestCase):
+    """Testa o FeatureTransformer compartilhado entre treino e API."""
+
+    def setUp(self):
+        """Cria dados brutos de teste."""
+        self.raw = pd.DataFrame({
+            'Age': ['25', '40_', '33', '51'],
+            'Occupation': ['Engineer', 'Teacher', 'Engineer', None],
+            'Annual_Income': ['50000', '0', '75,000', '30000'],
+            'Num_Credit_Card': [2, 3, 1, 4],
+            'Credit_Utilization_Ratio': [30.5, 45.2, 20.0, 80.0],
+            'Num_of_Delayed_Payment': ['2', '0', '1', '25'],
+            'Outstanding_Debt': ['1000', '2000', '1500', '500'],
+            'Type_of_Loan': ['Auto Loan', 'Auto Loan, and Payday Loan', None, 'Not Specified'],
+            'Credit_History_Age': ['5 Years and 2 Months', 'NA', '1 Years and 0 Months', '10 Years and 6 Months']
+        })
+        self.transformer = FeatureTransformer().fit(self.raw)
+
+    def test_feature_names(self):
+        """Testa colunas geradas pelo transformer."""
+        names = self.transformer.feature_names_
+        self.assertIn('Credit_History_Months', names)
+        self.assertIn('Loan_Payday_Loan', names)
+        self.assertIn('Debt_Income_Ratio', names)
+        self.assertNotIn('Type_of_Loan', names)
+        self.assertEqual(self.transformer.categorical_columns_, ['Occupation'])
+
+    def test_batch_and_single_row_match(self):
+        """Testa que o caminho de uma linha reproduz o caminho vetorizado."""
+        batch = self.transformer.transform(self.raw)
+        single = np.vstack([self.transformer.transform_one(record)
+                            for record in self.raw.to_dict('records')])
+
+        np.testing.assert_allclose(batch, single)
+
+    def test_unseen_category(self):
+        """Testa categoria nao vista (usa a categoria mais frequente)."""
+        record = self.raw.iloc[0].to_dict()
+        record['Occupation'] = 'Astronaut'
+        result = self.transformer.transform_one(record)
+
+        col = self.transformer.feature_names_.index('Occupation')
+        self.assertEqual(result[0, col], self.transformer.category_maps_['Occupation']['Engineer'])
+
+    def test_zero_income_matches_training(self):
+        """Testa que a razao divida/renda usa a mesma regra do treinamento."""
+        df = add_engineered_features(pd.DataFrame({
+            'Outstanding_Debt': [500.0], 'Annual_Income': [0.0]
+        }))
+        self.assertEqual(df.loc[0, 'Debt_Income_Ratio'], 500.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
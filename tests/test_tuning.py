@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para a busca de hiperparametros
+Autores:
+ 357103 - Víctor Kennedy Kaneko Nunes
+ 358078 - Octavio Ribeiro
+ 360075 - Gabriel Oliveira
+ 358032 - Lucas Guilherme Mordaski
+"""
+
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modeling.tune_model import (
+    sample_configs, rung_fractions, scale_params, validation_split, estimate_full_fit, SEARCH_SPACE
+)
+
+
+class TestTuning(unittest.TestCase):
+    """Testa sorteio de configuracoes e orcamento das rodadas."""
+
+    def test_sample_configs_reproducible(self):
+        """Testa sorteio deterministico dentro do espaco de busca."""
+        families = list(SEARCH_SPACE)
+        configs = sample_configs(families, 20, seed=1)
+
+        self.assertEqual(configs, sample_configs(families, 20, seed=1))
+        self.assertEqual(len(configs), 20)
+        for family, params in configs:
+            self.assertIn(family, families)
+            for name, value in params.items():
+                self.assertIn(value, SEARCH_SPACE[family][name])
+
+    def test_rung_fractions(self):
+        """Testa fracoes de dados por rodada."""
+        self.assertEqual(rung_fractions(27, 3), [1 / 27, 1 / 9, 1 / 3, 1])
+        self.assertEqual(rung_fractions(9, 3), [1 / 9, 1 / 3, 1])
+        self.assertEqual(rung_fractions(1, 3), [1])
+
+    def test_scale_params(self):
+        """Testa reducao do numero de arvores nas rodadas baratas."""
+        params = {'n_estimators': 300, 'max_depth': 20}
+
+        self.assertEqual(scale_params('random_forest', params, 1 / 3)['n_estimators'], 100)
+        self.assertEqual(scale_params('random_forest', params, 1 / 100)['n_estimators'], 10)
+        self.assertEqual(scale_params('random_forest', params, 1), params)
+        self.assertEqual(scale_params('logistic_regression', {'C': 1.0}, 1 / 9), {'C': 1.0})
+
+    def test_validation_split(self):
+        """Testa validacao fixa, estratificada e separada das linhas de ajuste."""
+        y = np.array([0] * 80 + [1] * 20)
+        fit_rows, val_rows = validation_split(y, size=0.2)
+
+        self.assertEqual(len(val_rows), 20)
+        self.assertEqual(set(fit_rows) & set(val_rows), set())
+        self.assertEqual(int(y[val_rows].sum()), 4)
+        np.testing.assert_array_equal(val_rows, validation_split(y, size=0.2)[1])
+
+    def test_estimate_full_fit(self):
+        """Testa estimativa do retreino: florestas crescem em linhas e arvores."""
+        trial = {'family': 'random_forest', 'fraction': 1 / 3, 'fit_time': 2.0}
+        self.assertAlmostEqual(estimate_full_fit(trial), 18.0)
+        trial = {'family': 'logistic_regression', 'fraction': 1 / 3, 'fit_time': 2.0}
+        self.assertAlmostEqual(estimate_full_fit(trial), 6.0)
+
+
+if __name__ == '__main__':
+    unittest.main()